@@ -5,29 +5,69 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from flask import Flask, render_template, jsonify, request, abort, redirect, url_for, session, flash
+from flask import Flask, Response, render_template, jsonify, request, abort, redirect, url_for, session, flash
 from datetime import datetime, date
-from utils.system import get_system_info, get_services
-from utils.memory import get_memory_files, get_memory_content, get_main_memory, get_memory_stats
-from utils.activity import get_activities, get_today_activities, get_available_dates, get_categories
-from utils.tasks import get_all_tasks, get_task_stats, add_task, move_task, move_file_task
-from utils.emails import check_emails, get_email_status
-from utils.notes import get_notes, add_note, update_note
-from utils.docs import get_all_docs, get_doc_content
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from utils.system import get_system_info, get_services, start_sampler
+from utils.history import get_history, set_status_source
+from utils.render import get_render_cache_stats
+from utils.memory import (
+    get_memory_files, get_memory_content, get_main_memory, get_memory_stats, get_memory_version
+)
+from utils.activity import (
+    get_activity_feed, get_today_activities, get_available_dates, get_categories, get_activity_version,
+    get_cache_stats as get_activity_cache_stats,
+)
+from utils.tasks import (
+    get_all_tasks, get_task_stats, get_tasks_version, get_tasks_tag, add_task, move_task, move_file_task, apply_task_batch,
+    get_todo_cache_stats,
+)
+from utils.emails import get_email_status, start_email_check, get_email_job, start_email_scheduler
+from utils.notes import get_notes, get_notes_version, add_note, update_note
+from utils.docs import get_all_docs, query_docs, get_docs_version, get_doc_content
 from utils.status import get_ai_status, update_status
+from utils.search import search, MAX_RESULTS as MAX_SEARCH_RESULTS
+from utils.stream import broker, start_producer
+from utils.cache import SingleFlight
+from utils.widgets import WidgetLoader
+from utils.etag import conditional
+from utils import assets, metrics, profiler
 from utils.auth import (
     init_users, authenticate, get_all_users, create_user, delete_user,
     get_current_user, login_required, admin_required
 )
 import json
-from config import HEARTBEAT_STATE, FLASK_HOST, FLASK_PORT, FLASK_DEBUG, SECRET_KEY
+import queue
+import time
+from config import (
+    HEARTBEAT_STATE, FLASK_HOST, FLASK_PORT, FLASK_DEBUG, SECRET_KEY,
+    STREAM_KEEPALIVE, STATUS_MAX_AGE, ACTIVITY_PAGE_SIZE,
+)
 
 app = Flask(__name__)
 app.secret_key = SECRET_KEY
 
+# Fingerprinted static bundles (see utils/assets.py)
+assets.init_app(app)
+
+# Request timing and the Prometheus /metrics endpoint (see utils/metrics.py)
+metrics.init_app(app)
+metrics.register_cache('markdown', get_render_cache_stats)
+metrics.register_cache('memory_logs', get_activity_cache_stats)
+metrics.register_cache('todo', get_todo_cache_stats)
+
+# Slow-request log, admin ?__profile=1 and sampled profiling (see utils/profiler.py)
+profiler.init_app(app)
+
 # Initialize default admin user
 init_users()
 
+# Start background system metrics sampler
+start_sampler()
+
+# Periodic email checks (EMAIL_CHECK_INTERVAL, off by default)
+start_email_scheduler()
+
 
 @app.context_processor
 def inject_user():
@@ -46,6 +86,56 @@ def get_heartbeat_state():
     return {}
 
 
+def build_status():
+    """Assemble the status payload shared by /api/status and the live stream."""
+    sys_info = get_system_info()
+    heartbeat = get_heartbeat_state()
+    ai = get_ai_status()
+    return {
+        'status': 'online',
+        'ai_status': ai,
+        'uptime': sys_info['uptime'],
+        'cpu': sys_info['cpu']['percent'],
+        'memory': sys_info['memory']['percent'],
+        'disk': sys_info['disk']['percent'],
+        'sample_age': sys_info['sample_age'],
+        'heartbeat': heartbeat,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+# Concurrent status requests within STATUS_MAX_AGE share one computation
+_status_flight = SingleFlight(build_status, STATUS_MAX_AGE)
+
+
+def get_shared_status():
+    """Return the coalesced status payload with generated_at and age fields."""
+    payload, generated_at = _status_flight.get()
+    return dict(payload,
+                generated_at=datetime.fromtimestamp(generated_at).isoformat(),
+                age=round(time.time() - generated_at, 3))
+
+
+# History samples reuse the coalesced status instead of recomputing it
+set_status_source(lambda: get_shared_status()['ai_status'])
+
+
+def get_dashboard_ai_status():
+    """AI status for the dashboard panel, falling back to system uptime."""
+    status = get_shared_status()
+    return dict(status['ai_status'], uptime=status['ai_status']['uptime'] or status['uptime'])
+
+
+# Dashboard collectors run concurrently; slow ones are filled in via /api/widgets
+widgets = WidgetLoader()
+widgets.register('ai_status', get_dashboard_ai_status)
+widgets.register('sys_info', get_system_info, parts=('system', 'health'))
+widgets.register('mem_stats', get_memory_stats, parts=('memory',))
+widgets.register('task_stats', get_task_stats, parts=('tasks',))
+widgets.register('activities', lambda: get_today_activities(limit=10), parts=('activity',))
+widgets.register('email_status', get_email_status, parts=('email',))
+
+
 # ─── Auth Routes ───
 
 @app.route('/login', methods=['GET', 'POST'])
@@ -126,24 +216,12 @@ def admin_delete_user(user_id):
 @app.route('/')
 @login_required
 def dashboard():
-    sys_info = get_system_info()
-    mem_stats = get_memory_stats()
-    task_stats = get_task_stats()
-    activities = get_today_activities(limit=10)
-    heartbeat = get_heartbeat_state()
-    email_status = get_email_status()
-    ai_status = get_ai_status()
-
+    data, pending = widgets.load()
     return render_template('dashboard.html',
                            page='dashboard',
-                           sys_info=sys_info,
-                           mem_stats=mem_stats,
-                           task_stats=task_stats,
-                           activities=activities,
-                           heartbeat=heartbeat,
-                           email_status=email_status,
-                           ai_status=ai_status,
-                           now=datetime.now())
+                           pending=pending,
+                           now=datetime.now(),
+                           **data)
 
 
 @app.route('/activity')
@@ -151,12 +229,15 @@ def dashboard():
 def activity():
     target_date = request.args.get('date', None)
     category = request.args.get('category', None)
-    activities = get_activities(target_date=target_date, category=category)
+    feed = get_activity_feed(target_date=target_date, category=category, limit=ACTIVITY_PAGE_SIZE)
     dates = get_available_dates()
     categories = get_categories()
     return render_template('activity.html',
                            page='activity',
-                           activities=activities,
+                           activities=feed['activities'],
+                           feed_cursor=feed['cursor'],
+                           next_before=feed['next_before'],
+                           page_size=ACTIVITY_PAGE_SIZE,
                            dates=dates,
                            categories=categories,
                            selected_date=target_date,
@@ -167,10 +248,13 @@ def activity():
 @app.route('/tasks')
 @login_required
 def tasks():
+    # Taken before reading, so a change made meanwhile still triggers a reload
+    version = get_tasks_tag()
     all_tasks = get_all_tasks()
     return render_template('tasks.html',
                            page='tasks',
                            tasks=all_tasks,
+                           tasks_version=version,
                            now=datetime.now())
 
 
@@ -244,33 +328,73 @@ def docs():
 @app.route('/api/status')
 @login_required
 def api_status():
-    sys_info = get_system_info()
-    heartbeat = get_heartbeat_state()
-    ai = get_ai_status()
-    return jsonify({
-        'status': 'online',
-        'ai_status': ai,
-        'uptime': sys_info['uptime'],
-        'cpu': sys_info['cpu']['percent'],
-        'memory': sys_info['memory']['percent'],
-        'disk': sys_info['disk']['percent'],
-        'heartbeat': heartbeat,
-        'timestamp': datetime.now().isoformat()
-    })
+    return jsonify(get_shared_status())
+
+
+@app.route('/api/widgets/<name>')
+@login_required
+def api_widget(name):
+    """Rendered partials for a dashboard widget that was too slow for the page."""
+    widget = widgets.get_widget(name)
+    if not widget:
+        return jsonify({'error': 'unknown widget'}), 404
+    try:
+        data = widgets.fetch(name)
+    except FutureTimeoutError:
+        return jsonify({'error': 'widget timed out'}), 504
+    except Exception:
+        return jsonify({'error': 'widget failed'}), 500
+    parts = {part: render_template(f'widgets/{part}.html', **{name: data})
+             for part in widget.parts}
+    return jsonify({'name': name, 'parts': parts})
+
+
+@app.route('/api/stream')
+@login_required
+def api_stream():
+    """Server-Sent Events channel for status, activity, notes and task changes."""
+    q = broker.subscribe()
+    if q is None:
+        # EventSource gives up on an error status and the page falls back to polling
+        return jsonify({'error': 'too many live update clients'}), 503
+    start_producer(get_shared_status)
+
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    yield q.get(timeout=STREAM_KEEPALIVE)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+        finally:
+            broker.unsubscribe(q)
+
+    response = Response(generate(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Free the slot even if the client goes away before the body is started
+    response.call_on_close(lambda: broker.unsubscribe(q))
+    return response
 
 
 @app.route('/api/activity')
 @login_required
+@conditional(lambda: get_activity_version(request.args.get('date', None)))
 def api_activity():
     target_date = request.args.get('date', None)
     limit = request.args.get('limit', None, type=int)
     category = request.args.get('category', None)
-    activities = get_activities(target_date=target_date, limit=limit, category=category)
-    return jsonify({'activities': activities, 'count': len(activities)})
+    try:
+        feed = get_activity_feed(target_date=target_date, limit=limit, category=category,
+                                 since=request.args.get('since'), before=request.args.get('before'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(feed)
 
 
 @app.route('/api/tasks', methods=['GET'])
 @login_required
+@conditional(get_tasks_version)
 def api_tasks():
     tasks = get_all_tasks()
     return jsonify(tasks)
@@ -324,6 +448,20 @@ def api_tasks_move():
         return jsonify({'status': 'ok', 'task': task})
 
 
+@app.route('/api/tasks/batch', methods=['POST'])
+@login_required
+def api_tasks_batch():
+    """Apply many add/move operations with one write per file."""
+    data = request.get_json(force=True)
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'operations (non-empty list) required'}), 400
+    results = apply_task_batch(operations)
+    failed = sum(1 for r in results if r['status'] != 'ok')
+    return jsonify({'status': 'ok' if not failed else 'partial', 'results': results,
+                    'applied': len(results) - failed, 'failed': failed})
+
+
 @app.route('/api/emails')
 @login_required
 def api_emails():
@@ -331,15 +469,26 @@ def api_emails():
     return jsonify(status)
 
 
-@app.route('/api/emails/check')
+@app.route('/api/emails/check', methods=['POST'])
 @login_required
 def api_emails_check():
-    result = check_emails()
-    return jsonify(result)
+    """Queue an email check; concurrent requests share one job."""
+    job, created = start_email_check()
+    return jsonify({'status': 'queued' if created else 'running', 'job': job}), 202
+
+
+@app.route('/api/emails/jobs/<job_id>')
+@login_required
+def api_emails_job(job_id):
+    job = get_email_job(job_id)
+    if not job:
+        return jsonify({'error': 'job not found'}), 404
+    return jsonify(job)
 
 
 @app.route('/api/memory')
 @login_required
+@conditional(lambda: get_memory_version(request.args.get('file', None)))
 def api_memory():
     files = get_memory_files()
     filename = request.args.get('file', None)
@@ -357,8 +506,19 @@ def api_system():
     return jsonify({'system': sys_info, 'services': services})
 
 
+@app.route('/api/system/history')
+@login_required
+def api_system_history():
+    try:
+        series = get_history(request.args.get('metric', 'cpu'), request.args.get('range', '1h'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(series)
+
+
 @app.route('/api/notes', methods=['GET'])
 @login_required
+@conditional(get_notes_version)
 def api_notes():
     notes = get_notes()
     return jsonify({'notes': notes, 'count': len(notes)})
@@ -391,9 +551,18 @@ def api_notes_update():
 
 @app.route('/api/docs', methods=['GET'])
 @login_required
+@conditional(get_docs_version)
 def api_docs():
-    docs = get_all_docs()
-    return jsonify({'docs': docs, 'count': len(docs)})
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', None, type=int)
+    label = request.args.get('label', None)
+    doc_type = request.args.get('type', None)
+    try:
+        docs, total = query_docs(label=label, doc_type=doc_type, offset=offset, limit=limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'docs': docs, 'count': len(docs), 'total': total,
+                    'offset': offset, 'limit': limit})
 
 
 @app.route('/api/docs/view', methods=['GET'])
@@ -408,10 +577,26 @@ def api_docs_view():
     return jsonify(content)
 
 
+@app.route('/api/search', methods=['GET'])
+@login_required
+def api_search():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'q is required'}), 400
+    limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_SEARCH_RESULTS)
+    kind = request.args.get('kind', None)
+    started = datetime.now()
+    results = search(query, limit=limit, kind=kind)
+    took_ms = (datetime.now() - started).total_seconds() * 1000
+    return jsonify({'query': query, 'results': results, 'count': len(results),
+                    'took_ms': round(took_ms, 1)})
+
+
 @app.route('/api/ai-status', methods=['GET'])
 @login_required
 def api_ai_status():
-    return jsonify(get_ai_status())
+    status = get_shared_status()
+    return jsonify(dict(status['ai_status'], generated_at=status['generated_at'], age=status['age']))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: compiled activity categorizer vs. per-keyword substring scans.
+
+Usage:
+    python benchmarks/categorize.py [--lines 1000000] [--seed 1]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.activity import CATEGORY_MAP, KeywordCategorizer
+
+FILLER = (
+    'the of and to in is was for on with that by it from at as be this have are '
+    'not but had they were which or an been their has would what will there if can '
+    'all when who more about up them some could into than then now look only other '
+    'its time over also back after use two how our work first well way even new'
+).split()
+
+
+def legacy_categorize(text, groups):
+    """Reference implementation: one substring scan per keyword, in category order."""
+    t = text.lower()
+    for cat, keywords in groups:
+        if any(w in t for w in keywords):
+            return cat
+    return 'other'
+
+
+def make_corpus(n, seed, hit_rate=0.4):
+    """Generate n activity-like lines, hit_rate of which contain a keyword."""
+    rng = random.Random(seed)
+    keywords = [kw for info in CATEGORY_MAP.values() for kw in info.get('keywords', [])]
+    lines = []
+    for _ in range(n):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(8, 16))]
+        if rng.random() < hit_rate:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        lines.append(' '.join(words).capitalize())
+    return lines
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    groups = [(c, info['keywords']) for c, info in CATEGORY_MAP.items() if info.get('keywords')]
+    categorizer = KeywordCategorizer(CATEGORY_MAP)
+    lines = make_corpus(args.lines, args.seed)
+    print(f"corpus: {len(lines):,} lines, {sum(map(len, lines)) / 1e6:.1f} MB")
+
+    expected, legacy_s = timed(lambda: [legacy_categorize(t, groups) for t in lines])
+    single, single_s = timed(lambda: [categorizer.categorize(t) for t in lines])
+    batch, batch_s = timed(lambda: categorizer.categorize_many(lines))
+
+    if single != expected or batch != expected:
+        print('ERROR: compiled categorizer disagrees with the reference implementation')
+        return 1
+
+    print(f"{'legacy substring scans':<26}{legacy_s:8.2f} s")
+    print(f"{'compiled categorize()':<26}{single_s:8.2f} s  ({legacy_s / single_s:.1f}x)")
+    print(f"{'compiled categorize_many()':<26}{batch_s:8.2f} s  ({legacy_s / batch_s:.1f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
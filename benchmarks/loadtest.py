@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""Load-test a locally started dashboard with simulated browser sessions.
+
+Usage:
+    python benchmarks/loadtest.py [--sessions 10,25,50] [--duration 120] [--ramp 15]
+                                  [--speed 1] [--live] [--page-time 120]
+                                  [--task-moves 0.5] [--note-adds 0.2]
+                                  [--size small] [--seed 1] [--workdir DIR]
+                                  [--workers N] [--watch /api/status] [--output FILE]
+
+For each --sessions level, `python app.py` is started on a free local port
+against a generated workspace (see workspace.py) and a scratch copy of its
+data directory, so everything runs offline and the cached workspace stays
+untouched. The sessions log in over --ramp seconds and replay what their
+open pages request. Without live updates (EventSource) the templates poll:
+
+    every page   /api/status on load and every 15 s (base.html)
+    /            /api/status every 15 s (dashboard.html), /api/widgets/<name>
+                 for widgets rendered as placeholders
+    /activity    /api/activity?since=<cursor> every 15 s
+    /notes       /api/notes every 15 s, with If-None-Match
+    /system      /api/system every 30 s; /api/system/history on load and every 60 s
+    /tasks       -
+
+With --live each session holds an /api/stream connection instead, and only
+what the pages do on pushed events remains (activity fetches, task board
+reloads) besides page loads and the history chart. Sessions refused a
+stream (over STREAM_MAX_CLIENTS) poll, as the pages do. A session stays on a
+page for --page-time seconds on average before opening another (weighted
+by PAGES). It also moves a dashboard task on /tasks and adds a note on
+/notes, at --task-moves and --note-adds per minute, reloading the page
+afterwards as the templates do. --speed divides every interval, so 10
+sessions at --speed 10 send the traffic of 100.
+
+Only requests started after the ramp-up are reported: per endpoint the
+throughput, latency percentiles and error rate, plus server CPU per request
+from the dashboard_request_cpu_seconds_total counter in /metrics (request
+threads only) and the CPU of the whole server process. Dispatch lag (requests
+sent late because all --workers are busy) is reported too; when it is high,
+the client rather than the server is the bottleneck. With several levels a
+summary of the --watch endpoint's p99 closes the run.
+"""
+
+import argparse
+import heapq
+import http.client
+import itertools
+import json
+import math
+import os
+import random
+import re
+import secrets
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import quote, urlencode
+
+import psutil
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+from workspace import GENERATED_DATA, SIZES, prepare, workspace_env
+
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+HOST = '127.0.0.1'
+USERNAME = 'admin'
+PASSWORD = 'loadtest'
+
+# page: (path, weight, [(polled route, seconds)]) -- polls without live updates
+PAGES = {
+    'dashboard': ('/', 4, [('/api/status', 15)]),
+    'activity': ('/activity', 2, [('/api/activity', 15)]),
+    'tasks': ('/tasks', 2, []),
+    'notes': ('/notes', 1, [('/api/notes', 15)]),
+    'system': ('/system', 1, [('/api/system', 30)]),
+}
+STATUS_POLL = 15             # base.html, on every page
+HISTORY_INTERVAL = 60        # system.html, a plain setInterval that also runs with live updates
+HISTORY_QUERY = '?metric=cpu&range=1h'
+TASK_COLUMNS = ('todo', 'in_progress', 'done')
+
+REQUEST_TIMEOUT = 30
+STREAM_RETRY = 5             # seconds, as sent by /api/stream
+STREAM_TIMEOUT = 60          # longer than the server's keepalive interval
+SERVER_START_TIMEOUT = 60
+PERCENTILES = (50, 95, 99)
+
+WIDGET_RE = re.compile(r'data-widget="(\w+)"')
+CURSOR_RE = re.compile(r'var activityCursor = (.*?);')
+CPU_RE = re.compile(r'^dashboard_request_cpu_seconds_total\{method="([^"]*)",route="([^"]*)"\} (\S+)$', re.M)
+COUNT_RE = re.compile(r'^dashboard_request_duration_seconds_count\{method="([^"]*)",route="([^"]*)",status="[^"]*"\} (\S+)$', re.M)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    return values[max(math.ceil(pct / 100 * len(values)) - 1, 0)]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def _process_cpu(proc):
+    times = proc.cpu_times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class Session:
+    """One logged-in browser: its cookie, open page and per-page state."""
+
+    def __init__(self, index, rng):
+        self.index = index
+        self.rng = rng
+        self.cookie = None
+        self.page = None
+        self.visit = 0          # bumped on every page load; timers of older visits stop
+        self.cursor = None      # /activity feed cursor
+        self.etags = {}         # url -> ETag, as chittyFetchJSON keeps them
+        self.live = False       # receiving pushed events instead of polling
+        self.lock = threading.Lock()
+
+
+class Server:
+    """`python app.py` on a free port, pointed at a scratch copy of a workspace's data."""
+
+    def __init__(self, root):
+        self.port = _free_port()
+        self.token = secrets.token_hex(16)
+        self.run_dir = tempfile.mkdtemp(prefix='dashboard-loadtest-')
+        env = workspace_env(root)
+        for name in GENERATED_DATA:
+            shutil.copy(os.path.join(env['DATA_DIR'], name), self.run_dir)
+        env.update(DATA_DIR=self.run_dir, FLASK_HOST=HOST, FLASK_PORT=str(self.port), FLASK_DEBUG='false',
+                   SECRET_KEY=secrets.token_hex(16), METRICS_TOKEN=self.token,
+                   ADMIN_USERNAME=USERNAME, ADMIN_PASSWORD=PASSWORD,
+                   EMAIL_CHECK_INTERVAL='0', SLOW_REQUEST_MS='0', PROFILE_SAMPLE_RATE='0')
+        self.log_path = os.path.join(self.run_dir, 'server.log')
+        self._log = open(self.log_path, 'w')
+        self.proc = subprocess.Popen([sys.executable, 'app.py'], cwd=ROOT_DIR, env=dict(os.environ, **env),
+                                     stdout=self._log, stderr=subprocess.STDOUT)
+        self.process = psutil.Process(self.proc.pid)
+
+    def wait_ready(self):
+        deadline = time.time() + SERVER_START_TIMEOUT
+        while time.time() < deadline and self.proc.poll() is None:
+            conn = http.client.HTTPConnection(HOST, self.port, timeout=2)
+            try:
+                conn.request('GET', '/login')
+                if conn.getresponse().status == 200:
+                    return
+            except OSError:
+                pass
+            finally:
+                conn.close()
+            time.sleep(0.2)
+        with open(self.log_path) as f:
+            sys.stderr.write(f.read()[-4000:])
+        raise SystemExit('ERROR: the dashboard did not start')
+
+    def scrape(self):
+        """Per-route request CPU seconds and counts from /metrics."""
+        conn = http.client.HTTPConnection(HOST, self.port, timeout=REQUEST_TIMEOUT)
+        try:
+            conn.request('GET', '/metrics', headers={'Authorization': f'Bearer {self.token}'})
+            text = conn.getresponse().read().decode()
+        finally:
+            conn.close()
+        cpu = {f'{m} {r}': float(v) for m, r, v in CPU_RE.findall(text)}
+        counts = {}
+        for m, r, v in COUNT_RE.findall(text):
+            counts[f'{m} {r}'] = counts.get(f'{m} {r}', 0) + int(float(v))
+        return cpu, counts
+
+    def cpu(self):
+        return _process_cpu(self.process)
+
+    def stop(self):
+        self.proc.terminate()
+        try:
+            self.proc.wait(10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self._log.close()
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+
+class LoadTest:
+    """Schedules the sessions' requests on a worker pool and records their latency."""
+
+    def __init__(self, server, sessions, args):
+        self.server = server
+        self.args = args
+        self.speed = args.speed
+        master = random.Random(args.seed)
+        self.sessions = [Session(i, random.Random(master.random())) for i in range(sessions)]
+        self.workers = args.workers or max(8, min(256, 2 * sessions))
+        self.records = []       # (endpoint, seconds, status or None)
+        self.lags = []
+        self.events = 0
+        self.task_ids = []
+        self.notes_added = itertools.count(1)
+        self.measure_from = self.measure_until = float('inf')
+        self.stopping = False
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(self.workers)
+        self._streams = []
+        self._failures = {}
+
+    # ─── Scheduling ───
+
+    def _push(self, due, fn, *args):
+        with self._cond:
+            heapq.heappush(self._heap, (due, next(self._seq), fn, args))
+            self._cond.notify()
+
+    def schedule(self, delay, fn, *args):
+        """Run fn after `delay` simulated seconds (divided by --speed)."""
+        self._push(time.perf_counter() + delay / self.speed, fn, *args)
+
+    def _dispatch(self):
+        with self._cond:
+            while not self.stopping:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0][0] - time.perf_counter()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                due, _, fn, args = heapq.heappop(self._heap)
+                self._pool.submit(self._call, due, fn, args)
+
+    def _call(self, due, fn, args):
+        if self.stopping:
+            return
+        if self.measure_from <= due < self.measure_until:
+            self.lags.append(time.perf_counter() - due)
+        try:
+            fn(*args)
+        except Exception as e:
+            key = f'{fn.__name__}: {type(e).__name__}'
+            if key not in self._failures:
+                print(f'  warning: {key}: {e}', file=sys.stderr, flush=True)
+            self._failures[key] = self._failures.get(key, 0) + 1
+
+    # ─── HTTP ───
+
+    def request(self, session, method, path, route, body=None, content_type=None, headers=None):
+        """Send one request as `session`; returns (status, response, body) or None on failure."""
+        headers = dict(headers or {})
+        if session.cookie:
+            headers['Cookie'] = session.cookie
+        if body is not None:
+            headers['Content-Type'] = content_type
+        endpoint = f'{method} {route}'
+        start = time.perf_counter()
+        conn = http.client.HTTPConnection(HOST, self.server.port, timeout=REQUEST_TIMEOUT)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self._record(endpoint, start, None)
+            return None
+        finally:
+            conn.close()
+        self._record(endpoint, start, response.status)
+        cookie = response.getheader('Set-Cookie')
+        if cookie:
+            session.cookie = cookie.split(';', 1)[0]
+        return response.status, response, data
+
+    def _record(self, endpoint, start, status):
+        if self.measure_from <= start < self.measure_until:
+            self.records.append((endpoint, time.perf_counter() - start, status))
+
+    def get(self, session, path, route=None, **kwargs):
+        return self.request(session, 'GET', path, route or path, **kwargs)
+
+    def post_json(self, session, route, payload):
+        return self.request(session, 'POST', route, route, body=json.dumps(payload).encode(),
+                            content_type='application/json')
+
+    # ─── Browser behaviour ───
+
+    def login(self, session):
+        form = urlencode({'username': USERNAME, 'password': PASSWORD}).encode()
+        result = self.request(session, 'POST', '/login', '/login', body=form,
+                              content_type='application/x-www-form-urlencoded')
+        if not result or result[0] != 302 or not session.cookie:
+            self.schedule(STREAM_RETRY, self.login, session)
+            return False
+        if self.args.live:
+            session.live = True
+            stream = self._connect_stream(session)
+            if session.live:
+                threading.Thread(target=self._stream, args=(session, stream), daemon=True).start()
+        self.open_page(session, 'dashboard')
+        self.schedule(session.rng.expovariate(1 / self.args.page_time), self.navigate, session)
+        for rate, action in ((self.args.task_moves, self.move_task), (self.args.note_adds, self.add_note)):
+            if rate > 0 and (action != self.move_task or self.task_ids):
+                self.schedule(session.rng.expovariate(rate / 60), action, session, rate)
+        return True
+
+    def open_page(self, session, page):
+        """Load a page and what it requests on load, then start its timers."""
+        with session.lock:
+            session.visit += 1
+            session.page = page
+            visit = session.visit
+        path, _, polls = PAGES[page]
+        result = self.get(session, path)
+        html = result[2].decode('utf-8', 'replace') if result and result[0] == 200 else ''
+
+        self.get(session, '/api/status')
+        if page == 'dashboard':
+            for name in dict.fromkeys(WIDGET_RE.findall(html)):
+                self.get(session, f'/api/widgets/{quote(name)}', '/api/widgets/<name>')
+        elif page == 'activity':
+            match = CURSOR_RE.search(html)
+            session.cursor = json.loads(match.group(1)) if match else None
+        elif page == 'system':
+            self.history(session, visit)
+
+        if not session.live:
+            self.start_polling(session, visit)
+
+    def start_polling(self, session, visit):
+        self.schedule(STATUS_POLL, self.poll, session, visit, '/api/status', STATUS_POLL)
+        for route, interval in PAGES[session.page][2]:
+            self.schedule(interval, self.poll, session, visit, route, interval)
+
+    def poll(self, session, visit, route, interval):
+        if session.visit != visit:
+            return
+        self.schedule(interval, self.poll, session, visit, route, interval)
+        if route == '/api/activity':
+            self.activity_since(session, visit)
+        elif route == '/api/notes':
+            self.fetch_json(session, route)
+        else:
+            self.get(session, route)
+
+    def activity_since(self, session, visit):
+        path = '/api/activity' if session.cursor is None else f'/api/activity?since={quote(str(session.cursor))}'
+        result = self.get(session, path, '/api/activity')
+        if not result or result[0] != 200 or session.visit != visit:
+            return
+        data = json.loads(result[2])
+        if data.get('reset'):
+            self.open_page(session, 'activity')
+        else:
+            session.cursor = data.get('cursor')
+
+    def fetch_json(self, session, route):
+        etag = session.etags.get(route)
+        result = self.get(session, route, headers={'If-None-Match': etag} if etag else None)
+        if result and result[0] == 200 and result[1].getheader('ETag'):
+            session.etags[route] = result[1].getheader('ETag')
+
+    def history(self, session, visit):
+        if session.visit != visit:
+            return
+        self.schedule(HISTORY_INTERVAL, self.history, session, visit)
+        self.get(session, '/api/system/history' + HISTORY_QUERY, '/api/system/history')
+
+    def navigate(self, session):
+        self.schedule(session.rng.expovariate(1 / self.args.page_time), self.navigate, session)
+        pages = [p for p in PAGES if p != session.page]
+        self.open_page(session, session.rng.choices(pages, [PAGES[p][1] for p in pages])[0])
+
+    def move_task(self, session, rate):
+        self.schedule(session.rng.expovariate(rate / 60), self.move_task, session, rate)
+        if session.page != 'tasks':
+            self.open_page(session, 'tasks')
+        self.post_json(session, '/api/tasks/move', {
+            'source_type': 'dashboard',
+            'id': session.rng.choice(self.task_ids),
+            'column': session.rng.choice(TASK_COLUMNS),
+        })
+        self.open_page(session, 'tasks')
+
+    def add_note(self, session, rate):
+        self.schedule(session.rng.expovariate(rate / 60), self.add_note, session, rate)
+        if session.page != 'notes':
+            self.open_page(session, 'notes')
+        self.post_json(session, '/api/notes/add',
+                       {'text': f'load test note {next(self.notes_added)} from session {session.index}'})
+        self.open_page(session, 'notes')
+
+    def _connect_stream(self, session):
+        """Open /api/stream; returns (connection, response), or None when refused or failed."""
+        conn = http.client.HTTPConnection(HOST, self.server.port, timeout=STREAM_TIMEOUT)
+        start = time.perf_counter()
+        try:
+            conn.request('GET', '/api/stream', headers={'Cookie': session.cookie, 'Accept': 'text/event-stream'})
+            self._streams.append(conn.sock)
+            response = conn.getresponse()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            if not self.stopping:
+                self._record('GET /api/stream', start, None)
+            return None
+        self._record('GET /api/stream', start, response.status)
+        if response.status != 200:
+            # EventSource gives up on an error status and the page polls instead
+            conn.close()
+            session.live = False
+            return None
+        return conn, response
+
+    def _stream(self, session, stream):
+        # One EventSource per session; reconnects like the browser does
+        while not self.stopping:
+            if stream is None:
+                time.sleep(STREAM_RETRY / self.speed)
+                if self.stopping:
+                    return
+                stream = self._connect_stream(session)
+                if not session.live:
+                    self.start_polling(session, session.visit)
+                    return
+                if stream is None:
+                    continue
+            conn, response = stream
+            try:
+                while not self.stopping:
+                    line = response.readline()
+                    if not line:
+                        break
+                    if line.startswith(b'event:'):
+                        self._on_event(session, line[6:].strip().decode())
+            except (OSError, http.client.HTTPException):
+                pass
+            finally:
+                conn.close()
+            stream = None
+
+    def _on_event(self, session, event):
+        if self.measure_from <= time.perf_counter() < self.measure_until:
+            self.events += 1
+        # What the pages do with pushed events beyond updating the DOM
+        if event == 'activity' and session.page == 'activity':
+            self._push(time.perf_counter(), self.activity_since, session, session.visit)
+        elif event == 'tasks' and session.page == 'tasks':
+            self._push(time.perf_counter(), self.open_page, session, 'tasks')
+
+    # ─── Run ───
+
+    def setup(self):
+        """Log in once outside the measurement to learn the dashboard task ids."""
+        probe = Session(-1, random.Random(0))
+        form = urlencode({'username': USERNAME, 'password': PASSWORD}).encode()
+        self.request(probe, 'POST', '/login', '/login', body=form, content_type='application/x-www-form-urlencoded')
+        result = self.get(probe, '/api/tasks')
+        if not result or result[0] != 200:
+            raise SystemExit('ERROR: could not log in to the dashboard')
+        tasks = json.loads(result[2])
+        self.task_ids = [t['id'] for column in tasks.values() for t in column if t.get('source_type') == 'dashboard']
+        if self.args.task_moves > 0 and not self.task_ids:
+            print('  warning: the workspace has no dashboard tasks; task moves are off', file=sys.stderr)
+
+    def run(self):
+        self.setup()
+        dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        dispatcher.start()
+        start = time.perf_counter()
+        for session in self.sessions:
+            self._push(start + self.args.ramp * session.index / len(self.sessions), self.login, session)
+
+        self.measure_from = start + self.args.ramp
+        self.measure_until = self.measure_from + self.args.duration
+        time.sleep(max(self.measure_from - time.perf_counter(), 0))
+        cpu_before, counts_before = self.server.scrape()
+        process_before = self.server.cpu()
+        time.sleep(max(self.measure_until - time.perf_counter(), 0))
+
+        with self._cond:
+            self.stopping = True
+            self._cond.notify_all()
+        for sock in list(self._streams):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._pool.shutdown(wait=True)
+        process_cpu = self.server.cpu() - process_before
+        cpu_after, counts_after = self.server.scrape()
+        return self.summary(
+            {k: v - cpu_before.get(k, 0) for k, v in cpu_after.items()},
+            {k: v - counts_before.get(k, 0) for k, v in counts_after.items()},
+            process_cpu)
+
+    def summary(self, route_cpu, route_counts, process_cpu):
+        by_endpoint = {}
+        for endpoint, seconds, status in self.records:
+            by_endpoint.setdefault(endpoint, []).append((seconds, status))
+
+        duration = self.args.duration
+        endpoints = {}
+        for endpoint, samples in sorted(by_endpoint.items(), key=lambda item: -len(item[1])):
+            endpoints[endpoint] = self._stats(samples, duration)
+            served = route_counts.get(endpoint)
+            if endpoint in route_cpu and served:
+                endpoints[endpoint]['cpu_ms_per_request'] = round(route_cpu[endpoint] / served * 1000, 2)
+                endpoints[endpoint]['cpu_seconds'] = round(route_cpu[endpoint], 3)
+        lags = sorted(self.lags)
+        return {
+            'sessions': len(self.sessions),
+            'workers': self.workers,
+            'endpoints': endpoints,
+            'total': self._stats([s for samples in by_endpoint.values() for s in samples], duration),
+            'server_cpu_seconds': round(process_cpu, 3),
+            'server_cpu_percent': round(process_cpu / duration * 100, 1),
+            'request_cpu_seconds': round(sum(v for k, v in route_cpu.items() if k != 'GET /metrics'), 3),
+            'dispatch_lag_ms': {f'p{p}': round(percentile(lags, p) * 1000, 1) if lags else None
+                                for p in PERCENTILES},
+            'stream_events': self.events if self.args.live else None,
+            'client_failures': dict(self._failures),
+        }
+
+    @staticmethod
+    def _stats(samples, duration):
+        latencies = sorted(seconds for seconds, _ in samples)
+        errors = {}
+        for _, status in samples:
+            if status is None or status >= 400:
+                key = str(status or 'failed')
+                errors[key] = errors.get(key, 0) + 1
+        stats = {
+            'requests': len(samples),
+            'rps': round(len(samples) / duration, 2),
+            'errors': sum(errors.values()),
+            'error_rate': round(sum(errors.values()) / len(samples), 4) if samples else 0,
+            'error_statuses': errors,
+            'max_ms': round(latencies[-1] * 1000, 1) if latencies else None,
+        }
+        for p in PERCENTILES:
+            value = percentile(latencies, p)
+            stats[f'p{p}_ms'] = round(value * 1000, 1) if value is not None else None
+        return stats
+
+
+def _fmt(value, spec):
+    return '-' if value is None else format(value, spec)
+
+
+def _print_level(result):
+    print(f"\n{result['sessions']} sessions ({result['workers']} client workers)")
+    print(f"  {'endpoint':<32}{'reqs':>8}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'max ms':>9}{'errors':>8}{'cpu ms/req':>12}")
+    for endpoint, s in list(result['endpoints'].items()) + [('total', result['total'])]:
+        print(f"  {endpoint:<32}{s['requests']:>8}{s['rps']:>8.1f}{_fmt(s['p50_ms'], '.1f'):>9}"
+              f"{_fmt(s['p95_ms'], '.1f'):>9}{_fmt(s['p99_ms'], '.1f'):>9}{_fmt(s['max_ms'], '.1f'):>9}"
+              f"{s['error_rate']:>8.1%}{_fmt(s.get('cpu_ms_per_request'), '.2f'):>12}")
+    print(f"  server CPU: {result['server_cpu_seconds']:.1f} s ({result['server_cpu_percent']:.0f}% of one core),"
+          f" request threads {result['request_cpu_seconds']:.1f} s")
+    lag = result['dispatch_lag_ms']
+    print(f"  dispatch lag: p50 {_fmt(lag['p50'], '.1f')} ms, p99 {_fmt(lag['p99'], '.1f')} ms"
+          + (f"; stream events: {result['stream_events']}" if result['stream_events'] is not None else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', default='10', help='comma-separated levels, e.g. 10,25,50')
+    parser.add_argument('--duration', type=float, default=120, help='measured seconds per level')
+    parser.add_argument('--ramp', type=float, default=15, help='seconds to log all sessions in')
+    parser.add_argument('--speed', type=float, default=1)
+    parser.add_argument('--live', action='store_true', help='hold /api/stream open instead of polling')
+    parser.add_argument('--page-time', type=float, default=120)
+    parser.add_argument('--task-moves', type=float, default=0.5, help='per session per minute')
+    parser.add_argument('--note-adds', type=float, default=0.2, help='per session per minute')
+    parser.add_argument('--size', choices=SIZES, default='small')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'dashboard-bench'))
+    parser.add_argument('--workers', type=int, default=0, help='client threads (default: 2 per session)')
+    parser.add_argument('--watch', default='/api/status', help='endpoint summarised across levels')
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    try:
+        levels = [int(s) for s in args.sessions.split(',') if s.strip()]
+    except ValueError:
+        parser.error('--sessions takes comma-separated integers')
+    if not levels or min(levels) < 1 or args.speed <= 0 or args.duration <= 0 or args.page_time <= 0:
+        parser.error('--sessions, --speed, --duration and --page-time must be positive')
+
+    root = prepare(args.size, args.seed, args.workdir)
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'params': {k: v for k, v in vars(args).items() if k not in ('output', 'workdir')},
+        'levels': [],
+    }
+    for sessions in levels:
+        server = Server(root)
+        try:
+            server.wait_ready()
+            result = LoadTest(server, sessions, args).run()
+        finally:
+            server.stop()
+        results['levels'].append(result)
+        _print_level(result)
+
+    watch = f'GET {args.watch}'
+    if len(levels) > 1:
+        print(f'\n{watch} by sessions')
+        print(f"  {'sessions':>8}{'req/s':>8}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}{'server CPU':>12}")
+        for result in results['levels']:
+            s = result['endpoints'].get(watch)
+            if s:
+                print(f"  {result['sessions']:>8}{s['rps']:>8.1f}{_fmt(s['p50_ms'], '.1f'):>9}"
+                      f"{_fmt(s['p99_ms'], '.1f'):>9}{s['error_rate']:>8.1%}{result['server_cpu_percent']:>11.0f}%")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nresults: {output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Benchmark the utils collectors and API routes on synthetic workspaces.
+
+Usage:
+    python benchmarks/run.py [--sizes small,medium] [--repeat 5] [--seed 1]
+                             [--workdir DIR] [--output FILE]
+                             [--baseline benchmarks/baseline.json] [--threshold 0.25]
+                             [--save-baseline]
+
+For each size a workspace is generated once (see workspace.py) and cached
+under --workdir. Each size then runs in a fresh process pointed at its
+workspace, so module-level caches start cold. Every benchmark reports the
+first (cold) call and the median/min of --repeat further (warm) calls.
+
+Results are written as JSON. When the baseline file exists, warm medians
+are compared against it. A benchmark regresses when it is more than
+--threshold slower and at least NOISE_MS slower in absolute terms. The exit
+status is 1 when anything regressed. --save-baseline stores this run as
+the new baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+from workspace import SIZES, prepare, reset_data, workspace_env
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Differences below this are treated as noise, whatever the ratio
+NOISE_MS = 1.0
+
+ROUTES = [
+    '/',
+    '/activity',
+    '/api/activity',
+    '/api/activity?limit=500',
+    '/tasks',
+    '/api/tasks',
+    '/memory',
+    '/api/memory',
+    '/docs',
+    '/api/docs?limit=50',
+    '/notes',
+    '/api/notes',
+    '/api/search?q=deploy',
+    '/api/status',
+    '/api/system',
+    '/api/system/history?range=1d',
+    '/system',
+    '/emails',
+]
+
+
+def _collectors():
+    """(name, fn) pairs for the utils collectors, imported inside the worker."""
+    from config import TODO_PATHS, MEMORY_DIR
+    from utils import activity, docs, memory, status, system, tasks, search
+
+    latest_memory = (memory.get_memory_files() or [{}])[0].get('filename')
+    latest_path = os.path.join(MEMORY_DIR, latest_memory or 'missing.md')
+    return [
+        ('activity.get_today_activities', lambda: activity.get_today_activities(limit=10)),
+        ('activity.get_activities[all]', lambda: activity.get_activities(limit=500)),
+        ('activity.get_activity_feed', lambda: activity.get_activity_feed(limit=100)),
+        ('activity.parse_memory_file', lambda: activity.parse_memory_file(latest_path)),
+        ('tasks.parse_todo_file', lambda: tasks.parse_todo_file(TODO_PATHS[0])),
+        ('tasks.get_all_tasks', tasks.get_all_tasks),
+        ('tasks.get_task_stats', tasks.get_task_stats),
+        ('docs.get_all_docs', docs.get_all_docs),
+        ('docs.query_docs', lambda: docs.query_docs(limit=50)),
+        ('memory.get_memory_files', memory.get_memory_files),
+        ('memory.get_memory_stats', memory.get_memory_stats),
+        ('memory.get_memory_content', lambda: memory.get_memory_content(latest_memory)),
+        ('status.get_ai_status', status.get_ai_status),
+        ('system.get_system_info', system.get_system_info),
+        ('search.search', lambda: search.search('deploy')),
+    ]
+
+
+def _measure(fn, repeat):
+    start = time.perf_counter()
+    fn()
+    cold = time.perf_counter() - start
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        warm.append(time.perf_counter() - start)
+    return {
+        'cold_ms': round(cold * 1000, 3),
+        'median_ms': round(statistics.median(warm) * 1000, 3) if warm else None,
+        'min_ms': round(min(warm) * 1000, 3) if warm else None,
+    }
+
+
+def run_worker(repeat):
+    """Run every benchmark in this process (the environment selects the workspace)."""
+    results = {}
+    for name, fn in _collectors():
+        results[f'collector:{name}'] = _measure(fn, repeat)
+
+    import app as dashboard
+    client = dashboard.app.test_client()
+    with client.session_transaction() as sess:
+        sess['user'] = {'id': 'bench', 'username': 'bench', 'role': 'admin'}
+
+    for route in ROUTES:
+        def fetch(route=route):
+            response = client.get(route)
+            if response.status_code != 200:
+                raise RuntimeError(f'{route} returned {response.status_code}')
+            response.close()
+        results[f'route:{route}'] = _measure(fetch, repeat)
+    return results
+
+
+def _run_size(root, repeat):
+    env = dict(os.environ, **workspace_env(root))
+    reset_data(root)
+    # Measure full page work rather than placeholders, and keep the run quiet
+    env.update(DASHBOARD_WIDGET_TIMEOUT='60', EMAIL_CHECK_INTERVAL='0',
+               SLOW_REQUEST_MS='0', PROFILE_SAMPLE_RATE='0')
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', '--repeat', str(repeat)],
+                          cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f'ERROR: benchmark worker failed for {root}')
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """Return [(size, name, baseline ms, current ms)] for regressed benchmarks."""
+    regressions = []
+    for size, benchmarks in results['sizes'].items():
+        base_size = baseline.get('sizes', {}).get(size, {})
+        for name, current in benchmarks['results'].items():
+            base = base_size.get('results', {}).get(name)
+            if not base or base.get('median_ms') is None or current['median_ms'] is None:
+                continue
+            before, after = base['median_ms'], current['median_ms']
+            if after > before * (1 + threshold) and after - before >= NOISE_MS:
+                regressions.append((size, name, before, after))
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _print_table(size, benchmarks):
+    print(f"\n{size} ({', '.join(f'{k}={v:,}' for k, v in benchmarks['params'].items())})")
+    print(f"  {'benchmark':<44}{'cold ms':>10}{'median ms':>11}{'min ms':>10}")
+    for name, r in benchmarks['results'].items():
+        print(f"  {name:<44}{r['cold_ms']:>10.2f}{r['median_ms']:>11.2f}{r['min_ms']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='small', help='comma-separated: ' + ', '.join(SIZES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'dashboard-bench'))
+    parser.add_argument('--output')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.25)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.repeat)))
+        return 0
+
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'sizes': {},
+    }
+    for size in sizes:
+        root = prepare(size, args.seed, args.workdir)
+        results['sizes'][size] = {'params': dict(SIZES[size], seed=args.seed),
+                                  'results': _run_size(root, args.repeat)}
+        _print_table(size, results['sizes'][size])
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nresults: {output}')
+
+    status = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        print(f"baseline: {args.baseline} (commit {baseline.get('commit')}, "
+              f"threshold +{args.threshold:.0%})")
+        for size, name, before, after in regressions:
+            print(f'  REGRESSION {size} {name}: {before:.2f} ms -> {after:.2f} ms ({after / before:.2f}x)')
+        if regressions:
+            status = 1
+        else:
+            print('  no regressions')
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'baseline saved: {args.baseline}')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
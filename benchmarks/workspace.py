@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Generate a synthetic workspace at a realistic scale for benchmarks.
+
+Usage:
+    python benchmarks/workspace.py DIR [--size medium] [--seed 1]
+                                       [--days N] [--log-lines N] [--todo-tasks N]
+                                       [--docs N] [--sessions N]
+
+Creates three directories under DIR, matching the settings they stand in for:
+
+    DIR/workspace   WORKSPACE_DIR: memory/YYYY-MM-DD.md daily logs, MEMORY.md,
+                    TODO.md and markdown docs in first-level subdirectories
+    DIR/data        DATA_DIR: activity.log, tasks.json, notes.json
+    DIR/sessions    SESSIONS_DIR: sub-agent session JSON files
+
+Point the dashboard at it with the environment printed at the end.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from categorize import make_corpus
+
+# Defaults per size; individual counts can be overridden on the command line
+SIZES = {
+    'small': {'days': 90, 'log_lines': 20000, 'todo_tasks': 300, 'docs': 200, 'sessions': 200},
+    'medium': {'days': 365, 'log_lines': 500000, 'todo_tasks': 2000, 'docs': 1000, 'sessions': 1000},
+    'large': {'days': 3 * 365, 'log_lines': 3000000, 'todo_tasks': 10000, 'docs': 5000, 'sessions': 5000},
+}
+
+SECTIONS = ['Morning', 'Email', 'Deployments', 'Research', 'Planning', 'Maintenance', 'Evening']
+DOC_DIRS = ['projects', 'research', 'notes', 'reports', 'drafts']
+MANIFEST = 'workspace.json'
+
+# Files generate() writes to DATA_DIR; everything else there is run state
+GENERATED_DATA = {'activity.log', 'tasks.json', 'notes.json'}
+
+# Activity text is drawn from a fixed pool; generating every line is the slow part
+_CORPUS_SIZE = 20000
+
+
+def workspace_env(root):
+    """Environment variables that point the dashboard at a generated workspace."""
+    root = os.path.abspath(root)
+    return {
+        'WORKSPACE_DIR': os.path.join(root, 'workspace'),
+        'DATA_DIR': os.path.join(root, 'data'),
+        'SESSIONS_DIR': os.path.join(root, 'sessions'),
+    }
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def _memory_files(memory_dir, days, corpus, rng, today):
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        lines = [f'# {day:%Y-%m-%d}', '']
+        minute = rng.randint(6 * 60, 9 * 60)
+        for _ in range(rng.randint(3, 6)):
+            lines.append(f'## {minute // 60:02d}:{minute % 60:02d} {rng.choice(SECTIONS)}')
+            for _ in range(rng.randint(4, 12)):
+                minute = min(minute + rng.randint(1, 20), 23 * 60 + 59)
+                text = rng.choice(corpus)
+                if rng.random() < 0.5:
+                    lines.append(f'- **{minute // 60:02d}:{minute % 60:02d}** - {text}')
+                else:
+                    lines.append(f'- {text}')
+            lines.append('')
+        _write(os.path.join(memory_dir, f'{day:%Y-%m-%d}.md'), '\n'.join(lines))
+
+    _write(os.path.join(memory_dir, 'heartbeat-state.json'),
+           json.dumps({'lastChecks': {'email': time.time() - 300, 'calendar': time.time() - 1800}}))
+
+
+def _main_memory(path, corpus, rng):
+    lines = ['# MEMORY', '']
+    for section in SECTIONS:
+        lines += [f'## {section}', ''] + [f'- {rng.choice(corpus)}' for _ in range(40)] + ['']
+    _write(path, '\n'.join(lines))
+
+
+def _todo_file(path, count, corpus, rng):
+    markers = [' '] * 6 + ['x'] * 3 + ['~']
+    lines = ['# TODO', '']
+    for i in range(count):
+        if i % 25 == 0:
+            lines += ['', f'## {rng.choice(SECTIONS)} {i // 25 + 1}', '']
+        text = rng.choice(corpus)
+        if rng.random() < 0.2:
+            text = f'**{text}**'
+        lines.append(f'- [{rng.choice(markers)}] {text}')
+    _write(path, '\n'.join(lines) + '\n')
+
+
+def _docs(workspace, count, corpus, rng):
+    for i in range(count):
+        directory = os.path.join(workspace, DOC_DIRS[i % len(DOC_DIRS)])
+        lines = [f'# Document {i}', '']
+        for j in range(rng.randint(2, 8)):
+            lines += [f'## Part {j + 1}', '', ' '.join(rng.choice(corpus) for _ in range(5)), '']
+            lines += [f'- {rng.choice(corpus)}' for _ in range(rng.randint(2, 10))] + ['']
+        _write(os.path.join(directory, f'doc-{i:05d}.md'), '\n'.join(lines))
+
+
+def _activity_log(path, count, days, corpus, rng, now):
+    # Timestamps spread evenly over the period, oldest first (append-only order)
+    start = now - timedelta(days=days)
+    step = (now - start) / max(count, 1)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        batch = []
+        for i in range(count):
+            ts = (start + step * i).isoformat()
+            batch.append(f'{{"timestamp": "{ts}", "action": {json.dumps(rng.choice(corpus))}, '
+                         f'"source": "dashboard"}}\n')
+            if len(batch) >= 10000:
+                f.writelines(batch)
+                batch = []
+        f.writelines(batch)
+
+
+def _sessions(directory, count, rng, now):
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        path = os.path.join(directory, f'session-{i:05d}.json')
+        with open(path, 'w') as f:
+            json.dump({'id': i, 'task': f'subtask {i}', 'messages': rng.randint(1, 200)}, f)
+        # A handful are recent (active), the rest spread over the last month
+        age = rng.uniform(0, 300) if i < 3 else rng.uniform(600, 30 * 86400)
+        mtime = now.timestamp() - age
+        os.utime(path, (mtime, mtime))
+
+
+def _store_files(data_dir, corpus, rng):
+    columns = ['todo', 'in_progress', 'done']
+    tasks = [{
+        'id': f'bench-task-{i}',
+        'text': rng.choice(corpus),
+        'priority': rng.choice(['low', 'normal', 'high']),
+        'column': rng.choice(columns),
+        'section': rng.choice(SECTIONS),
+        'timestamp': datetime(2026, 1, 1).isoformat(),
+        'moved_at': None,
+    } for i in range(200)]
+    notes = [{
+        'id': f'bench-note-{i}',
+        'text': rng.choice(corpus),
+        'timestamp': datetime(2026, 1, 1, 0, i % 60).isoformat(),
+        'status': rng.choice(['pending', 'done']),
+    } for i in range(100)]
+    _write(os.path.join(data_dir, 'tasks.json'), json.dumps(tasks, indent=2))
+    _write(os.path.join(data_dir, 'notes.json'), json.dumps(notes, indent=2))
+
+
+def generate(root, days, log_lines, todo_tasks, docs, sessions, seed=1):
+    """Build the synthetic workspace under root; returns its manifest."""
+    rng = random.Random(seed)
+    corpus = make_corpus(_CORPUS_SIZE, seed)
+    env = workspace_env(root)
+    now = datetime.now()
+
+    _memory_files(os.path.join(env['WORKSPACE_DIR'], 'memory'), days, corpus, rng, now.date())
+    _main_memory(os.path.join(env['WORKSPACE_DIR'], 'MEMORY.md'), corpus, rng)
+    _todo_file(os.path.join(env['WORKSPACE_DIR'], 'TODO.md'), todo_tasks, corpus, rng)
+    _docs(env['WORKSPACE_DIR'], docs, corpus, rng)
+    _activity_log(os.path.join(env['DATA_DIR'], 'activity.log'), log_lines, days, corpus, rng, now)
+    _sessions(env['SESSIONS_DIR'], sessions, rng, now)
+    _store_files(env['DATA_DIR'], corpus, rng)
+
+    manifest = {
+        'params': {'days': days, 'log_lines': log_lines, 'todo_tasks': todo_tasks,
+                   'docs': docs, 'sessions': sessions, 'seed': seed},
+        'generated_at': now.isoformat(timespec='seconds'),
+        'env': env,
+    }
+    _write(os.path.join(root, MANIFEST), json.dumps(manifest, indent=2))
+    return manifest
+
+
+def load_manifest(root):
+    """Return the manifest of a previously generated workspace, or None."""
+    try:
+        with open(os.path.join(root, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def prepare(size, seed, workdir):
+    """Return the root of the cached workspace for size/seed, generating it if needed."""
+    root = os.path.join(workdir, f'{size}-seed{seed}')
+    params = dict(SIZES[size], seed=seed)
+    manifest = load_manifest(root)
+    if manifest is None or manifest['params'] != params:
+        if os.path.exists(root):
+            raise SystemExit(f'ERROR: {root} holds a different workspace; remove it first')
+        print(f'generating {size} workspace in {root} ...', flush=True)
+        start = time.perf_counter()
+        generate(root, seed=seed, **SIZES[size])
+        print(f'  done in {time.perf_counter() - start:.1f} s', flush=True)
+    return root
+
+
+def reset_data(root):
+    """Drop run state (database, search index, history) so a run starts from the generated files."""
+    data_dir = workspace_env(root)['DATA_DIR']
+    for name in os.listdir(data_dir):
+        if name not in GENERATED_DATA:
+            os.remove(os.path.join(data_dir, name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root')
+    parser.add_argument('--size', choices=SIZES, default='medium')
+    parser.add_argument('--seed', type=int, default=1)
+    for name in SIZES['small']:
+        parser.add_argument('--' + name.replace('_', '-'), type=int, dest=name)
+    args = parser.parse_args()
+
+    params = dict(SIZES[args.size])
+    params.update({k: v for k, v in vars(args).items() if k in params and v is not None})
+    if os.path.exists(args.root) and os.listdir(args.root):
+        print(f'ERROR: {args.root} exists and is not empty')
+        return 1
+
+    start = time.perf_counter()
+    manifest = generate(args.root, seed=args.seed, **params)
+    print(f"generated {args.root} in {time.perf_counter() - start:.1f} s: "
+          + ', '.join(f'{k}={v:,}' for k, v in manifest['params'].items()))
+    for key, value in manifest['env'].items():
+        print(f'export {key}={value}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -42,11 +42,26 @@ HEARTBEAT_STATE = os.path.join(MEMORY_DIR, 'heartbeat-state.json')
 # =============================================================================
 # Dashboard Data Directory
 # =============================================================================
-DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+# Defaults to data/ next to this file (overridden e.g. by the benchmarks)
+DATA_DIR = os.environ.get('DATA_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
 STATUS_FILE = os.path.join(DATA_DIR, 'status.json')
 TASKS_FILE = os.path.join(DATA_DIR, 'tasks.json')
 NOTES_FILE = os.path.join(DATA_DIR, 'notes.json')
+USERS_FILE = os.path.join(DATA_DIR, 'users.json')
 ACTIVITY_LOG = os.path.join(DATA_DIR, 'activity.log')
+SEARCH_INDEX_FILE = os.path.join(DATA_DIR, 'search-index.json')
+HISTORY_FILE = os.path.join(DATA_DIR, 'metrics-history.rrd')
+SLOW_REQUEST_LOG = os.path.join(DATA_DIR, 'slow-requests.log')
+
+# =============================================================================
+# Storage (tasks, notes, users)
+# =============================================================================
+# 'sqlite' (default) or 'json' (the plain data/*.json files)
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'sqlite').lower()
+# SQLite database; existing JSON files are imported into it on first use
+DATABASE_FILE = os.environ.get('DATABASE_FILE') or os.path.join(DATA_DIR, 'dashboard.db')
+# Seconds a write waits for another process holding the database lock
+DATABASE_TIMEOUT = float(os.environ.get('DATABASE_TIMEOUT', 10))
 
 # =============================================================================
 # Email Monitoring (optional)
@@ -66,6 +81,15 @@ if WATCHED_SENDERS_RAW:
             email, context = entry.split(':', 1)
             WATCHED_SENDERS.append({'email': email.strip(), 'context': context.strip()})
 
+# Seconds between background email checks (0 = only when requested)
+EMAIL_CHECK_INTERVAL = float(os.environ.get('EMAIL_CHECK_INTERVAL', 0))
+
+# =============================================================================
+# Background Jobs
+# =============================================================================
+# Worker threads for background jobs such as email checks
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+
 # =============================================================================
 # TODO File Paths (shown on dashboard)
 # =============================================================================
@@ -84,8 +108,103 @@ SESSIONS_DIR = os.environ.get(
 # =============================================================================
 # Document Browser Directories
 # =============================================================================
+# 'pattern' is a filename glob (default '*.md'); 'exclude' lists globs of
+# matching files to leave out; 'depth' is how many levels of subdirectories
+# to descend into (default 0 = the directory itself only)
 DOCS_SCAN_DIRS = [
     {'path': MEMORY_DIR, 'label': 'Memory Files'},
     {'path': WORKSPACE_DIR, 'label': 'Workspace Root', 'depth': 1},
-    {'path': DATA_DIR, 'label': 'Dashboard Data'},
+    # The database, lock files, metrics history, logs and the search index
+    # are internal state (and mostly binary), not documents
+    {'path': DATA_DIR, 'label': 'Dashboard Data', 'pattern': '*',
+     'exclude': ['*.db', '*.db-*', '*.lock', '*.rrd', '*.tmp', '*.log', '*.log.*', 'search-index.json']},
 ]
+
+# Seconds between re-checking sizes/mtimes of files in unchanged directories
+DOCS_REFRESH_INTERVAL = float(os.environ.get('DOCS_REFRESH_INTERVAL', 60))
+
+# =============================================================================
+# System Metrics Sampler
+# =============================================================================
+# Seconds between background CPU/memory/disk samples used by the System page
+SYSTEM_SAMPLE_INTERVAL = float(os.environ.get('SYSTEM_SAMPLE_INTERVAL', 5))
+
+# Seconds between writes of the metrics history to data/metrics-history.rrd
+HISTORY_FLUSH_INTERVAL = float(os.environ.get('HISTORY_FLUSH_INTERVAL', 60))
+
+# =============================================================================
+# Process Index
+# =============================================================================
+# Seconds a process-table scan is reused before rescanning
+PROCESS_INDEX_TTL = float(os.environ.get('PROCESS_INDEX_TTL', 10))
+
+# Max seconds a request waits for service probes that have no cached result
+SERVICE_PROBE_WAIT = float(os.environ.get('SERVICE_PROBE_WAIT', 1))
+
+# Seconds a computed /api/status payload is shared between concurrent requests
+STATUS_MAX_AGE = float(os.environ.get('STATUS_MAX_AGE', 2))
+
+# Seconds the dashboard waits for each widget before rendering a placeholder
+# that the page fills in afterwards
+DASHBOARD_WIDGET_TIMEOUT = float(os.environ.get('DASHBOARD_WIDGET_TIMEOUT', 0.5))
+
+# Max seconds /api/widgets/<name> waits for a late widget before giving up
+DASHBOARD_WIDGET_FETCH_TIMEOUT = float(os.environ.get('DASHBOARD_WIDGET_FETCH_TIMEOUT', 10))
+
+# =============================================================================
+# Metrics
+# =============================================================================
+# Bearer token that lets scrapers read /metrics; a logged-in admin can
+# always read it
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+# Serve /metrics without any authentication (only behind a trusted network)
+METRICS_PUBLIC = os.environ.get('METRICS_PUBLIC', 'false').lower() in ('true', '1', 'yes')
+
+# =============================================================================
+# Profiling
+# =============================================================================
+# Requests slower than this many milliseconds go to data/slow-requests.log
+# (0 = off)
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 0))
+
+# Profile one request in N and aggregate the results at /admin/profile (0 = off)
+PROFILE_SAMPLE_RATE = int(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+
+# =============================================================================
+# Activity Feed
+# =============================================================================
+# Entries per page on the Activity page (older pages load on demand)
+ACTIVITY_PAGE_SIZE = int(os.environ.get('ACTIVITY_PAGE_SIZE', 100))
+
+# =============================================================================
+# Caches
+# =============================================================================
+# Memory budget (bytes) for parsed daily memory logs used by the Activity page
+ACTIVITY_CACHE_BYTES = int(os.environ.get('ACTIVITY_CACHE_BYTES', 32 * 1024 * 1024))
+# Memory budget (bytes) for rendered markdown of memory files and docs
+MARKDOWN_CACHE_BYTES = int(os.environ.get('MARKDOWN_CACHE_BYTES', 16 * 1024 * 1024))
+# Memory budget (bytes) for parsed TODO.md files on the task board
+TODO_CACHE_BYTES = int(os.environ.get('TODO_CACHE_BYTES', 4 * 1024 * 1024))
+
+# =============================================================================
+# Search
+# =============================================================================
+# Minimum seconds between writes of the search index to disk
+SEARCH_SAVE_INTERVAL = float(os.environ.get('SEARCH_SAVE_INTERVAL', 30))
+# Minimum seconds between scans of the indexed files for changes; notes and
+# tasks are checked on every search
+SEARCH_REFRESH_INTERVAL = float(os.environ.get('SEARCH_REFRESH_INTERVAL', 10))
+
+# =============================================================================
+# Live Updates (Server-Sent Events)
+# =============================================================================
+# Seconds between checks for changed activity/notes/tasks files
+STREAM_INTERVAL = float(os.environ.get('STREAM_INTERVAL', 5))
+# Seconds between status (CPU/memory/AI) pushes
+STREAM_STATUS_INTERVAL = float(os.environ.get('STREAM_STATUS_INTERVAL', 15))
+# Seconds of silence before a keepalive comment is sent to each client
+STREAM_KEEPALIVE = float(os.environ.get('STREAM_KEEPALIVE', 20))
+# Most concurrent /api/stream clients per process; each holds a request
+# thread for as long as its tab is open. Pages beyond the cap fall back to
+# polling. 0 turns live updates off (use it with gunicorn sync workers).
+STREAM_MAX_CLIENTS = int(os.environ.get('STREAM_MAX_CLIENTS', 20))
@@ -0,0 +1,41 @@
+"""Shared test setup.
+
+config.py reads its paths from the environment at import time, so point
+DATA_DIR and WORKSPACE_DIR at a scratch directory before anything imports
+it. Tests that need their own files patch the module globals they use.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+_scratch = tempfile.mkdtemp(prefix='dashboard-tests-')
+os.environ['DATA_DIR'] = os.path.join(_scratch, 'data')
+os.environ['WORKSPACE_DIR'] = os.path.join(_scratch, 'workspace')
+os.environ['SESSIONS_DIR'] = os.path.join(_scratch, 'sessions')
+os.environ['STORAGE_BACKEND'] = 'sqlite'
+os.makedirs(os.environ['DATA_DIR'], exist_ok=True)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import storage  # noqa: E402
+
+
+@pytest.fixture
+def collections(tmp_path, monkeypatch):
+    """Point every collection's JSON file into tmp_path; returns name -> path."""
+    paths = {}
+    for name, spec in storage.COLLECTIONS.items():
+        paths[name] = str(tmp_path / os.path.basename(spec['file']))
+        monkeypatch.setitem(spec, 'file', paths[name])
+    return paths
+
+
+@pytest.fixture
+def store(tmp_path, collections, monkeypatch):
+    """A fresh SQLite store installed as the get_store() singleton."""
+    db = storage.SQLiteStore(str(tmp_path / 'dashboard.db'))
+    monkeypatch.setattr(storage, '_store', db)
+    return db
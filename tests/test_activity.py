@@ -0,0 +1,111 @@
+import json
+import os
+
+import pytest
+
+from utils import activity
+
+
+@pytest.fixture
+def feed(tmp_path, monkeypatch):
+    """Point the activity feed at an empty memory dir and activity log."""
+    memory_dir = tmp_path / 'memory'
+    memory_dir.mkdir()
+    log = tmp_path / 'activity.log'
+    monkeypatch.setattr(activity, 'MEMORY_DIR', str(memory_dir))
+    monkeypatch.setattr(activity, 'ACTIVITY_LOG', str(log))
+    monkeypatch.setattr(activity, '_activity_log', activity.ActivityLogReader(str(log)))
+    return memory_dir, log
+
+
+def write_memory(memory_dir, day, lines, mode='w'):
+    with open(os.path.join(memory_dir, f'{day}.md'), mode) as f:
+        f.write(''.join(f'- {line}\n' for line in lines))
+
+
+def write_log(log, stamps, mode='a'):
+    with open(log, mode) as f:
+        for i, stamp in enumerate(stamps):
+            f.write(json.dumps({'timestamp': stamp, 'action': f'log {stamp} #{i}'}) + '\n')
+
+
+def populate(memory_dir, log):
+    write_memory(memory_dir, '2026-01-01', ['09:00 - early', '09:00 - same minute', '12:00 - noon'])
+    write_memory(memory_dir, '2026-01-02', ['08:00 - morning', '10:00 - later', '10:00 - tie'])
+    write_memory(memory_dir, '2026-01-04', ['07:00 - only entry'])
+    write_log(log, ['2026-01-01T09:00:00', '2026-01-02T10:00:00', '2026-01-02T10:00:30',
+                    '2026-01-03T11:00:00', '2026-01-04T07:00:00'])
+
+
+def texts(entries):
+    return [(e['date'], e['text']) for e in entries]
+
+
+def page_through(limit, **kwargs):
+    pages, before = [], None
+    while True:
+        page = activity.get_activity_feed(limit=limit, before=before, **kwargs)
+        pages.append(page['activities'])
+        before = page['next_before']
+        if not before:
+            return pages
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 5, 100])
+def test_before_pages_return_every_entry_once(feed, limit):
+    populate(*feed)
+    everything = activity.get_activity_feed()['activities']
+    assert len(everything) == 12
+
+    pages = page_through(limit)
+    assert all(len(page) <= limit for page in pages)
+    assert texts(e for page in pages for e in page) == texts(everything)
+
+
+def test_before_paging_with_category(feed):
+    populate(*feed)
+    everything = activity.get_activity_feed(category='other')['activities']
+    pages = page_through(2, category='other')
+    assert texts(e for page in pages for e in page) == texts(everything)
+
+
+def test_since_returns_only_new_entries(feed):
+    memory_dir, log = feed
+    populate(memory_dir, log)
+    first = activity.get_activity_feed(limit=2)
+
+    write_log(log, ['2026-01-02T23:00:00', '2026-01-05T06:00:00'])
+    write_memory(memory_dir, '2026-01-04', ['08:00 - appended'], mode='a')
+    write_memory(memory_dir, '2026-01-05', ['09:00 - new day'])
+
+    update = activity.get_activity_feed(limit=2, since=first['cursor'])
+    assert not update['reset']
+    assert update['next_before'] is None
+    assert texts(update['activities']) == [
+        ('2026-01-05', 'new day'),
+        ('2026-01-05', 'log 2026-01-05T06:00:00 #1'),
+        ('2026-01-04', 'appended'),
+        ('2026-01-02', 'log 2026-01-02T23:00:00 #0'),
+    ]
+
+    # Nothing new since the latest cursor
+    again = activity.get_activity_feed(since=update['cursor'])
+    assert again['activities'] == []
+
+
+def test_since_resets_after_log_truncation(feed):
+    memory_dir, log = feed
+    populate(memory_dir, log)
+    cursor = activity.get_activity_feed()['cursor']
+
+    write_log(log, ['2026-01-06T10:00:00'], mode='w')
+    update = activity.get_activity_feed(since=cursor)
+    assert update['reset']
+    assert ('2026-01-06', 'log 2026-01-06T10:00:00 #0') in texts(update['activities'])
+
+
+def test_invalid_cursor_raises(feed):
+    with pytest.raises(ValueError):
+        activity.get_activity_feed(before='not-a-cursor')
+    with pytest.raises(ValueError):
+        activity.get_activity_feed(since=activity._encode_cursor([1, 2]))
@@ -0,0 +1,28 @@
+import pytest
+
+from utils.assets import minify_js, _bundle_js
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('var a = 1; // note\nvar b = 2;', 'var a = 1;\nvar b = 2;'),
+    ('/* block */\n\n    foo();\n', 'foo();'),
+    ('/*! license */\nfoo();', '/*! license */\nfoo();'),
+    ('a/**/b', 'a b'),
+    ('var s = "// not a comment /* nor this */";', 'var s = "// not a comment /* nor this */";'),
+    ("var s = 'it\\'s // here';", "var s = 'it\\'s // here';"),
+    ('var t = `a ${ "}" + `b // ${c}` } // d`;', 'var t = `a ${ "}" + `b // ${c}` } // d`;'),
+    ('var r = /\\/\\/[/*]/g; // tail', 'var r = /\\/\\/[/*]/g;'),
+    ('return /a*/.test(x)', 'return /a*/.test(x)'),
+    ('var half = total / 2; // 2 / 4', 'var half = total / 2;'),
+    ('x = a\n    ++b', 'x = a\n++b'),
+])
+def test_minify_js(source, expected):
+    assert minify_js(source) == expected
+
+
+def test_bundle_drops_sourcemaps_and_guards_each_file(tmp_path):
+    first = tmp_path / 'first.js'
+    first.write_text('var a = 1\n//# sourceMappingURL=data:application/json;base64,AAAA\n')
+    second = tmp_path / 'second.js'
+    second.write_text('(function () {})()\n')
+    assert _bundle_js([str(first), str(second)]) == 'var a = 1\n;(function () {})()\n'
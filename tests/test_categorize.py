@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from utils.activity import CATEGORY_MAP, KeywordCategorizer, categorize_lines, _categorize
+
+
+def baseline_categorize(text):
+    """The categorizer as it was before KeywordCategorizer, kept as the reference."""
+    t = text.lower()
+    if any(w in t for w in ['email', 'mail', 'inbox', 'smtp', 'imap']):
+        return 'email'
+    if any(w in t for w in ['message', 'telegram', 'discord', 'chat', 'sent', 'replied']):
+        return 'message'
+    if any(w in t for w in ['deploy', 'server', 'docker', 'system', 'restart', 'service', 'port']):
+        return 'system'
+    if any(w in t for w in ['memory', 'remember', 'note', 'heartbeat', 'journal']):
+        return 'memory'
+    if any(w in t for w in ['task', 'todo', 'done', 'complete', 'kanban', 'assign']):
+        return 'task'
+    if any(w in t for w in ['ai', 'agent', 'clawdbot', 'chitty', 'model', 'claude', 'sub-agent']):
+        return 'ai'
+    return 'other'
+
+
+def reference(text, category_map):
+    t = text.lower()
+    for cat, info in category_map.items():
+        if any(w.lower() in t for w in info.get('keywords', ())):
+            return cat
+    return 'other'
+
+
+KEYWORDS = [kw for info in CATEGORY_MAP.values() for kw in info.get('keywords', ())]
+
+
+def _fragments(rng, n):
+    """Lines glued together from keywords, keyword pieces and filler."""
+    pieces = KEYWORDS + [kw[:i] for kw in KEYWORDS for i in range(1, len(kw))] + [' ', '-', 'x', 'the']
+    return [''.join(rng.choice(pieces) for _ in range(rng.randint(0, 8))) for _ in range(n)]
+
+
+@pytest.mark.parametrize('text', [
+    '', 'nothing here', 'Sent an EMAIL', 'Restarted the docker service',
+    'Assigned a task to the sub-agent', 'Checked the inbox', 'mailbox', 'detail',
+    'reported', 'reminder', 'notebook', 'chatted with claude', 'said hi',
+])
+def test_matches_baseline_examples(text):
+    assert _categorize(text) == baseline_categorize(text)
+
+
+def test_matches_baseline_on_random_text():
+    rng = random.Random(7)
+    lines = _fragments(rng, 5000)
+    assert categorize_lines(lines) == [baseline_categorize(line) for line in lines]
+    assert [_categorize(line) for line in lines] == [baseline_categorize(line) for line in lines]
+
+
+def test_categorize_many_handles_embedded_newlines():
+    lines = ['first line\nwith email', 'task', 'plain']
+    assert categorize_lines(lines) == [baseline_categorize(line) for line in lines]
+
+
+def test_overlapping_keywords_in_custom_maps():
+    # Small alphabets force keywords that are prefixes of, or overlap, each other
+    rng = random.Random(3)
+    for _ in range(200):
+        category_map = {
+            f'c{i}': {'keywords': [''.join(rng.choice('ab') for _ in range(rng.randint(1, 4)))
+                                   for _ in range(rng.randint(1, 3))]}
+            for i in range(rng.randint(1, 4))
+        }
+        category_map['other'] = {}
+        categorizer = KeywordCategorizer(category_map)
+        texts = [''.join(rng.choice('abc') for _ in range(rng.randint(0, 12))) for _ in range(50)]
+        expected = [reference(text, category_map) for text in texts]
+        assert categorizer.categorize_many(texts) == expected, category_map
+        assert [categorizer.categorize(text) for text in texts] == expected, category_map
+
+
+def test_map_without_keywords_returns_default():
+    categorizer = KeywordCategorizer({'other': {}})
+    assert categorizer.categorize('email') == 'other'
+    assert categorizer.categorize_many(['a', 'b']) == ['other', 'other']
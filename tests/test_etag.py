@@ -0,0 +1,59 @@
+from flask import Flask
+
+from utils.etag import conditional
+
+
+def _app(version):
+    app = Flask(__name__)
+    calls = []
+
+    @app.route('/items')
+    @conditional(lambda: version[0])
+    def items():
+        calls.append(1)
+        return {'version': version[0]}
+
+    @app.route('/broken')
+    @conditional(lambda: version[0])
+    def broken():
+        calls.append(1)
+        return {'error': 'nope'}, 500
+
+    return app.test_client(), calls
+
+
+def test_matching_etag_returns_304_without_calling_view():
+    version = [1]
+    client, calls = _app(version)
+
+    first = client.get('/items')
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'no-cache'
+    etag = first.headers['ETag']
+    assert len(calls) == 1
+
+    cached = client.get('/items', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+    assert cached.headers['ETag'] == etag
+    assert len(calls) == 1
+
+
+def test_etag_changes_with_version_and_query():
+    version = [1]
+    client, calls = _app(version)
+    etag = client.get('/items').headers['ETag']
+
+    assert client.get('/items?page=2', headers={'If-None-Match': etag}).status_code == 200
+    version[0] = 2
+    refreshed = client.get('/items', headers={'If-None-Match': etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers['ETag'] != etag
+    assert len(calls) == 3
+
+
+def test_errors_are_not_tagged():
+    client, _ = _app([1])
+    response = client.get('/broken')
+    assert response.status_code == 500
+    assert 'ETag' not in response.headers
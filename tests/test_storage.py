@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from utils.storage import SQLiteStore, JSONStore, DuplicateError
+
+
+def _write(path, records):
+    with open(path, 'w') as f:
+        json.dump(records, f)
+
+
+def test_sqlite_imports_existing_json_once(tmp_path, collections):
+    _write(collections['tasks'], [
+        {'id': 'a', 'text': 'first', 'column': 'todo'},
+        {'id': 'b', 'text': 'second', 'column': 'done'},
+        {'text': 'no id is skipped'},
+        {'id': 'a', 'text': 'duplicate id is skipped'},
+    ])
+    _write(collections['users'], [{'id': 'u1', 'username': 'alice'}])
+
+    db = SQLiteStore(str(tmp_path / 'dashboard.db'))
+    assert [t['text'] for t in db.records('tasks')] == ['first', 'second']
+    assert db.find('tasks', 'column', 'done')['id'] == 'b'
+    assert db.find('users', 'username', 'alice')['id'] == 'u1'
+    assert db.count('notes') == 0
+
+    # The JSON file is left alone and not imported again into the same database
+    _write(collections['tasks'], [{'id': 'c', 'text': 'added later', 'column': 'todo'}])
+    reopened = SQLiteStore(str(tmp_path / 'dashboard.db'))
+    assert [t['id'] for t in reopened.records('tasks')] == ['a', 'b']
+
+
+def test_sqlite_revision_changes_only_on_writes(tmp_path, collections):
+    db = SQLiteStore(str(tmp_path / 'dashboard.db'))
+    versions = [db.version('tasks')]
+
+    def changed():
+        versions.append(db.version('tasks'))
+        return versions[-1] != versions[-2]
+
+    db.insert('tasks', {'id': 'a', 'text': 'one', 'column': 'todo'})
+    assert changed()
+    db.update('tasks', 'a', {'column': 'done'})
+    assert changed()
+    assert db.update('tasks', 'missing', {'column': 'done'}) is None
+    assert not changed()
+    assert db.bulk('tasks', updates=[('missing', {'column': 'done'})]) == [None]
+    assert not changed()
+    with pytest.raises(DuplicateError):
+        db.insert('tasks', {'id': 'a', 'text': 'again'})
+    assert not changed()
+    db.bulk('tasks', inserts=[{'id': 'b', 'text': 'two'}], updates=[('a', {'column': 'todo'})])
+    assert changed()
+    assert not db.delete('tasks', 'missing')
+    assert not changed()
+    assert db.delete('tasks', 'b')
+    assert changed()
+
+    # Other collections keep their own counter
+    notes = db.version('notes')
+    db.insert('tasks', {'id': 'c', 'text': 'three'})
+    assert db.version('notes') == notes
+
+
+def test_sqlite_versions_differ_between_databases(tmp_path, collections):
+    first = SQLiteStore(str(tmp_path / 'one.db'))
+    second = SQLiteStore(str(tmp_path / 'two.db'))
+    assert first.version('tasks') != second.version('tasks')
+
+
+def test_sqlite_tasks_without_column_count_as_null(tmp_path, collections):
+    db = SQLiteStore(str(tmp_path / 'dashboard.db'))
+    db.insert('tasks', {'id': 'a', 'text': 'legacy task'})
+    db.insert('tasks', {'id': 'b', 'text': 'todo task', 'column': 'todo'})
+    assert db.count('tasks', column=None) == 1
+    assert db.count('tasks', column='todo') == 1
+
+
+def test_json_bulk_no_op_leaves_file_untouched(collections):
+    db = JSONStore()
+    db.insert('tasks', {'id': 'a', 'text': 'one', 'column': 'todo'})
+    version = db.version('tasks')
+    assert db.bulk('tasks', updates=[('missing', {'column': 'done'})]) == [None]
+    assert db.version('tasks') == version
+    with pytest.raises(DuplicateError):
+        db.bulk('tasks', inserts=[{'id': 'a', 'text': 'again'}])
+    assert db.records('tasks') == [{'id': 'a', 'text': 'one', 'column': 'todo'}]
@@ -0,0 +1,65 @@
+import pytest
+
+from utils import tasks
+
+
+@pytest.fixture
+def todo(tmp_path, store, monkeypatch):
+    """A TODO.md on the board, a fresh store and a scratch activity log."""
+    path = tmp_path / 'TODO.md'
+    path.write_text('# Work\n- [ ] write tests\n- [x] ship it\nnot a task\n')
+    monkeypatch.setattr(tasks, 'TODO_PATHS', [str(path)])
+    monkeypatch.setattr(tasks, 'ACTIVITY_LOG', str(tmp_path / 'activity.log'))
+    return path
+
+
+def test_batch_reports_each_operation(todo, store):
+    store.insert('tasks', {'id': 'd1', 'text': 'dashboard', 'column': 'todo'})
+    results = tasks.apply_task_batch([
+        {'op': 'add', 'text': 'new task', 'priority': 'high'},
+        {'op': 'move', 'source_type': 'dashboard', 'id': 'd1', 'column': 'done'},
+        {'op': 'move', 'source_type': 'file', 'source_file': str(todo), 'line_num': 2, 'column': 'in_progress'},
+        {'op': 'move', 'source_type': 'file', 'source_file': str(todo), 'line_num': 4, 'column': 'done'},
+        {'op': 'move', 'source_type': 'file', 'source_file': str(todo), 'line_num': 'two', 'column': 'done'},
+        {'op': 'move', 'source_type': 'dashboard', 'id': 'missing', 'column': 'done'},
+        {'op': 'move', 'source_type': 'dashboard', 'column': 'done'},
+        {'op': 'add', 'text': '   '},
+        {'op': 'add', 'text': 'bad column', 'column': 'later'},
+        {'op': 'rename'},
+        'not an object',
+    ])
+
+    assert [r['status'] for r in results] == ['ok', 'ok', 'ok'] + ['error'] * 8
+    assert [r.get('error') for r in results[3:]] == [
+        'line not found or not a task',
+        'line_num must be an integer',
+        'task not found',
+        'id required for dashboard tasks',
+        'text is required',
+        'valid column (todo/in_progress/done) required',
+        'valid column (todo/in_progress/done) required',
+        'operation must be an object',
+    ]
+    added = results[0]['task']
+    assert store.get('tasks', added['id'])['priority'] == 'high'
+    assert store.get('tasks', 'd1')['column'] == 'done'
+    assert results[2]['task']['new_line'] == '- [~] write tests'
+    assert todo.read_text().splitlines()[1:3] == ['- [~] write tests', '- [x] ship it']
+
+
+def test_batch_rejects_files_not_on_the_board(todo, tmp_path):
+    other = tmp_path / 'other.md'
+    other.write_text('- [ ] private\n')
+    results = tasks.apply_task_batch([
+        {'op': 'move', 'source_type': 'file', 'source_file': str(other), 'line_num': 1, 'column': 'done'},
+        {'op': 'move', 'source_type': 'file', 'source_file': str(todo) + '/../TODO.md', 'line_num': 2, 'column': 'done'},
+    ])
+    assert results == [{'status': 'error', 'error': 'unknown source_file'}] * 2
+    assert other.read_text() == '- [ ] private\n'
+    assert '- [ ] write tests' in todo.read_text()
+
+
+def test_task_stats_count_tasks_without_column_as_todo(todo, store):
+    store.insert('tasks', {'id': 'legacy', 'text': 'no column'})
+    store.insert('tasks', {'id': 'doing', 'text': 'busy', 'column': 'in_progress'})
+    assert tasks.get_task_stats() == {'todo': 2, 'in_progress': 1, 'done': 1, 'total': 4}
@@ -2,37 +2,152 @@ import os
 import re
 import glob
 import json
+import base64
+import heapq
+import threading
+from collections import OrderedDict
+from itertools import islice
 from datetime import datetime, date
-from config import MEMORY_DIR, ACTIVITY_LOG
+from config import MEMORY_DIR, ACTIVITY_LOG, ACTIVITY_CACHE_BYTES
+from utils.cache import FileCache
+from utils.etag import file_signature
+from utils.metrics import timed
 
 
+# Categories are matched in order: the first category (top to bottom) with a
+# keyword anywhere in the text wins. Keywords match as plain substrings.
 CATEGORY_MAP = {
-    'email': {'icon': 'email', 'emoji': '📧', 'label': 'Email'},
-    'message': {'icon': 'chat', 'emoji': '💬', 'label': 'Message'},
-    'system': {'icon': 'settings', 'emoji': '🔧', 'label': 'System'},
-    'memory': {'icon': 'psychology', 'emoji': '📝', 'label': 'Memory'},
-    'task': {'icon': 'check_circle', 'emoji': '✅', 'label': 'Task'},
-    'ai': {'icon': 'smart_toy', 'emoji': '🤖', 'label': 'AI Action'},
+    'email': {'icon': 'email', 'emoji': '📧', 'label': 'Email',
+              'keywords': ['email', 'mail', 'inbox', 'smtp', 'imap']},
+    'message': {'icon': 'chat', 'emoji': '💬', 'label': 'Message',
+                'keywords': ['message', 'telegram', 'discord', 'chat', 'sent', 'replied']},
+    'system': {'icon': 'settings', 'emoji': '🔧', 'label': 'System',
+               'keywords': ['deploy', 'server', 'docker', 'system', 'restart', 'service', 'port']},
+    'memory': {'icon': 'psychology', 'emoji': '📝', 'label': 'Memory',
+               'keywords': ['memory', 'remember', 'note', 'heartbeat', 'journal']},
+    'task': {'icon': 'check_circle', 'emoji': '✅', 'label': 'Task',
+             'keywords': ['task', 'todo', 'done', 'complete', 'kanban', 'assign']},
+    'ai': {'icon': 'smart_toy', 'emoji': '🤖', 'label': 'AI Action',
+           'keywords': ['ai', 'agent', 'clawdbot', 'chitty', 'model', 'claude', 'sub-agent']},
     'other': {'icon': 'fiber_manual_record', 'emoji': '⚪', 'label': 'Other'},
 }
 
 
+def _trie_pattern(words):
+    """Build a prefix-factored alternation regex matching any of words.
+
+    Factoring shared prefixes lets the regex engine rule out most positions
+    after one or two characters instead of trying every keyword in turn.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        optional = '' in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if optional else group
+
+    return build(trie)
+
+
+class KeywordCategorizer:
+    """Single-pass keyword categorizer compiled from a category map.
+
+    All keywords are compiled into one trie-shaped regex and the text is
+    scanned left to right once; the earliest category seen wins, giving the
+    same result as checking each category's keywords in order. The regex
+    prefers the longest keyword at a position, so each keyword's rank also
+    covers shorter keywords that are its prefix. After a match the scan
+    normally resumes at its end, and only backs up when a better-ranked
+    keyword could start inside the matched text.
+    """
+
+    def __init__(self, category_map, default='other'):
+        self.categories = [c for c, info in category_map.items() if info.get('keywords')]
+        self._names = self.categories + [default]
+        ranks = {}
+        for rank, cat in enumerate(self.categories):
+            for kw in category_map[cat]['keywords']:
+                ranks.setdefault(kw.lower(), rank)
+        self._rank = {
+            kw: min(r for k, r in ranks.items() if kw.startswith(k))
+            for kw in ranks
+        }
+        # For each keyword, whether a better-ranked keyword can overlap its tail
+        self._backtrack = {
+            kw: any(
+                self._rank[other] < self._rank[kw]
+                and (other.startswith(kw[i:]) or kw[i:].startswith(other))
+                for i in range(1, len(kw))
+                for other in ranks
+            )
+            for kw in ranks
+        }
+        self._regex = re.compile(_trie_pattern(ranks)) if ranks else None
+
+    def _scan(self, lowered_texts):
+        """Yield the category key for each already-lowercased text."""
+        names = self._names
+        none = len(self.categories)
+        if self._regex is None:
+            for _ in lowered_texts:
+                yield names[none]
+            return
+        search = self._regex.search
+        rank = self._rank
+        backtrack = self._backtrack
+        for text in lowered_texts:
+            best = none
+            m = search(text)
+            while m:
+                kw = m.group()
+                r = rank[kw]
+                if r < best:
+                    best = r
+                    if r == 0:
+                        break
+                m = search(text, m.start() + 1 if backtrack[kw] else m.end())
+            yield names[best]
+
+    def categorize(self, text):
+        """Return the category key for a single piece of text."""
+        return next(self._scan((text.lower(),)))
+
+    def categorize_many(self, texts):
+        """Return category keys for a list of texts, lowercasing them in one pass."""
+        lowered = '\n'.join(texts).lower().split('\n')
+        if len(lowered) != len(texts):
+            lowered = [t.lower() for t in texts]
+        return list(self._scan(lowered))
+
+
+_categorizer = KeywordCategorizer(CATEGORY_MAP)
+
+
+def set_category_map(category_map):
+    """Replace the category map and recompile the categorizer."""
+    global CATEGORY_MAP, _categorizer
+    CATEGORY_MAP = category_map
+    _categorizer = KeywordCategorizer(category_map)
+
+
 def _categorize(text):
     """Categorize activity text."""
-    t = text.lower()
-    if any(w in t for w in ['email', 'mail', 'inbox', 'smtp', 'imap']):
-        return 'email'
-    if any(w in t for w in ['message', 'telegram', 'discord', 'chat', 'sent', 'replied']):
-        return 'message'
-    if any(w in t for w in ['deploy', 'server', 'docker', 'system', 'restart', 'service', 'port']):
-        return 'system'
-    if any(w in t for w in ['memory', 'remember', 'note', 'heartbeat', 'journal']):
-        return 'memory'
-    if any(w in t for w in ['task', 'todo', 'done', 'complete', 'kanban', 'assign']):
-        return 'task'
-    if any(w in t for w in ['ai', 'agent', 'clawdbot', 'chitty', 'model', 'claude', 'sub-agent']):
-        return 'ai'
-    return 'other'
+    return _categorizer.categorize(text)
+
+
+def categorize_lines(texts):
+    """Categorize a batch of activity texts at once."""
+    return _categorizer.categorize_many(texts)
 
 
 def parse_memory_file(filepath):
@@ -71,87 +186,387 @@ def parse_memory_file(filepath):
                 text = time_match.group(2)
 
             if text:
-                cat = _categorize(text)
-                entry = {
+                entries.append({
                     'date': file_date,
                     'time': current_time or '',
                     'section': current_section,
                     'text': text,
-                    'icon': CATEGORY_MAP[cat]['icon'],
-                    'emoji': CATEGORY_MAP[cat]['emoji'],
-                    'category': cat,
-                    'category_label': CATEGORY_MAP[cat]['label'],
                     'source': 'memory',
-                }
-                entries.append(entry)
+                    'seq': len(entries),
+                })
+
+    for entry, cat in zip(entries, categorize_lines([e['text'] for e in entries])):
+        info = CATEGORY_MAP[cat]
+        entry.update({
+            'icon': info['icon'],
+            'emoji': info['emoji'],
+            'category': cat,
+            'category_label': info['label'],
+        })
 
     return entries
 
 
-def _load_dashboard_activity():
-    """Load entries from the dashboard activity log (JSONL)."""
-    entries = []
-    if not os.path.exists(ACTIVITY_LOG):
-        return entries
+# Parsed daily memory logs, re-parsed only when a file's mtime or size changes
+_memory_cache = FileCache(parse_memory_file, ACTIVITY_CACHE_BYTES)
+
+
+def _parse_memory_cached(filepath):
+    """Return parsed entries for a memory file, reusing the cached parse."""
+    return _memory_cache.get(filepath, default=[])
 
+
+def get_cache_stats():
+    """Return hit/miss counters for the memory log parse cache."""
+    return _memory_cache.stats()
+
+
+def _parse_log_line(line):
+    """Parse one activity.log JSONL line into an entry dict, or None."""
+    line = line.strip()
+    if not line:
+        return None
     try:
-        with open(ACTIVITY_LOG, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
+        data = json.loads(line)
+        ts = data.get('timestamp', '')
+        dt = datetime.fromisoformat(ts) if ts else datetime.now()
+        cat = _categorize(data.get('action', ''))
+        return {
+            'date': dt.strftime('%Y-%m-%d'),
+            'time': dt.strftime('%H:%M'),
+            'section': 'Dashboard',
+            'text': data.get('action', ''),
+            'icon': CATEGORY_MAP[cat]['icon'],
+            'emoji': CATEGORY_MAP[cat]['emoji'],
+            'category': cat,
+            'category_label': CATEGORY_MAP[cat]['label'],
+            'source': 'dashboard',
+        }
+    except Exception:
+        return None
+
+
+# Cheap date extraction used while indexing, so lines are only fully parsed on demand
+_LOG_DATE_RE = re.compile(rb'"timestamp":\s*"(\d{4}-\d{2}-\d{2})')
+
+# Bytes read at a time while indexing the log
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+class ActivityLogReader:
+    """Incremental reader for the append-only dashboard activity log.
+
+    Only bytes appended since the last call are scanned. Each scanned line is
+    indexed by date into byte ranges, so a date-filtered query seeks straight
+    to its region instead of reading the whole file. Parsed entries are kept
+    for the most recently used dates. Truncation or rotation (inode change or
+    the file shrinking) resets the index.
+    """
+
+    def __init__(self, path, max_cached_dates=64):
+        self.path = path
+        self.max_cached_dates = max_cached_dates
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, inode):
+        self._inode = inode
+        self._offset = 0
+        self._ranges = {}  # date -> [[start, end], ...] in file order
+        self._last = None  # (date, range) of the last indexed line
+        self._parsed = OrderedDict()  # date -> entries, LRU
+
+    def _refresh(self):
+        """Index any complete lines appended since the last refresh."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._reset(None)
+            return
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            self._reset(st.st_ino)
+        if st.st_size == self._offset:
+            return
+
+        # Read in chunks so the first index of a large log doesn't load it whole
+        pos = self._offset
+        remaining = st.st_size - pos
+        tail = b''
+        with open(self.path, 'rb') as f:
+            f.seek(pos)
+            while remaining > 0:
+                chunk = f.read(min(READ_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                data = tail + chunk
+                # Leave a partially written trailing line for the next refresh
+                cut = data.rfind(b'\n')
+                if cut < 0:
+                    tail = data
                     continue
-                try:
-                    data = json.loads(line)
-                    ts = data.get('timestamp', '')
-                    dt = datetime.fromisoformat(ts) if ts else datetime.now()
-                    cat = _categorize(data.get('action', ''))
-                    entries.append({
-                        'date': dt.strftime('%Y-%m-%d'),
-                        'time': dt.strftime('%H:%M'),
-                        'section': 'Dashboard',
-                        'text': data.get('action', ''),
-                        'icon': CATEGORY_MAP[cat]['icon'],
-                        'emoji': CATEGORY_MAP[cat]['emoji'],
-                        'category': cat,
-                        'category_label': CATEGORY_MAP[cat]['label'],
-                        'source': 'dashboard',
-                    })
-                except Exception:
+                tail = data[cut + 1:]
+                pos = self._index_lines(data[:cut + 1], pos)
+        self._offset = pos
+
+    def _index_lines(self, data, pos):
+        """Index complete lines starting at byte offset pos; returns the end offset."""
+        for raw in data.splitlines(keepends=True):
+            start, pos = pos, pos + len(raw)
+            match = _LOG_DATE_RE.search(raw)
+            entry = None
+            if match:
+                day = match.group(1).decode()
+            else:
+                entry = _parse_log_line(raw.decode('utf-8', 'replace'))
+                if entry is None:
                     continue
-    except Exception:
-        pass
-    return entries
+                day = entry['date']
 
+            if self._last and self._last[0] == day and self._last[1][1] == start:
+                self._last[1][1] = pos
+            else:
+                rng = [start, pos]
+                self._ranges.setdefault(day, []).append(rng)
+                self._last = (day, rng)
 
-def get_activities(target_date=None, limit=None, category=None):
-    """Get activities, optionally filtered by date and category."""
-    if target_date:
-        filepath = os.path.join(MEMORY_DIR, f'{target_date}.md')
-        entries = parse_memory_file(filepath)
-    else:
+            if day in self._parsed:
+                if entry is None:
+                    entry = _parse_log_line(raw.decode('utf-8', 'replace'))
+                if entry is not None:
+                    entry['seq'] = start
+                    self._parsed[day].append(entry)
+        return pos
+
+    def _load_date(self, day):
+        """Parse the byte ranges indexed for a date."""
         entries = []
-        pattern = os.path.join(MEMORY_DIR, '*.md')
-        for filepath in sorted(glob.glob(pattern), reverse=True):
-            filename = os.path.basename(filepath)
-            if not re.match(r'\d{4}-\d{2}-\d{2}\.md', filename):
+        with open(self.path, 'rb') as f:
+            for start, end in self._ranges.get(day, []):
+                f.seek(start)
+                pos = start
+                for raw in f.read(end - start).splitlines(keepends=True):
+                    entry = _parse_log_line(raw.decode('utf-8', 'replace'))
+                    if entry is not None:
+                        entry['seq'] = pos
+                        entries.append(entry)
+                    pos += len(raw)
+        return entries
+
+    def _entries_for(self, day):
+        if day in self._parsed:
+            self._parsed.move_to_end(day)
+            return self._parsed[day]
+        if day not in self._ranges:
+            return []
+        entries = self._load_date(day)
+        self._parsed[day] = entries
+        while len(self._parsed) > self.max_cached_dates:
+            self._parsed.popitem(last=False)
+        return entries
+
+    def dates(self):
+        """Return the dates present in the log, newest first."""
+        with self._lock:
+            try:
+                self._refresh()
+            except OSError:
+                return []
+            return sorted(self._ranges, reverse=True)
+
+    def position(self):
+        """Return (inode, offset) of the end of the indexed log."""
+        with self._lock:
+            try:
+                self._refresh()
+            except OSError:
+                pass
+            return self._inode, self._offset
+
+    def dates_since(self, offset):
+        """Return dates with lines at or after byte offset, newest first."""
+        with self._lock:
+            try:
+                self._refresh()
+            except OSError:
+                return []
+            return sorted((day for day, ranges in self._ranges.items() if ranges[-1][1] > offset),
+                          reverse=True)
+
+    def entries(self, target_date=None):
+        """Return log entries for one date, or for every date when None."""
+        with self._lock:
+            try:
+                self._refresh()
+                if target_date:
+                    return list(self._entries_for(target_date))
+                entries = []
+                for day in sorted(self._ranges):
+                    entries.extend(self._entries_for(day))
+                return entries
+            except OSError:
+                return []
+
+
+_activity_log = ActivityLogReader(ACTIVITY_LOG)
+
+
+def _load_dashboard_activity(target_date=None):
+    """Load entries from the dashboard activity log (JSONL)."""
+    return _activity_log.entries(target_date)
+
+
+def _time_key(entry):
+    return entry['time']
+
+
+def _iter_activities(dates, category=None):
+    """Yield entries newest first, parsing one date at a time.
+
+    Every source is partitioned by date (one memory file per day, per-day
+    ranges of the activity log), so walking dates in descending order and
+    merging that day's sources with a heap yields the same order as sorting
+    the full history, but only touches the dates the caller consumes.
+    """
+    for day in dates:
+        memory = sorted(_parse_memory_cached(os.path.join(MEMORY_DIR, f'{day}.md')),
+                        key=_time_key, reverse=True)
+        dashboard = sorted(_load_dashboard_activity(day), key=_time_key, reverse=True)
+        for entry in heapq.merge(memory, dashboard, key=_time_key, reverse=True):
+            if category and entry.get('category') != category:
                 continue
-            entries.extend(parse_memory_file(filepath))
+            yield entry
 
-    # Add dashboard activity log entries
-    dash_entries = _load_dashboard_activity()
-    if target_date:
-        dash_entries = [e for e in dash_entries if e['date'] == target_date]
-    entries.extend(dash_entries)
 
-    # Sort by date+time descending (newest first)
-    entries.sort(key=lambda e: (e['date'], e['time']), reverse=True)
+def _all_dates():
+    """Every date with memory or dashboard activity, newest first."""
+    return sorted(set(get_available_dates()) | set(_activity_log.dates()), reverse=True)
 
-    if category:
-        entries = [e for e in entries if e.get('category') == category]
 
+@timed('get_activities')
+def get_activities(target_date=None, limit=None, category=None):
+    """Get activities, optionally filtered by date and category."""
+    dates = [target_date] if target_date else _all_dates()
+    entries = _iter_activities(dates, category=category)
     if limit:
-        entries = entries[:limit]
-    return entries
+        return list(islice(entries, limit))
+    return list(entries)
+
+
+# ─── Cursors ───
+#
+# Feed order is newest date first, then newest time first; entries with the
+# same date and time keep memory-file order, then activity-log order. An
+# entry's position is therefore (date, time, source rank, seq), where seq is
+# its index in the day's memory file or its byte offset in activity.log.
+#
+# A feed cursor is a high-water mark of what existed when it was issued: the
+# log's inode and indexed length, plus the newest memory file and how many
+# entries it had. Entries appended to either later fall outside it.
+
+_SOURCE_RANK = {'memory': 0, 'dashboard': 1}
+
+
+def _encode_cursor(data):
+    raw = json.dumps(data, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor(token, length):
+    """Decode a cursor into a list of `length` values (ValueError if invalid)."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError('invalid cursor') from e
+    if not isinstance(data, list) or len(data) != length:
+        raise ValueError('invalid cursor')
+    return data
+
+
+def _entry_position(entry):
+    return [entry['date'], entry['time'], _SOURCE_RANK[entry['source']], entry.get('seq', 0)]
+
+
+def _is_older(entry, position):
+    """True if entry comes after position in feed order."""
+    key, pos_key = (entry['date'], entry['time']), (position[0], position[1])
+    if key != pos_key:
+        return key < pos_key
+    return (_SOURCE_RANK[entry['source']], entry.get('seq', 0)) > (position[2], position[3])
+
+
+def _high_water_mark():
+    inode, offset = _activity_log.position()
+    dates = get_available_dates()
+    newest = dates[0] if dates else ''
+    count = len(_parse_memory_cached(os.path.join(MEMORY_DIR, f'{newest}.md'))) if newest else 0
+    return [inode, offset, newest, count]
+
+
+def _within_mark(entry, mark):
+    """True if entry already existed when mark was taken."""
+    if entry['source'] == 'dashboard':
+        return entry.get('seq', 0) < mark[1]
+    return entry['date'] < mark[2] or (entry['date'] == mark[2] and entry.get('seq', 0) < mark[3])
+
+
+def get_activity_feed(target_date=None, limit=None, category=None, since=None, before=None):
+    """Return a page of activities with cursors for incremental fetching.
+
+    - since: a previous response's `cursor`; only entries added after it are
+      returned (newest first, not limited). `reset` is true when the activity
+      log was rotated or truncated and the client should reload from scratch.
+    - before: a previous response's `next_before`; returns the next older
+      page, for paging back through history.
+
+    Raises ValueError for a malformed cursor.
+    """
+    mark = _high_water_mark()
+    reset = False
+    old_mark = _decode_cursor(since, 4) if since else None
+    position = _decode_cursor(before, 4) if before and not since else None
+
+    # A log that was rotated or truncated invalidates offsets (a log that
+    # didn't exist yet had offset 0, so everything in it now is new)
+    if old_mark and old_mark[0] is not None and (old_mark[0] != mark[0] or old_mark[1] > mark[1]):
+        old_mark, reset = None, True
+
+    if old_mark:
+        # Only dates that can hold new entries: the newest memory files and
+        # log days with lines past the old offset
+        candidates = {d for d in get_available_dates() if d >= old_mark[2]}
+        candidates.update(_activity_log.dates_since(old_mark[1]))
+        dates = sorted(candidates, reverse=True)
+    elif position:
+        dates = [d for d in _all_dates() if d <= position[0]]
+    else:
+        dates = _all_dates()
+    if target_date:
+        dates = [d for d in dates if d == target_date]
+
+    entries = (e for e in _iter_activities(dates, category=category) if _within_mark(e, mark))
+    if old_mark:
+        entries = (e for e in entries if not _within_mark(e, old_mark))
+    if position:
+        entries = (e for e in entries if _is_older(e, position))
+    # A since= response must be complete, or its cursor would skip entries
+    page = list(islice(entries, limit)) if limit and not old_mark else list(entries)
+
+    return {
+        'activities': page,
+        'count': len(page),
+        'cursor': _encode_cursor(mark),
+        'next_before': _encode_cursor(_entry_position(page[-1])) if page and not old_mark else None,
+        'reset': reset,
+    }
+
+
+def get_activity_version(target_date=None):
+    """Return a cheap version of the activity sources (for ETags)."""
+    if target_date:
+        return file_signature(os.path.join(MEMORY_DIR, f'{target_date}.md'), ACTIVITY_LOG)
+    daily = [os.path.join(MEMORY_DIR, f'{d}.md') for d in get_available_dates()]
+    return file_signature(ACTIVITY_LOG, *daily)
 
 
 def get_today_activities(limit=10):
@@ -0,0 +1,367 @@
+"""Fingerprinted, precompressed static asset bundles.
+
+Build step (run after changing static CSS/JS):
+
+    python -m utils.assets
+
+Every `{% call bundle('name.css') %} ... {% endcall %}` block in
+templates/base.html is bundled: the stylesheets or scripts it references via
+url_for('static', ...) are minified and concatenated, written to
+static/dist/ under a content-hashed name with .gz (and .br, when the optional
+`brotli` package is installed) siblings, and recorded in
+static/dist/manifest.json. Without a manifest the template falls back to the
+original individual tags.
+"""
+
+import os
+import re
+import json
+import gzip
+import hashlib
+import threading
+from flask import request, send_file, abort, url_for
+from markupsafe import Markup
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz variants are produced without it
+    brotli = None
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_FILE = os.path.join(DIST_DIR, 'manifest.json')
+BUNDLE_TEMPLATES = [os.path.join(BASE_DIR, 'templates', 'base.html')]
+
+# One year; fingerprinted names never change content
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+_BUNDLE_RE = re.compile(r"{%-?\s*call\s+bundle\(\s*'([^']+)'\s*\)\s*-?%}(.*?){%-?\s*endcall\s*-?%}", re.S)
+_STATIC_REF_RE = re.compile(r"url_for\(\s*'static'\s*,\s*filename\s*=\s*'([^']+)'\s*\)")
+_CSS_TOKEN_RE = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*.*?\*/)''', re.S)
+_CSS_URL_RE = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+_CSS_IMPORT_RE = re.compile(r'@import\s+[^;]+;')
+_CSS_CHARSET_RE = re.compile(r'@charset\s+[^;]+;')
+_SOURCEMAP_RE = re.compile(r'^[ \t]*//[#@]\s*sourceMappingURL=.*$', re.M)
+# After one of these (or at the start), '/' begins a regex literal, not a division
+_JS_REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^')
+_JS_REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete',
+                      'void', 'throw', 'case', 'do', 'else', 'yield', 'await'}
+_JS_SPECIAL_RE = re.compile(r'''["'`/]''')
+_JS_WORD_RE = re.compile(r'[\w$]+$')
+
+
+# ─── Build ───
+
+def _rewrite_css_urls(css, src_path):
+    """Make relative url() references valid from the dist directory."""
+    src_dir = os.path.dirname(src_path)
+
+    def fix(match):
+        quote, ref = match.group(1), match.group(2).strip()
+        if re.match(r'^(data:|[a-z]+:|//|/|#)', ref, re.I):
+            return match.group(0)
+        path, suffix = re.match(r'([^?#]*)(.*)', ref).groups()
+        target = os.path.normpath(os.path.join(src_dir, path))
+        rel = os.path.relpath(target, DIST_DIR).replace(os.sep, '/')
+        return f'url({quote}{rel}{suffix}{quote})'
+
+    return _CSS_URL_RE.sub(fix, css)
+
+
+def minify_css(css):
+    """Conservatively minify CSS: drop comments and redundant whitespace.
+
+    String literals are left untouched, and no whitespace that could act as
+    a descendant combinator (e.g. before ':' in `a :hover`) is removed.
+    """
+    # Drop comments first (keeping /*! license */ ones) so the whitespace
+    # they leave behind is collapsed too
+    parts = _CSS_TOKEN_RE.split(css)
+    css = ''.join(part for i, part in enumerate(parts)
+                  if not (i % 2 and part.startswith('/*') and not part.startswith('/*!')))
+
+    out = []
+    for i, part in enumerate(_CSS_TOKEN_RE.split(css)):
+        if i % 2:
+            out.append(part)
+            continue
+        part = re.sub(r'\s+', ' ', part)
+        part = re.sub(r'\s*([{};,>])\s*', r'\1', part)
+        part = re.sub(r':\s+', ':', part)
+        part = part.replace(';}', '}')
+        out.append(part)
+    return ''.join(out).strip()
+
+
+def _bundle_css(sources):
+    imports, bodies = [], []
+    for src in sources:
+        with open(src, 'r', encoding='utf-8') as f:
+            css = f.read()
+        css = _CSS_CHARSET_RE.sub('', css)
+        # @import is only valid at the top of a stylesheet, so hoist it
+        for rule in _CSS_IMPORT_RE.findall(css):
+            if rule not in imports:
+                imports.append(rule)
+        css = _CSS_IMPORT_RE.sub('', css)
+        bodies.append(_rewrite_css_urls(css, src))
+    return minify_css('\n'.join(imports + bodies))
+
+
+def _skip_string(js, i):
+    """Index just past the quoted string starting at js[i]."""
+    quote, i = js[i], i + 1
+    while i < len(js) and js[i] != quote:
+        i += 2 if js[i] == '\\' else 1
+    return i + 1
+
+
+def _skip_template(js, i):
+    """Index just past the template literal starting at js[i] (incl. ${...})."""
+    i += 1
+    while i < len(js):
+        ch = js[i]
+        if ch == '\\':
+            i += 2
+        elif ch == '`':
+            return i + 1
+        elif js.startswith('${', i):
+            i, depth = i + 2, 1
+            while i < len(js) and depth:
+                ch = js[i]
+                if ch in '"\'':
+                    i = _skip_string(js, i)
+                    continue
+                if ch == '`':
+                    i = _skip_template(js, i)
+                    continue
+                depth += {'{': 1, '}': -1}.get(ch, 0)
+                i += 1
+        else:
+            i += 1
+    return i
+
+
+def _skip_regex(js, i):
+    """Index just past the regex literal (and flags) starting at js[i]."""
+    i += 1
+    in_class = False
+    while i < len(js) and js[i] != '\n':
+        ch = js[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == '[':
+            in_class = True
+        elif ch == ']':
+            in_class = False
+        elif ch == '/' and not in_class:
+            i += 1
+            break
+        i += 1
+    while i < len(js) and (js[i].isalnum() or js[i] == '_'):
+        i += 1
+    return i
+
+
+def _starts_regex(code):
+    """Whether a '/' following code (already emitted) begins a regex literal."""
+    code = code.rstrip()
+    if not code:
+        return True
+    if code[-1] in _JS_REGEX_PREFIX:
+        return True
+    word = _JS_WORD_RE.search(code)
+    return bool(word) and word.group() in _JS_REGEX_KEYWORDS
+
+
+def _squeeze_js(code):
+    """Drop indentation, trailing spaces and blank lines; newlines are kept for ASI."""
+    code = re.sub(r'[ \t]*\n\s*', '\n', code)
+    return re.sub(r'[ \t]+', ' ', code)
+
+
+def minify_js(js):
+    """Conservatively minify JavaScript: drop comments and redundant whitespace.
+
+    String, template and regex literals are copied untouched, /*! license */
+    comments are kept and every line break is preserved, so automatic
+    semicolon insertion sees the same statements as before.
+    """
+    out = []
+    code = []  # code (and comment placeholders) since the last literal
+    i = 0
+    while True:
+        match = _JS_SPECIAL_RE.search(js, i)
+        if not match:
+            break
+        start = match.start()
+        code.append(js[i:start])
+        if js.startswith('//', start):
+            end = js.find('\n', start)
+            i = len(js) if end < 0 else end
+            continue
+        if js.startswith('/*', start):
+            end = js.find('*/', start + 2)
+            end = len(js) if end < 0 else end + 2
+            if not js.startswith('/*!', start):
+                code.append('\n' if '\n' in js[start:end] else ' ')
+                i = end
+                continue
+        elif js[start] == '/':
+            if not _starts_regex(''.join(out[-2:])[-64:] + ''.join(code)):
+                code.append('/')
+                i = start + 1
+                continue
+            end = _skip_regex(js, start)
+        elif js[start] == '`':
+            end = _skip_template(js, start)
+        else:
+            end = _skip_string(js, start)
+        out.append(_squeeze_js(''.join(code)))
+        out.append(js[start:end])
+        code = []
+        i = end
+    code.append(js[i:])
+    out.append(_squeeze_js(''.join(code)))
+    return ''.join(out).strip()
+
+
+def _bundle_js(sources):
+    # Each file's inline sourcemap describes only that file, so it is dropped;
+    # the leading ';' separator ends an unterminated last statement
+    chunks = []
+    for src in sources:
+        with open(src, 'r', encoding='utf-8') as f:
+            chunks.append(minify_js(_SOURCEMAP_RE.sub('', f.read())))
+    return '\n;'.join(chunks) + '\n'
+
+
+def find_bundles(template_paths=None):
+    """Return {bundle name: [static-relative source paths]} from the templates."""
+    bundles = {}
+    for path in template_paths or BUNDLE_TEMPLATES:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for name, body in _BUNDLE_RE.findall(content):
+            bundles[name] = _STATIC_REF_RE.findall(body)
+    return bundles
+
+
+def _write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def build_assets(template_paths=None):
+    """Build all bundles into static/dist and write the manifest."""
+    os.makedirs(DIST_DIR, exist_ok=True)
+    manifest = {}
+    written = {'manifest.json'}
+    for name, refs in find_bundles(template_paths).items():
+        sources = [os.path.join(STATIC_DIR, ref) for ref in refs]
+        text = _bundle_css(sources) if name.endswith('.css') else _bundle_js(sources)
+        data = text.encode('utf-8')
+        stem, ext = os.path.splitext(name)
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        filename = f'{stem}.{digest}{ext}'
+
+        _write(os.path.join(DIST_DIR, filename), data)
+        _write(os.path.join(DIST_DIR, filename + '.gz'), gzip.compress(data, 9, mtime=0))
+        written.update({filename, filename + '.gz'})
+        if brotli is not None:
+            _write(os.path.join(DIST_DIR, filename + '.br'), brotli.compress(data))
+            written.add(filename + '.br')
+        manifest[name] = {'file': filename, 'sources': refs, 'size': len(data)}
+
+    # Remove outputs of previous builds
+    for entry in os.listdir(DIST_DIR):
+        if entry not in written:
+            os.remove(os.path.join(DIST_DIR, entry))
+
+    with open(MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    _manifest_cache.clear()
+    return manifest
+
+
+# ─── Runtime ───
+
+_manifest_cache = {}
+_manifest_lock = threading.Lock()
+
+
+def load_manifest():
+    """Return the build manifest (reloaded when the file changes)."""
+    try:
+        mtime = os.stat(MANIFEST_FILE).st_mtime_ns
+    except OSError:
+        return {}
+    with _manifest_lock:
+        if _manifest_cache.get('mtime') != mtime:
+            try:
+                with open(MANIFEST_FILE, 'r') as f:
+                    _manifest_cache.update(mtime=mtime, data=json.load(f))
+            except (OSError, ValueError):
+                return {}
+        return _manifest_cache['data']
+
+
+def asset_url(name):
+    """URL of a built bundle, or of the plain static file when not built."""
+    entry = load_manifest().get(name)
+    if entry:
+        return url_for('dist_asset', filename=entry['file'])
+    return url_for('static', filename=name)
+
+
+def bundle(name, caller):
+    """Jinja call-block helper: one tag for a built bundle, else the original tags."""
+    if name not in load_manifest():
+        return caller()
+    url = asset_url(name)
+    if name.endswith('.css'):
+        return Markup(f'<link type="text/css" href="{url}" rel="stylesheet">')
+    return Markup(f'<script src="{url}"></script>')
+
+
+def serve_dist_asset(filename):
+    """Serve a fingerprinted file, preferring a precompressed variant.
+
+    Only the bundles named in the manifest are served (the manifest itself
+    isn't public, and isn't immutable).
+    """
+    if filename not in {entry['file'] for entry in load_manifest().values()}:
+        abort(404)
+    path = os.path.realpath(os.path.join(DIST_DIR, filename))
+    if not path.startswith(os.path.realpath(DIST_DIR) + os.sep) or not os.path.isfile(path):
+        abort(404)
+
+    accepted = request.accept_encodings
+    encoding = None
+    for enc, ext in (('br', '.br'), ('gzip', '.gz')):
+        if accepted[enc] and os.path.isfile(path + ext):
+            encoding, path = enc, path + ext
+            break
+
+    mimetype = 'text/css' if filename.endswith('.css') else 'application/javascript'
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE
+    return response
+
+
+def init_app(app):
+    """Register the dist route and template helpers on a Flask app."""
+    app.add_url_rule('/static/dist/<path:filename>', 'dist_asset', serve_dist_asset)
+    app.jinja_env.globals.update(asset_url=asset_url, bundle=bundle)
+
+
+if __name__ == '__main__':
+    for bundle_name, info in build_assets().items():
+        print(f"{bundle_name:<12} -> static/dist/{info['file']} "
+              f"({len(info['sources'])} files, {info['size'] / 1024:.1f} KB)")
@@ -0,0 +1,156 @@
+"""Small in-process caches shared by the dashboard collectors."""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def estimate_size(value):
+    """Roughly estimate the memory footprint of parsed JSON-like data in bytes."""
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class FileCache:
+    """LRU cache of values derived from files, invalidated by (mtime, size).
+
+    `loader(path, *variant)` produces the value for a file; it is only called
+    when the file is new or its mtime/size changed since the cached copy was
+    built. `variant` distinguishes several values derived from the same file
+    (e.g. different render options).
+    Total size (as reported by `sizeof`) is kept under `max_bytes` by
+    evicting least recently used files. Cached values are shared between
+    callers and must be treated as read-only.
+    """
+
+    def __init__(self, loader, max_bytes, sizeof=estimate_size):
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()  # (path, variant) -> (key, value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path, default=None, variant=()):
+        """Return the cached value for path, (re)loading it if the file changed."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            return default
+        key = (st.st_mtime_ns, st.st_size)
+        slot = (path, variant)
+
+        with self._lock:
+            cached = self._entries.get(slot)
+            if cached and cached[0] == key:
+                self._entries.move_to_end(slot)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        value = self.loader(path, *variant)
+        size = self.sizeof(value)
+
+        with self._lock:
+            old = self._entries.pop(slot, None)
+            if old:
+                self._bytes -= old[2]
+            if size <= self.max_bytes:
+                self._entries[slot] = (key, value, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, _, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= evicted
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, path):
+        """Forget every cached value derived from path."""
+        with self._lock:
+            for slot in [s for s in self._entries if s[0] == path]:
+                self._bytes -= self._entries.pop(slot)[2]
+
+    def clear(self):
+        """Drop every cached value and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return hit/miss counters and current memory usage."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+class SingleFlight:
+    """Coalesce concurrent calls to an expensive function.
+
+    A result younger than `max_age` seconds is returned as-is. Otherwise the
+    first caller computes a new one while concurrent callers wait for it and
+    share the same result instead of repeating the work.
+    """
+
+    def __init__(self, fn, max_age):
+        self.fn = fn
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._result = None
+        self._generated_at = 0
+        self._inflight = None
+        self.computations = 0
+        self.shared = 0
+
+    def get(self):
+        """Return (result, generated_at timestamp)."""
+        with self._lock:
+            if self._result is not None and time.time() - self._generated_at < self.max_age:
+                self.shared += 1
+                return self._result, self._generated_at
+            inflight = self._inflight
+            if inflight is None:
+                inflight = self._inflight = threading.Event()
+                leader = True
+            else:
+                leader = False
+                self.shared += 1
+
+        if not leader:
+            inflight.wait()
+            with self._lock:
+                if self._result is not None:
+                    return self._result, self._generated_at
+            # The leader failed; compute independently
+            return self.fn(), time.time()
+
+        try:
+            result = self.fn()
+            with self._lock:
+                self._result = result
+                self._generated_at = time.time()
+                self.computations += 1
+                return result, self._generated_at
+        finally:
+            with self._lock:
+                self._inflight = None
+            inflight.set()
@@ -1,54 +1,207 @@
 import os
-import glob
-import markdown2
+import fnmatch
+import threading
+import time
 from datetime import datetime
-from config import CLAWD_DIR, MEMORY_DIR, DATA_DIR
+from config import CLAWD_DIR, DOCS_SCAN_DIRS, DOCS_REFRESH_INTERVAL
+from utils.render import render_markdown_file
 
 
 # Directories to scan for docs
 SCAN_CONFIGS = [
-    {'path': MEMORY_DIR, 'label': 'Memory', 'pattern': '*.md', 'recursive': False},
-    {'path': CLAWD_DIR, 'label': 'Workspace', 'pattern': '*.md', 'recursive': False},
-    {'path': DATA_DIR, 'label': 'Dashboard Data', 'pattern': '*', 'recursive': False},
+    {
+        'path': cfg['path'],
+        'label': cfg['label'],
+        'pattern': cfg.get('pattern', '*.md'),
+        'exclude': tuple(cfg.get('exclude', ())),
+        'depth': cfg.get('depth', 0),
+    }
+    for cfg in DOCS_SCAN_DIRS
 ]
 
-
-def get_all_docs():
-    """Scan all configured directories for documents."""
-    docs = []
-    seen = set()
-
-    for cfg in SCAN_CONFIGS:
-        dirpath = cfg['path']
-        if not os.path.isdir(dirpath):
-            continue
-
-        pattern = os.path.join(dirpath, cfg['pattern'])
-        for filepath in glob.glob(pattern):
-            if not os.path.isfile(filepath):
+# Subdirectories never descended into when depth > 0
+SKIP_DIRS = {'node_modules', '__pycache__', 'venv', '.venv', '.git'}
+
+
+def _excluded(name, cfg):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in cfg['exclude'])
+
+
+class DocIndex:
+    """In-memory document index updated incrementally between requests.
+
+    Each scanned directory remembers its mtime and listing; a directory is
+    only re-listed (with os.scandir, one stat per file) when its mtime
+    changes, i.e. when files were added, removed or renamed. In-place edits
+    don't touch the directory mtime, so files in unchanged directories are
+    re-stat'ed at most every `refresh_interval` seconds.
+    """
+
+    def __init__(self, configs, refresh_interval):
+        self.configs = configs
+        self.refresh_interval = refresh_interval
+        self._dirs = {}  # dirpath -> {'mtime': ns, 'files': {name: (size, mtime)}, 'subdirs': [...]}
+        self._doc_cache = {}  # (path, label) -> doc dict
+        self._docs = []
+        self.version = 0
+        self._last_restat = 0
+        self._lock = threading.Lock()
+
+    def _list_dir(self, dirpath, mtime):
+        files, subdirs = {}, []
+        with os.scandir(dirpath) as it:
+            for entry in it:
+                if entry.name.startswith('.'):
+                    continue
+                try:
+                    if entry.is_dir():
+                        if entry.name not in SKIP_DIRS:
+                            subdirs.append(entry.path)
+                    elif entry.is_file():
+                        st = entry.stat()
+                        files[entry.name] = (st.st_size, st.st_mtime)
+                except OSError:
+                    continue
+        return {'mtime': mtime, 'files': files, 'subdirs': sorted(subdirs)}
+
+    def _restat(self, dirpath, listing):
+        changed = False
+        for name, old in list(listing['files'].items()):
+            try:
+                st = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                del listing['files'][name]
+                changed = True
                 continue
-            if filepath in seen:
-                continue
-            seen.add(filepath)
-
-            stat = os.stat(filepath)
-            name = os.path.basename(filepath)
-            ext = os.path.splitext(name)[1].lower()
+            if (st.st_size, st.st_mtime) != old:
+                listing['files'][name] = (st.st_size, st.st_mtime)
+                changed = True
+        return changed
+
+    def _walk(self, dirpath, depth, restat, visited):
+        """Yield (dirpath, listing, changed) for dirpath and subdirectories up to depth."""
+        try:
+            mtime = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            return
+        visited.add(dirpath)
+        listing = self._dirs.get(dirpath)
+        changed = False
+        if listing is None or listing['mtime'] != mtime:
+            try:
+                listing = self._list_dir(dirpath, mtime)
+            except OSError:
+                return
+            self._dirs[dirpath] = listing
+            changed = True
+        elif restat:
+            changed = self._restat(dirpath, listing)
+        yield dirpath, listing, changed
+        if depth > 0:
+            for sub in listing['subdirs']:
+                yield from self._walk(sub, depth - 1, restat, visited)
+
+    def _make_doc(self, filepath, label, size, mtime):
+        key = (filepath, label)
+        doc = self._doc_cache.get(key)
+        if doc and doc['size_bytes'] == size and doc['modified_ts'] == mtime:
+            return doc
+        name = os.path.basename(filepath)
+        ext = os.path.splitext(name)[1].lower()
+        doc = {
+            'name': name,
+            'path': filepath,
+            'relative_path': os.path.relpath(filepath, CLAWD_DIR),
+            'type': ext if ext else 'file',
+            'size': _fmt_size(size),
+            'size_bytes': size,
+            'modified': datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M'),
+            'modified_ts': mtime,
+            'label': label,
+        }
+        self._doc_cache[key] = doc
+        return doc
+
+    def refresh(self):
+        """Bring the index up to date and return the sorted document list."""
+        with self._lock:
+            now = time.time()
+            restat = now - self._last_restat >= self.refresh_interval
+            if restat:
+                self._last_restat = now
+
+            changed = False
+            visited = set()
+            walks = []
+            for cfg in self.configs:
+                for dirpath, listing, dir_changed in self._walk(cfg['path'], cfg['depth'], restat, visited):
+                    changed = changed or dir_changed
+                    walks.append((cfg, dirpath, listing))
+
+            removed = set(self._dirs) - visited
+            if removed:
+                for dirpath in removed:
+                    del self._dirs[dirpath]
+                changed = True
+
+            if changed or not self._docs:
+                docs = []
+                seen = set()
+                for cfg, dirpath, listing in walks:
+                    for name, (size, mtime) in listing['files'].items():
+                        if not fnmatch.fnmatch(name, cfg['pattern']) or _excluded(name, cfg):
+                            continue
+                        filepath = os.path.join(dirpath, name)
+                        if filepath in seen:
+                            continue
+                        seen.add(filepath)
+                        docs.append(self._make_doc(filepath, cfg['label'], size, mtime))
+                docs.sort(key=lambda d: d['modified_ts'], reverse=True)
+                live = {(d['path'], d['label']) for d in docs}
+                self._doc_cache = {k: v for k, v in self._doc_cache.items() if k in live}
+                # Directory changes that leave the list alone (lock or temp
+                # files coming and going) keep the version and its ETag
+                if self.version == 0 or [id(d) for d in docs] != [id(d) for d in self._docs]:
+                    self.version += 1
+                self._docs = docs
+            return self._docs
+
+
+_doc_index = DocIndex(SCAN_CONFIGS, DOCS_REFRESH_INTERVAL)
 
-            docs.append({
-                'name': name,
-                'path': filepath,
-                'relative_path': os.path.relpath(filepath, CLAWD_DIR),
-                'type': ext if ext else 'file',
-                'size': _fmt_size(stat.st_size),
-                'size_bytes': stat.st_size,
-                'modified': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M'),
-                'modified_ts': stat.st_mtime,
-                'label': cfg['label'],
-            })
 
-    docs.sort(key=lambda d: d['modified_ts'], reverse=True)
-    return docs
+def get_all_docs():
+    """Scan all configured directories for documents."""
+    return list(_doc_index.refresh())
+
+
+def get_docs_version():
+    """Return the document index version (bumped whenever the list changes)."""
+    _doc_index.refresh()
+    return _doc_index.version
+
+
+def query_docs(label=None, doc_type=None, offset=0, limit=None):
+    """Return (page, total) of indexed docs filtered by label and type.
+
+    Raises ValueError for a negative offset or limit.
+    """
+    offset = offset or 0
+    if offset < 0:
+        raise ValueError('offset must not be negative')
+    if limit is not None and limit < 0:
+        raise ValueError('limit must not be negative')
+    docs = _doc_index.refresh()
+    if doc_type:
+        doc_type = doc_type.lower()
+        if doc_type != 'file' and not doc_type.startswith('.'):
+            doc_type = '.' + doc_type
+        docs = [d for d in docs if d['type'] == doc_type]
+    if label:
+        docs = [d for d in docs if d['label'] == label]
+    total = len(docs)
+    end = offset + limit if limit is not None else None
+    return docs[offset:end], total
 
 
 def get_doc_content(filepath):
@@ -62,17 +215,17 @@ def get_doc_content(filepath):
     if not os.path.isfile(real):
         return None
 
+    ext = os.path.splitext(real)[1].lower()
+    html = None
     try:
-        with open(real, 'r', errors='replace') as f:
-            content = f.read(500000)  # 500KB max
+        if ext == '.md':
+            content, html = render_markdown_file(real, max_chars=500000)  # 500KB max
+        else:
+            with open(real, 'r', errors='replace') as f:
+                content = f.read(500000)  # 500KB max
     except Exception:
         return None
 
-    ext = os.path.splitext(real)[1].lower()
-    html = None
-    if ext == '.md':
-        html = markdown2.markdown(content, extras=['fenced-code-blocks', 'tables', 'task_list'])
-
     return {
         'name': os.path.basename(real),
         'path': real,
@@ -2,13 +2,19 @@ import subprocess
 import json
 import os
 from datetime import datetime
-from config import EMAIL_ACCOUNT, EMAIL_PASSWORD, WATCHED_SENDERS, CLAWD_DIR
+from config import EMAIL_ACCOUNT, EMAIL_PASSWORD, WATCHED_SENDERS, CLAWD_DIR, EMAIL_CHECK_INTERVAL
+from utils.jobs import runner
+from utils.metrics import run_subprocess
+
+
+# Job key shared by manual and scheduled checks (so they deduplicate)
+EMAIL_CHECK_JOB = 'email-check'
 
 
 def check_emails():
     """Run the email monitor check and return results."""
     try:
-        result = subprocess.run(
+        result = run_subprocess(
             ['python3', 'email_monitor.py', EMAIL_ACCOUNT, EMAIL_PASSWORD, 'check'],
             capture_output=True, text=True, timeout=30,
             cwd=CLAWD_DIR
@@ -35,6 +41,35 @@ def check_emails():
         }
 
 
+def start_email_check():
+    """Queue an email check (or join the one already running).
+
+    Returns (job, created).
+    """
+    return runner.submit(EMAIL_CHECK_JOB, check_emails)
+
+
+def get_email_job(job_id):
+    """Return an email check job by id, or None."""
+    job = runner.get(job_id)
+    if job and job['key'] == EMAIL_CHECK_JOB:
+        return job
+    return None
+
+
+def get_last_check():
+    """Return the result of the most recent finished email check, or None."""
+    job = runner.latest(EMAIL_CHECK_JOB)
+    return job['result'] if job else None
+
+
+def start_email_scheduler(interval=None):
+    """Check emails periodically in the background (if configured)."""
+    interval = EMAIL_CHECK_INTERVAL if interval is None else interval
+    if EMAIL_ACCOUNT and interval > 0:
+        runner.schedule(EMAIL_CHECK_JOB, check_emails, interval)
+
+
 def _mask_email(email):
     """Mask email for display: ven***@selfmade.ninja"""
     if '@' in email:
@@ -52,5 +87,7 @@ def get_email_status():
         'watched_senders': WATCHED_SENDERS,
         'status': 'Active' if EMAIL_ACCOUNT else 'Not configured',
         'monitor_script': os.path.exists(os.path.join(CLAWD_DIR, 'email_monitor.py')),
-        'checker_script': os.path.exists(os.path.join(CLAWD_DIR, 'email_checker.py'))
+        'checker_script': os.path.exists(os.path.join(CLAWD_DIR, 'email_checker.py')),
+        'last_check': get_last_check(),
+        'running_job': runner.active(EMAIL_CHECK_JOB),
     }
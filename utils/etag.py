@@ -0,0 +1,46 @@
+"""Cheap content versions and conditional (ETag / 304) JSON responses."""
+
+import os
+import hashlib
+from functools import wraps
+from flask import request, make_response
+
+
+def file_signature(*paths):
+    """Return (path, mtime_ns, size) for each path (None fields if missing)."""
+    sig = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            sig.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append((path, None, None))
+    return tuple(sig)
+
+
+def make_etag(*parts):
+    """Hash arbitrary version parts into a short strong ETag value."""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:24]
+
+
+def conditional(version_fn):
+    """Decorator adding a strong ETag derived from version_fn() and the URL.
+
+    When the request's If-None-Match already holds the current ETag the view
+    isn't called at all and an empty 304 Not Modified is returned.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            etag = make_etag(request.full_path, version_fn())
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,311 @@
+"""Round-robin (RRD-style) history of system metrics.
+
+Every sampler tick is folded into fixed-size rings at several resolutions
+(see ARCHIVES); each ring slot keeps min/max/sum/count per metric, so a
+series for any range is read straight from the coarsest-sufficient ring
+without touching raw samples. The rings are plain arrays and are flushed
+to HISTORY_FILE in a compact little-endian binary layout so history survives
+restarts. With several worker processes only the one holding the history
+lock file samples and writes; the others serve the history from the file,
+re-reading it when it changes, so they lag by up to HISTORY_FLUSH_INTERVAL.
+If the writer exits, the next process to sample takes the lock over.
+"""
+
+import os
+import sys
+import time
+import fcntl
+import struct
+import atexit
+import threading
+from array import array
+from datetime import datetime
+from config import HISTORY_FILE, HISTORY_FLUSH_INTERVAL
+from utils.status import get_ai_status
+
+METRICS = ('cpu', 'memory', 'disk', 'ai_status', 'sessions')
+
+# (seconds per point, points kept): 5 s for 1 h, 1 min for 1 day, 15 min for 30 days
+ARCHIVES = ((5, 720), (60, 1440), (900, 2880))
+
+# ai_status is charted as a level
+AI_STATUS_LEVELS = {'offline': 0, 'idle': 1, 'working': 2}
+
+_RANGE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_MAGIC = b'CHRRD\x00\x00\x01'
+_HEADER = struct.Struct('<8sHH')
+_ARCHIVE_HEADER = struct.Struct('<II')
+
+
+def _le(arr):
+    """Return arr in little-endian byte order (copying on big-endian hosts)."""
+    if sys.byteorder == 'big':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr
+
+
+def parse_range(text):
+    """Parse '90s', '15m', '6h', '7d' (or bare seconds) into seconds."""
+    text = (text or '').strip().lower()
+    unit = _RANGE_UNITS.get(text[-1:])
+    try:
+        seconds = int(text[:-1]) * unit if unit else int(text)
+    except ValueError:
+        raise ValueError(f'invalid range: {text!r}')
+    if seconds <= 0:
+        raise ValueError(f'invalid range: {text!r}')
+    return seconds
+
+
+class Archive:
+    """One ring of consolidated points at a fixed step."""
+
+    def __init__(self, step, rows, metrics=METRICS):
+        self.step = step
+        self.rows = rows
+        self.metrics = metrics
+        # Slot -> absolute slot number (time // step) it currently holds; 0 = empty
+        self.slots = array('I', bytes(4 * rows))
+        # metric -> (mins, maxs, sums, counts); float32 is plenty for percentages
+        self.data = {m: (array('f', bytes(4 * rows)), array('f', bytes(4 * rows)),
+                         array('f', bytes(4 * rows)), array('I', bytes(4 * rows)))
+                     for m in metrics}
+
+    def add(self, t, values):
+        slot = int(t // self.step)
+        i = slot % self.rows
+        if self.slots[i] != slot:
+            self.slots[i] = slot
+            for mins, maxs, sums, counts in self.data.values():
+                counts[i] = sums[i] = 0
+        for metric, value in values.items():
+            if value is None or metric not in self.data:
+                continue
+            mins, maxs, sums, counts = self.data[metric]
+            if counts[i]:
+                mins[i] = min(mins[i], value)
+                maxs[i] = max(maxs[i], value)
+            else:
+                mins[i] = maxs[i] = value
+            sums[i] += value
+            counts[i] += 1
+
+    def series(self, metric, start, end):
+        """Return [(slot start time, min, avg, max)] for slots in (start, end]."""
+        mins, maxs, sums, counts = self.data[metric]
+        points = []
+        for slot in range(int(start // self.step) + 1, int(end // self.step) + 1):
+            i = slot % self.rows
+            if self.slots[i] == slot and counts[i]:
+                points.append((slot * self.step, mins[i], sums[i] / counts[i], maxs[i]))
+            else:
+                points.append((slot * self.step, None, None, None))
+        return points
+
+    def arrays(self):
+        yield self.slots
+        for metric in self.metrics:
+            yield from self.data[metric]
+
+
+class MetricsHistory:
+    """A set of archives plus persistence to a binary file."""
+
+    def __init__(self, path=HISTORY_FILE, archives=ARCHIVES, metrics=METRICS):
+        self.path = path
+        self.metrics = metrics
+        self.archives = [Archive(step, rows, metrics) for step, rows in archives]
+        self._lock = threading.Lock()
+        self._load_lock = threading.RLock()
+        self._lock_file = None
+        self._lock_pid = None
+        self._loaded = False
+        self._file_sig = None
+        self._flushed_at = time.time()
+
+    def record(self, values, t=None):
+        """Fold one sample ({metric: number or None}) into every archive."""
+        t = time.time() if t is None else t
+        with self._lock:
+            for archive in self.archives:
+                archive.add(t, values)
+
+    def series(self, metric, seconds, now=None):
+        """Chart-ready min/avg/max series covering the last `seconds`."""
+        if metric not in self.metrics:
+            raise ValueError(f'unknown metric: {metric!r}')
+        now = time.time() if now is None else now
+        # Finest archive that spans the whole range (else the longest one)
+        archive = next((a for a in self.archives if a.step * a.rows >= seconds), self.archives[-1])
+        seconds = min(seconds, archive.step * archive.rows)
+        with self._lock:
+            points = archive.series(metric, now - seconds, now)
+        return {
+            'metric': metric,
+            'step': archive.step,
+            'labels': [datetime.fromtimestamp(t).isoformat(timespec='seconds') for t, _, _, _ in points],
+            'min': [None if p[1] is None else round(p[1], 2) for p in points],
+            'avg': [None if p[2] is None else round(p[2], 2) for p in points],
+            'max': [None if p[3] is None else round(p[3], 2) for p in points],
+        }
+
+    # ─── Persistence ───
+
+    def dumps(self):
+        names = ','.join(self.metrics).encode()
+        parts = [_HEADER.pack(_MAGIC, len(names), len(self.archives)), names]
+        with self._lock:
+            for archive in self.archives:
+                parts.append(_ARCHIVE_HEADER.pack(archive.step, archive.rows))
+                parts.extend(_le(arr).tobytes() for arr in archive.arrays())
+        return b''.join(parts)
+
+    def loads(self, data):
+        """Restore archives from dumps() output; returns False if the layout differs."""
+        try:
+            magic, name_len, count = _HEADER.unpack_from(data)
+            offset = _HEADER.size
+            names = data[offset:offset + name_len].decode()
+            offset += name_len
+            if magic != _MAGIC or names != ','.join(self.metrics) or count != len(self.archives):
+                return False
+            restored = []
+            for archive in self.archives:
+                step, rows = _ARCHIVE_HEADER.unpack_from(data, offset)
+                offset += _ARCHIVE_HEADER.size
+                if (step, rows) != (archive.step, archive.rows):
+                    return False
+                arrays = []
+                for arr in archive.arrays():
+                    size = arr.itemsize * rows
+                    loaded = array(arr.typecode, data[offset:offset + size])
+                    offset += size
+                    if len(loaded) != rows:
+                        return False
+                    arrays.append(_le(loaded))
+                restored.append(arrays)
+        except (struct.error, UnicodeDecodeError, ValueError):
+            return False
+        with self._lock:
+            for archive, arrays in zip(self.archives, restored):
+                for arr, loaded in zip(archive.arrays(), arrays):
+                    arr[:] = loaded
+        return True
+
+    def _read_file(self):
+        # Reload only when the file changed since it was last read
+        try:
+            st = os.stat(self.path)
+            sig = (st.st_mtime_ns, st.st_size)
+            if sig == self._file_sig:
+                return
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        self.loads(data)
+        self._file_sig = sig
+
+    def sync(self):
+        """Load the history; a process that doesn't write re-reads the writer's flushes."""
+        with self._load_lock:
+            if not self.is_writer():
+                self._read_file()
+            self._loaded = True
+
+    def is_writer(self):
+        """True if this process holds the history lock (taking it if it is free)."""
+        if self._lock_pid != os.getpid():
+            # Locks are per process; start over after a fork
+            self._lock_file, self._lock_pid = None, os.getpid()
+        if self._lock_file is None:
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                f = open(self.path + '.lock', 'a')
+            except OSError:
+                return False
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                f.close()
+                return False
+            # Continue from what the previous writer flushed
+            with self._load_lock:
+                self._read_file()
+                self._loaded = True
+            self._lock_file = f
+        return True
+
+    def flush(self, force=False):
+        """Write the archives if this process is the writer and the interval passed."""
+        now = time.time()
+        if not self._loaded or (not force and now - self._flushed_at < HISTORY_FLUSH_INTERVAL):
+            return False
+        self._flushed_at = now
+        if not self.is_writer():
+            return False
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(self.dumps())
+        os.replace(tmp, self.path)
+        st = os.stat(self.path)
+        self._file_sig = (st.st_mtime_ns, st.st_size)
+        return True
+
+
+history = MetricsHistory()
+
+
+def _flush_at_exit():
+    try:
+        history.flush(force=True)
+    except OSError:
+        pass
+
+
+atexit.register(_flush_at_exit)
+
+
+# Returns the AI status dict; the app points this at its shared, coalesced status
+_status_source = get_ai_status
+
+
+def set_status_source(fn):
+    """Take the AI status for samples from fn() instead of computing it."""
+    global _status_source
+    _status_source = fn
+
+
+def record_sample(sample):
+    """Record a system sampler snapshot plus the current AI status.
+
+    Only the writing process records; the others read the history file.
+    """
+    if not history.is_writer():
+        return
+    try:
+        ai = _status_source()
+        ai_level = AI_STATUS_LEVELS.get(ai['ai_status'])
+        sessions = sum(1 for s in ai['active_sessions'] if s.get('active'))
+    except Exception:
+        ai_level = sessions = None
+
+    history.record({
+        'cpu': sample['cpu_percent'],
+        'memory': sample['memory'].percent,
+        'disk': sample['disk'].percent,
+        'ai_status': ai_level,
+        'sessions': sessions,
+    }, sample['sampled_at'])
+    try:
+        history.flush()
+    except OSError:
+        pass
+
+
+def get_history(metric, range_text):
+    """Series for /api/system/history; raises ValueError for bad arguments."""
+    history.sync()
+    return dict(history.series(metric, parse_range(range_text)), range=range_text)
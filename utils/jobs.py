@@ -0,0 +1,117 @@
+"""In-process background jobs for slow operations (e.g. email checks).
+
+Jobs run on a small thread pool. Submitting a job whose key already has a
+queued or running job returns that job instead of starting a duplicate, and
+the latest finished job per key is kept so pages can show cached results.
+"""
+
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config import JOB_WORKERS
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class JobRunner:
+    """Deduplicating job queue backed by a thread pool."""
+
+    def __init__(self, max_workers=JOB_WORKERS, keep=100):
+        self.keep = keep
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = OrderedDict()   # id -> job dict (oldest first)
+        self._active = {}            # key -> id of its queued/running job
+        self._latest = {}            # key -> id of its last finished job
+        self._lock = threading.Lock()
+        self._schedules = {}
+
+    def submit(self, key, fn, *args):
+        """Queue fn(*args) under key; returns (job, created)."""
+        with self._lock:
+            active = self._active.get(key)
+            if active:
+                return dict(self._jobs[active]), False
+            job = {
+                'id': uuid.uuid4().hex[:12],
+                'key': key,
+                'status': 'queued',
+                'created_at': _now(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None,
+            }
+            self._jobs[job['id']] = job
+            self._active[key] = job['id']
+            self._trim()
+            snapshot = dict(job)
+        self._executor.submit(self._run, job, fn, args)
+        return snapshot, True
+
+    def _run(self, job, fn, args):
+        with self._lock:
+            job.update(status='running', started_at=_now())
+        try:
+            result, error, status = fn(*args), None, 'done'
+        except Exception as e:
+            result, error, status = None, str(e), 'failed'
+        with self._lock:
+            job.update(status=status, result=result, error=error, finished_at=_now())
+            self._active.pop(job['key'], None)
+            self._latest[job['key']] = job['id']
+
+    def _trim(self):
+        # Forget the oldest jobs, but never active or latest ones
+        keep_ids = set(self._active.values()) | set(self._latest.values())
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.keep:
+                break
+            if job_id not in keep_ids:
+                del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Return a copy of a job, or None if unknown (or forgotten)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def active(self, key):
+        """Return the queued/running job for key, if any."""
+        with self._lock:
+            job_id = self._active.get(key)
+            return dict(self._jobs[job_id]) if job_id else None
+
+    def latest(self, key):
+        """Return the last finished job for key, if any."""
+        with self._lock:
+            job_id = self._latest.get(key)
+            return dict(self._jobs[job_id]) if job_id else None
+
+    def schedule(self, key, fn, interval):
+        """Submit fn under key every interval seconds (no-op if already scheduled)."""
+        with self._lock:
+            if key in self._schedules or interval <= 0:
+                return
+            stop = threading.Event()
+            self._schedules[key] = stop
+
+        def loop():
+            while True:
+                self.submit(key, fn)
+                if stop.wait(interval):
+                    return
+
+        threading.Thread(target=loop, name=f'schedule-{key}', daemon=True).start()
+
+    def unschedule(self, key):
+        with self._lock:
+            stop = self._schedules.pop(key, None)
+        if stop:
+            stop.set()
+
+
+runner = JobRunner()
@@ -1,7 +1,8 @@
 import os
 import glob
-import markdown2
 from config import MEMORY_DIR, MEMORY_FILE
+from utils.render import render_markdown_file
+from utils.etag import file_signature
 
 
 def get_memory_files():
@@ -22,24 +23,30 @@ def get_memory_files():
     return files
 
 
+def get_memory_version(filename=None):
+    """Return a cheap version of the memory files listing and content (for ETags)."""
+    paths = sorted(glob.glob(os.path.join(MEMORY_DIR, '*.md')))
+    if filename:
+        paths.append(os.path.join(MEMORY_DIR, filename))
+    return file_signature(*paths)
+
+
 def get_memory_content(filename):
     """Read and render a memory file as HTML."""
     filepath = os.path.join(MEMORY_DIR, filename)
-    if not os.path.exists(filepath):
+    rendered = render_markdown_file(filepath)
+    if rendered is None:
         return None
-    with open(filepath, 'r') as f:
-        content = f.read()
-    html = markdown2.markdown(content, extras=['fenced-code-blocks', 'tables', 'task_list'])
+    content, html = rendered
     return {'raw': content, 'html': html, 'filename': filename}
 
 
 def get_main_memory():
     """Read MEMORY.md."""
-    if not os.path.exists(MEMORY_FILE):
+    rendered = render_markdown_file(MEMORY_FILE)
+    if rendered is None:
         return None
-    with open(MEMORY_FILE, 'r') as f:
-        content = f.read()
-    html = markdown2.markdown(content, extras=['fenced-code-blocks', 'tables', 'task_list'])
+    content, html = rendered
     return {'raw': content, 'html': html}
 
 
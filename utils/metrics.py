@@ -0,0 +1,317 @@
+"""In-process instrumentation exposed at /metrics in Prometheus text format.
+
+Recording is lock-free: every thread updates its own shard (a dict of
+plain lists), and a scrape merges the shards. Shards of finished threads
+are folded into a retired total during the scrape, so per-request threads
+do not accumulate. Values are per process; with several workers each
+process reports its own series, as the Prometheus client does by default.
+"""
+
+import hmac
+import time
+import threading
+import subprocess
+from bisect import bisect_left
+from functools import wraps
+from flask import Response, request, g, abort
+from config import METRICS_TOKEN, METRICS_PUBLIC
+from utils.auth import is_admin
+
+# Seconds; covers fast JSON endpoints up to slow subprocess-backed pages
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """Holds metric definitions and the per-thread value shards."""
+
+    def __init__(self):
+        self._metrics = []
+        self._local = threading.local()
+        self._shards = []     # (thread, {(metric name, label values): cell})
+        self._retired = {}
+        self._lock = threading.Lock()   # shard registration and scrapes only
+
+    def _shard(self):
+        shard = getattr(self._local, 'values', None)
+        if shard is None:
+            shard = self._local.values = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _cell(self, metric, labels, size):
+        shard = self._shard()
+        key = (metric.name, labels)
+        cell = shard.get(key)
+        if cell is None:
+            cell = shard[key] = [0] * size
+        return cell
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def _merge(self, into, shard):
+        for key, cell in shard.copy().items():
+            total = into.get(key)
+            if total is None:
+                into[key] = list(cell)
+            else:
+                for i, value in enumerate(cell):
+                    total[i] += value
+
+    def values(self):
+        """Merged {(metric name, labels): cell} across all threads."""
+        with self._lock:
+            alive = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    self._merge(self._retired, shard)
+            self._shards = alive
+            merged = {key: list(cell) for key, cell in self._retired.items()}
+            for _, shard in alive:
+                self._merge(merged, shard)
+        return merged
+
+    def render(self):
+        """Exposition text for every registered metric."""
+        values = self.values()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples(values))
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=(), registry=registry):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._registry = registry
+        registry.register(self)
+
+    def inc(self, *labels, amount=1):
+        self._registry._cell(self, labels, 1)[0] += amount
+
+    def samples(self, values):
+        for (name, labels), cell in sorted(values.items()):
+            if name == self.name:
+                yield f'{name}{_labels(self.labelnames, labels)} {_number(cell[0])}'
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS, registry=registry):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._registry = registry
+        registry.register(self)
+
+    def observe(self, value, *labels):
+        # Cell layout: one count per bucket plus +Inf, then the sum
+        cell = self._registry._cell(self, labels, len(self.buckets) + 2)
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def samples(self, values):
+        for (name, labels), cell in sorted(values.items()):
+            if name != self.name:
+                continue
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), cell):
+                cumulative += count
+                le = [('le', _number(float(bound)))]
+                yield f'{name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}'
+            yield f'{name}_sum{_labels(self.labelnames, labels)} {_number(float(cell[-1]))}'
+            yield f'{name}_count{_labels(self.labelnames, labels)} {cumulative}'
+
+
+class Callback:
+    """Counter or gauge read at scrape time from sources returning [(labels, value)]."""
+
+    def __init__(self, name, help, labelnames=(), kind='gauge', registry=registry):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+        self._sources = []
+        registry.register(self)
+
+    def add(self, fn):
+        self._sources.append(fn)
+
+    def samples(self, values):
+        for fn in self._sources:
+            try:
+                points = list(fn())
+            except Exception:
+                continue
+            for labels, value in points:
+                yield f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}'
+
+
+# ─── Dashboard metrics ───
+
+REQUEST_DURATION = Histogram('dashboard_request_duration_seconds',
+                             'HTTP request duration by route.', ('method', 'route', 'status'))
+REQUEST_CPU = Counter('dashboard_request_cpu_seconds_total',
+                      'CPU time of the request thread, by route.', ('method', 'route'))
+COLLECTOR_DURATION = Histogram('dashboard_collector_duration_seconds',
+                               'Duration of data collector calls.', ('collector',))
+SUBPROCESS_TOTAL = Counter('dashboard_subprocess_total',
+                           'Subprocesses started, by command.', ('command',))
+SUBPROCESS_DURATION = Histogram('dashboard_subprocess_duration_seconds',
+                                'Subprocess run time, by command.', ('command',))
+CACHE_HITS = Callback('dashboard_cache_hits_total', 'Cache hits.', ('cache',), kind='counter')
+CACHE_MISSES = Callback('dashboard_cache_misses_total', 'Cache misses.', ('cache',), kind='counter')
+CACHE_HIT_RATIO = Callback('dashboard_cache_hit_ratio', 'Cache hits / lookups since start.', ('cache',))
+
+
+# Per-request phase breakdown for the slow-request log (utils/profiler.py):
+# while a thread tracks phases, timed collectors and subprocesses add to it
+_phases = threading.local()
+
+
+def start_phases():
+    _phases.current = {}
+
+
+def stop_phases():
+    """Return {name: {'calls', 'seconds', 'outer'}} recorded since start_phases()."""
+    current = getattr(_phases, 'current', None)
+    _phases.current = None
+    return current or {}
+
+
+def note_phase(name, seconds, outer=True):
+    """Add time to a phase; `outer` is False when nested in another phase."""
+    current = getattr(_phases, 'current', None)
+    if current is None:
+        return
+    entry = current.setdefault(name, {'calls': 0, 'seconds': 0.0, 'outer': outer})
+    entry['calls'] += 1
+    entry['seconds'] += seconds
+
+
+def _begin():
+    depth = getattr(_phases, 'depth', 0)
+    _phases.depth = depth + 1
+    return depth, time.perf_counter()
+
+
+def _end(name, token):
+    depth, start = token
+    elapsed = time.perf_counter() - start
+    _phases.depth = depth
+    note_phase(name, elapsed, outer=depth == 0)
+    return elapsed
+
+
+def timed(collector):
+    """Decorator recording a collector's duration under `collector`."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            token = _begin()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                COLLECTOR_DURATION.observe(_end(collector, token), collector)
+        return wrapper
+    return decorator
+
+
+def run_subprocess(args, **kwargs):
+    """subprocess.run() that counts and times the command."""
+    command = args[0] if isinstance(args, (list, tuple)) else str(args).split()[0]
+    SUBPROCESS_TOTAL.inc(command)
+    token = _begin()
+    try:
+        return subprocess.run(args, **kwargs)
+    finally:
+        SUBPROCESS_DURATION.observe(_end(f'subprocess:{command}', token), command)
+
+
+def register_cache(name, stats):
+    """Expose a cache whose stats() returns a dict with hits and misses."""
+    def read(key):
+        def points():
+            data = stats()
+            if key == 'hit_ratio':
+                total = data['hits'] + data['misses']
+                return [((name,), data['hits'] / total if total else 0.0)]
+            return [((name,), data[key])]
+        return points
+
+    CACHE_HITS.add(read('hits'))
+    CACHE_MISSES.add(read('misses'))
+    CACHE_HIT_RATIO.add(read('hit_ratio'))
+
+
+# ─── Flask integration ───
+
+def _start_timer():
+    g._metrics_start = time.perf_counter()
+    g._metrics_cpu_start = time.thread_time()
+
+
+def _record_request(response):
+    start = g.pop('_metrics_start', None)
+    if start is not None:
+        rule = request.url_rule.rule if request.url_rule else '<unmatched>'
+        REQUEST_DURATION.observe(time.perf_counter() - start,
+                                 request.method, rule, str(response.status_code))
+        # Work handed to other threads (widget pool, streamed bodies) is not included
+        REQUEST_CPU.inc(request.method, rule, amount=time.thread_time() - g.pop('_metrics_cpu_start'))
+    return response
+
+
+def _authorized():
+    if METRICS_PUBLIC or is_admin():
+        return True
+    header = request.headers.get('Authorization', '')
+    return bool(METRICS_TOKEN) and hmac.compare_digest(header.encode(), f'Bearer {METRICS_TOKEN}'.encode())
+
+
+def serve_metrics():
+    if not _authorized():
+        abort(401)
+    return Response(registry.render(), content_type=CONTENT_TYPE)
+
+
+def init_app(app):
+    """Time every request and register the /metrics route on a Flask app."""
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', serve_metrics)
@@ -1,25 +1,8 @@
-import os
 import json
 import uuid
 from datetime import datetime
-from config import NOTES_FILE, ACTIVITY_LOG
-
-
-def _load_notes():
-    """Load notes from JSON file."""
-    if not os.path.exists(NOTES_FILE):
-        return []
-    try:
-        with open(NOTES_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, Exception):
-        return []
-
-
-def _save_notes(notes):
-    """Save notes to JSON file."""
-    with open(NOTES_FILE, 'w') as f:
-        json.dump(notes, f, indent=2)
+from config import ACTIVITY_LOG
+from utils.storage import get_store
 
 
 def _log_activity(action):
@@ -33,35 +16,35 @@ def _log_activity(action):
         f.write(json.dumps(entry) + '\n')
 
 
+def get_notes_version():
+    """Return a cheap version of the notes collection (for ETags)."""
+    return get_store().version('notes')
+
+
 def get_notes():
     """Get all notes, newest first."""
-    notes = _load_notes()
-    return sorted(notes, key=lambda n: n.get('timestamp', ''), reverse=True)
+    return get_store().records('notes', order_by='-timestamp')
 
 
 def add_note(text):
     """Add a new note."""
-    notes = _load_notes()
     note = {
         'id': str(uuid.uuid4())[:8],
         'text': text,
         'timestamp': datetime.now().isoformat(),
         'status': 'pending'
     }
-    notes.append(note)
-    _save_notes(notes)
+    get_store().insert('notes', note)
     _log_activity(f'Note added: {text[:60]}')
     return note
 
 
 def update_note(note_id, status):
     """Update a note's status."""
-    notes = _load_notes()
-    for note in notes:
-        if note['id'] == note_id:
-            note['status'] = status
-            note['updated_at'] = datetime.now().isoformat()
-            _save_notes(notes)
-            _log_activity(f'Note {note_id} marked as {status}')
-            return note
-    return None
+    note = get_store().update('notes', note_id, {
+        'status': status,
+        'updated_at': datetime.now().isoformat(),
+    })
+    if note:
+        _log_activity(f'Note {note_id} marked as {status}')
+    return note
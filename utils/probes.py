@@ -0,0 +1,91 @@
+"""Concurrent, cached service probes (stale-while-revalidate).
+
+Each probe is registered once with a timeout and a TTL. Results are cached;
+once a result is older than its TTL it is still served (flagged `stale`)
+while a single background refresh runs on the probe pool. Only a probe that
+has never produced a result makes a request wait, and then at most
+SERVICE_PROBE_WAIT seconds for all such probes together.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from config import SERVICE_PROBE_WAIT
+from utils.metrics import COLLECTOR_DURATION
+
+
+class ServiceProbe:
+    """One named check returning a list of service dicts."""
+
+    def __init__(self, name, fn, timeout, ttl, fallback=()):
+        self.name = name
+        self.fn = fn
+        self.timeout = timeout
+        self.ttl = ttl
+        # Services reported while the probe has no result or it failed
+        self.fallback = list(fallback)
+        self.services = None
+        self.checked_at = 0
+        self.future = None
+
+
+class ProbeRegistry:
+    """Runs registered probes on a thread pool and caches their results."""
+
+    def __init__(self, max_workers=4, wait_timeout=SERVICE_PROBE_WAIT):
+        self.wait_timeout = wait_timeout
+        self._probes = []
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='probe')
+        self._lock = threading.Lock()
+
+    def register(self, name, fn, timeout=5, ttl=15, fallback=()):
+        """Declare a probe; fn(timeout) returns a list of service dicts."""
+        probe = ServiceProbe(name, fn, timeout, ttl, fallback)
+        self._probes.append(probe)
+        return probe
+
+    def _run(self, probe):
+        start = time.perf_counter()
+        try:
+            services = probe.fn(probe.timeout)
+        except Exception:
+            services = [dict(s, status='unknown') for s in probe.fallback]
+        COLLECTOR_DURATION.observe(time.perf_counter() - start, f'probe:{probe.name}')
+        with self._lock:
+            probe.services = services
+            probe.checked_at = time.time()
+            probe.future = None
+
+    def _refresh(self, probe):
+        # Caller holds the lock; at most one refresh per probe is in flight
+        if probe.future is None:
+            probe.future = self._executor.submit(self._run, probe)
+        return probe.future
+
+    def results(self):
+        """Return all probe results, refreshing expired ones in the background."""
+        now = time.time()
+        pending = []
+        with self._lock:
+            for probe in self._probes:
+                if probe.services is None or now - probe.checked_at >= probe.ttl:
+                    future = self._refresh(probe)
+                    if probe.services is None:
+                        pending.append(future)
+        if pending:
+            wait(pending, timeout=self.wait_timeout)
+
+        now = time.time()
+        services = []
+        with self._lock:
+            for probe in self._probes:
+                if probe.services is None:
+                    services.extend(dict(s, status='unknown', checked_at=None, stale=True)
+                                    for s in probe.fallback)
+                    continue
+                checked_at = datetime.fromtimestamp(probe.checked_at).isoformat(timespec='seconds')
+                stale = now - probe.checked_at >= probe.ttl
+                services.extend(dict(s, checked_at=checked_at, stale=stale)
+                                for s in probe.services)
+        return services
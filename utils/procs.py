@@ -0,0 +1,88 @@
+"""Shared process index built on psutil, replacing per-request pgrep calls."""
+
+import os
+import threading
+import time
+import psutil
+from config import PROCESS_INDEX_TTL
+
+
+# pattern -> {'expires': ts, 'procs': [(pid, create_time), ...]}
+_index = {}
+_index_lock = threading.Lock()
+
+
+def _scan(patterns):
+    """Walk the process table once and match every pattern against cmdlines.
+
+    Matching mirrors `pgrep -f`: a pattern matches if it appears anywhere in
+    the full command line (or the process name when the cmdline is hidden).
+    """
+    found = {p: [] for p in patterns}
+    own_pid = os.getpid()
+    for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'create_time']):
+        info = proc.info
+        if info['pid'] == own_pid:
+            continue
+        cmdline = ' '.join(info.get('cmdline') or []) or (info.get('name') or '')
+        for pattern in patterns:
+            if pattern in cmdline:
+                found[pattern].append((info['pid'], info['create_time']))
+    for procs in found.values():
+        procs.sort()
+    return found
+
+
+def _still_alive(pid, create_time):
+    """Cheaply confirm a cached PID still refers to the same process."""
+    try:
+        return psutil.Process(pid).create_time() == create_time
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
+
+
+def find_processes(pattern, ttl=None):
+    """Return [(pid, create_time), ...] for processes whose cmdline contains pattern.
+
+    Results are cached for `ttl` seconds (PROCESS_INDEX_TTL by default). While
+    fresh, cached PIDs are re-validated by create_time instead of rescanning.
+    An expired or invalidated entry triggers one scan that refreshes every
+    known pattern at once.
+    """
+    ttl = PROCESS_INDEX_TTL if ttl is None else ttl
+    now = time.time()
+    with _index_lock:
+        entry = _index.get(pattern)
+        if entry and entry['expires'] > now:
+            procs = [p for p in entry['procs'] if _still_alive(*p)]
+            if procs or not entry['procs']:
+                entry['procs'] = procs
+                return list(procs)
+
+        patterns = set(_index) | {pattern}
+        try:
+            found = _scan(patterns)
+        except Exception:
+            return []
+        for p, procs in found.items():
+            _index[p] = {'expires': now + ttl, 'procs': procs}
+        return list(found[pattern])
+
+
+def find_process(pattern):
+    """Return (pid, create_time) for the oldest matching process, or None."""
+    procs = find_processes(pattern)
+    if not procs:
+        return None
+    return min(procs, key=lambda p: p[1])
+
+
+def is_running(pattern):
+    """Return True if any process cmdline contains pattern."""
+    return bool(find_processes(pattern))
+
+
+def clear_index():
+    """Drop all cached process lookups."""
+    with _index_lock:
+        _index.clear()
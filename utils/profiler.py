@@ -0,0 +1,189 @@
+"""Opt-in request profiling.
+
+- Slow-request log: with SLOW_REQUEST_MS set, slower requests are written as
+  JSON lines to SLOW_REQUEST_LOG (rotated) with their route, query args and
+  a per-phase breakdown: timed collectors, subprocesses, template rendering
+  and the unaccounted rest.
+- `?__profile=1`: for admins, the request runs under cProfile and the
+  response is replaced by the top functions by cumulative time.
+- Sampling: with PROFILE_SAMPLE_RATE = N, one request in N is profiled and
+  the stats are aggregated; admins read them at /admin/profile.
+
+Only one request is profiled at a time (cProfile is process-wide on newer
+Pythons); a sampled request that finds the profiler busy is skipped.
+"""
+
+import io
+import json
+import time
+import pstats
+import cProfile
+import logging
+import itertools
+import threading
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from flask import Response, request, g, before_render_template, template_rendered
+from config import SLOW_REQUEST_MS, SLOW_REQUEST_LOG, PROFILE_SAMPLE_RATE
+from utils.auth import admin_required, is_admin
+from utils import metrics
+
+PROFILE_PARAM = '__profile'
+TOP_FUNCTIONS = 40
+SLOW_LOG_MAX_BYTES = 1024 * 1024
+SLOW_LOG_BACKUPS = 3
+
+_profile_lock = threading.Lock()
+_request_counter = itertools.count(1)
+_render_starts = threading.local()
+
+_sampled = None             # aggregated pstats.Stats of sampled requests
+_sampled_requests = 0
+_sampled_lock = threading.Lock()
+
+slow_log = logging.getLogger('dashboard.slow_requests')
+slow_log.propagate = False
+
+
+def _start_profile(explicit):
+    acquired = _profile_lock.acquire(timeout=10) if explicit else _profile_lock.acquire(blocking=False)
+    if not acquired:
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # another profiler (e.g. a debugger) is active
+        _profile_lock.release()
+        return None
+    return profiler
+
+
+def _stop_profile():
+    profiler = g.pop('_profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        _profile_lock.release()
+    return profiler
+
+
+def _top_functions(stats):
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+    return stream.getvalue()
+
+
+def _add_sample(profiler):
+    global _sampled, _sampled_requests
+    with _sampled_lock:
+        if _sampled is None:
+            _sampled = pstats.Stats(profiler)
+        else:
+            _sampled.add(profiler)
+        _sampled_requests += 1
+
+
+def _log_slow(response, elapsed, phases):
+    outer = sum(p['seconds'] for p in phases.values() if p['outer'])
+    slow_log.info(json.dumps({
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'method': request.method,
+        'route': request.url_rule.rule if request.url_rule else None,
+        'path': request.path,
+        'args': {k: v for k, v in request.args.items() if k != PROFILE_PARAM},
+        'status': response.status_code,
+        'ms': round(elapsed * 1000, 1),
+        'phases': {name: {'calls': p['calls'], 'ms': round(p['seconds'] * 1000, 1)}
+                   for name, p in sorted(phases.items(), key=lambda item: -item[1]['seconds'])},
+        'other_ms': round(max(elapsed - outer, 0) * 1000, 1),
+    }))
+
+
+# ─── Request hooks ───
+
+def _before_request():
+    g._profile_start = time.perf_counter()
+    if SLOW_REQUEST_MS > 0:
+        metrics.start_phases()
+
+    explicit = request.args.get(PROFILE_PARAM) == '1' and is_admin()
+    sampled = (not explicit and PROFILE_SAMPLE_RATE > 0
+               and next(_request_counter) % PROFILE_SAMPLE_RATE == 0)
+    if explicit or sampled:
+        g._profiler = _start_profile(explicit)
+        g._profile_explicit = explicit
+
+
+def _after_request(response):
+    start = g.pop('_profile_start', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+
+    profiler = _stop_profile()
+    if profiler is not None:
+        if g.pop('_profile_explicit', False):
+            header = (f'{request.method} {request.full_path} -> {response.status_code} '
+                      f'in {elapsed * 1000:.1f} ms\n\n')
+            response = Response(header + _top_functions(pstats.Stats(profiler)), mimetype='text/plain')
+        else:
+            _add_sample(profiler)
+
+    if SLOW_REQUEST_MS > 0:
+        phases = metrics.stop_phases()
+        if elapsed * 1000 >= SLOW_REQUEST_MS:
+            _log_slow(response, elapsed, phases)
+    return response
+
+
+def _teardown_request(exc):
+    # after_request is skipped when a response could not be built at all
+    _stop_profile()
+    metrics.stop_phases()
+
+
+def _render_started(sender, template, context, **extra):
+    stack = getattr(_render_starts, 'stack', None)
+    if stack is None:
+        stack = _render_starts.stack = []
+    stack.append(time.perf_counter())
+
+
+def _render_finished(sender, template, context, **extra):
+    stack = getattr(_render_starts, 'stack', None)
+    if stack:
+        metrics.note_phase(f'render:{template.name}', time.perf_counter() - stack.pop())
+
+
+# ─── Admin view ───
+
+@admin_required
+def sampled_profile():
+    """Aggregated stats of sampled requests as text; POST resets them."""
+    global _sampled, _sampled_requests
+    with _sampled_lock:
+        if request.method == 'POST':
+            _sampled, _sampled_requests = None, 0
+            return Response('Sampled profile reset.\n', mimetype='text/plain')
+        if _sampled is None:
+            state = f'1 in {PROFILE_SAMPLE_RATE}' if PROFILE_SAMPLE_RATE > 0 else 'off (PROFILE_SAMPLE_RATE=0)'
+            return Response(f'No sampled requests yet; sampling is {state}.\n', mimetype='text/plain')
+        header = f'{_sampled_requests} sampled requests (1 in {PROFILE_SAMPLE_RATE})\n\n'
+        return Response(header + _top_functions(_sampled), mimetype='text/plain')
+
+
+def init_app(app):
+    """Install the profiling hooks and the /admin/profile view on a Flask app."""
+    if SLOW_REQUEST_MS > 0 and not slow_log.handlers:
+        handler = RotatingFileHandler(SLOW_REQUEST_LOG, maxBytes=SLOW_LOG_MAX_BYTES,
+                                      backupCount=SLOW_LOG_BACKUPS, delay=True)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        slow_log.addHandler(handler)
+        slow_log.setLevel(logging.INFO)
+        before_render_template.connect(_render_started, app)
+        template_rendered.connect(_render_finished, app)
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/admin/profile', 'admin_profile', sampled_profile, methods=['GET', 'POST'])
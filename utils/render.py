@@ -0,0 +1,38 @@
+"""Cached markdown rendering for memory files and docs."""
+
+import os
+import markdown2
+from config import MARKDOWN_CACHE_BYTES
+from utils.cache import FileCache
+from utils.metrics import timed
+
+
+MARKDOWN_EXTRAS = ('fenced-code-blocks', 'tables', 'task_list')
+
+
+@timed('render_markdown')
+def _render(path, extras, max_chars):
+    """Read a markdown file and render it to HTML."""
+    with open(path, 'r', errors='replace') as f:
+        content = f.read(max_chars) if max_chars else f.read()
+    html = markdown2.markdown(content, extras=list(extras))
+    return content, html
+
+
+# Rendered pages keyed by (realpath, mtime, size, extras), bounded by text size
+_render_cache = FileCache(_render, MARKDOWN_CACHE_BYTES,
+                          sizeof=lambda value: len(value[0]) + len(value[1]))
+
+
+def render_markdown_file(path, extras=MARKDOWN_EXTRAS, max_chars=None):
+    """Return (content, html) for a markdown file, or None if it is missing.
+
+    The rendered result is reused until the file's mtime or size changes.
+    """
+    real = os.path.realpath(path)
+    return _render_cache.get(real, variant=(tuple(extras), max_chars))
+
+
+def get_render_cache_stats():
+    """Return hit/miss counters and size of the markdown render cache."""
+    return _render_cache.stats()
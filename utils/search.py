@@ -0,0 +1,417 @@
+"""Full-text search across memory logs, docs, notes and tasks.
+
+An inverted index (term -> {record id: term frequency}) is kept in memory,
+updated per source file when its mtime or size changes, and persisted to
+SEARCH_INDEX_FILE so a restart only re-indexes files that changed since.
+Results are ranked with BM25.
+"""
+
+import os
+import re
+import json
+import math
+import glob
+import time
+import atexit
+import threading
+from urllib.parse import quote
+from config import (
+    MEMORY_DIR, MEMORY_FILE, CLAWD_DIR,
+    SEARCH_INDEX_FILE, SEARCH_SAVE_INTERVAL, SEARCH_REFRESH_INTERVAL,
+)
+from utils.activity import parse_memory_file
+from utils.docs import get_all_docs
+from utils.tasks import parse_todo_file, get_todo_paths
+from utils.storage import get_store
+
+
+INDEX_VERSION = 2
+
+# Document types worth indexing from the docs browser
+TEXT_EXTENSIONS = {'.md', '.txt', '.rst'}
+
+# Max characters indexed per document (matches the docs viewer limit)
+MAX_DOC_CHARS = 500000
+
+_TOKEN_RE = re.compile(r'\w\w+')
+_HEADER_RE = re.compile(r'^#{1,3}\s+(.+)')
+_DAILY_RE = re.compile(r'\d{4}-\d{2}-\d{2}\.md$')
+
+# Sources read from the storage backend rather than a file
+STORAGE_PREFIX = 'storage:'
+
+# Upper bound for the number of results one search returns
+MAX_RESULTS = 100
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text):
+    """Split text into lowercase search terms."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _term_counts(text):
+    counts = {}
+    for term in tokenize(text):
+        counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+# ─── Record extraction per source type ───
+
+def _memory_records(path):
+    records = []
+    for entry in parse_memory_file(path):
+        title = f"{entry['date']} {entry['time']}".strip()
+        if entry['section']:
+            title += f" · {entry['section']}"
+        records.append({
+            'kind': 'memory',
+            'title': title,
+            'text': entry['text'],
+            'url': f"/memory?file={quote(os.path.basename(path))}",
+            'date': entry['date'],
+        })
+    return records
+
+
+def _main_memory_records(path):
+    with open(path, 'r', errors='replace') as f:
+        content = f.read(MAX_DOC_CHARS)
+    records = []
+    header, lines = 'MEMORY.md', []
+
+    def flush():
+        text = '\n'.join(lines).strip()
+        if text:
+            records.append({'kind': 'main_memory', 'title': header, 'text': text,
+                            'url': '/memory', 'date': None})
+
+    for line in content.split('\n'):
+        match = _HEADER_RE.match(line.strip())
+        if match:
+            flush()
+            header, lines = f"MEMORY.md › {match.group(1)}", []
+        else:
+            lines.append(line)
+    flush()
+    return records
+
+
+def _doc_records(path):
+    with open(path, 'r', errors='replace') as f:
+        content = f.read(MAX_DOC_CHARS)
+    return [{
+        'kind': 'doc',
+        'title': os.path.basename(path),
+        'text': content,
+        'url': f"/docs?file={quote(path)}",
+        'date': None,
+    }]
+
+
+def _notes_records(source):
+    return [{
+        'kind': 'note',
+        'title': f"Note ({n.get('status', 'pending')})",
+        'text': n.get('text', ''),
+        'url': '/notes',
+        'date': (n.get('timestamp') or '')[:10] or None,
+    } for n in get_store().records('notes')]
+
+
+def _tasks_records(source):
+    return [{
+        'kind': 'task',
+        'title': f"Task ({t.get('column', 'todo')})",
+        'text': t.get('text', ''),
+        'url': '/tasks',
+        'date': (t.get('timestamp') or '')[:10] or None,
+    } for t in get_store().records('tasks')]
+
+
+def _todo_records(path):
+    records = []
+    for column, tasks in parse_todo_file(path).items():
+        for t in tasks:
+            title = f"{t['source']} TODO ({column})"
+            if t['section']:
+                title += f" › {t['section']}"
+            records.append({'kind': 'task', 'title': title, 'text': t['text'],
+                            'url': '/tasks', 'date': None})
+    return records
+
+
+EXTRACTORS = {
+    'memory': _memory_records,
+    'main_memory': _main_memory_records,
+    'todo': _todo_records,
+    'notes': _notes_records,
+    'tasks': _tasks_records,
+    'doc': _doc_records,
+}
+
+
+def _source_sig(path):
+    """Return a JSON-comparable change signature for a source, or None."""
+    if path.startswith(STORAGE_PREFIX):
+        return [get_store().version(path[len(STORAGE_PREFIX):])]
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _current_sources():
+    """Return {path: kind} for every source that should be indexed."""
+    sources = {}
+    for path in glob.glob(os.path.join(MEMORY_DIR, '*.md')):
+        if _DAILY_RE.match(os.path.basename(path)):
+            sources[path] = 'memory'
+    if os.path.isfile(MEMORY_FILE):
+        sources[MEMORY_FILE] = 'main_memory'
+    for path in get_todo_paths():
+        sources.setdefault(path, 'todo')
+    for kind in ('notes', 'tasks'):
+        sources[STORAGE_PREFIX + kind] = kind
+
+    # Only docs the viewer is allowed to open (inside the workspace)
+    root = os.path.realpath(CLAWD_DIR)
+    for doc in get_all_docs():
+        if doc['type'] not in TEXT_EXTENSIONS:
+            continue
+        if not os.path.realpath(doc['path']).startswith(root):
+            continue
+        sources.setdefault(doc['path'], 'doc')
+    return sources
+
+
+class SearchIndex:
+    """Incrementally maintained, disk-persisted BM25 inverted index."""
+
+    def __init__(self, index_file):
+        self.index_file = index_file
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._last_save = 0
+        self._last_scan = 0
+        self._reset()
+
+    def _reset(self):
+        self.files = {}     # path -> {'kind', 'sig', 'ids'}
+        self.records = {}   # id -> record (kind, title, text, url, date, source, length)
+        self.postings = {}  # term -> {id: tf}
+        self.total_length = 0
+        self.next_id = 1
+
+    # ─── Persistence ───
+
+    def _load(self):
+        self._loaded = True
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != INDEX_VERSION:
+            return
+        self.files = data['files']
+        self.records = {int(k): v for k, v in data['records'].items()}
+        self.postings = {t: {int(k): tf for k, tf in p.items()} for t, p in data['postings'].items()}
+        self.total_length = data['total_length']
+        self.next_id = data['next_id']
+
+    def save(self, force=False):
+        """Write the index to disk if it changed (throttled unless force).
+
+        Only copying the index holds the lock; searches aren't blocked while
+        it is serialized. Records are never modified once added, so copying
+        the containers (and each posting) is enough for a consistent snapshot.
+        """
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                if not force and time.time() - self._last_save < SEARCH_SAVE_INTERVAL:
+                    return
+                data = {
+                    'version': INDEX_VERSION,
+                    'files': dict(self.files),
+                    'records': dict(self.records),
+                    'postings': {term: dict(p) for term, p in self.postings.items()},
+                    'total_length': self.total_length,
+                    'next_id': self.next_id,
+                }
+                self._dirty = False
+                self._last_save = time.time()
+            tmp = f'{self.index_file}.{os.getpid()}.tmp'
+            try:
+                os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+                with open(tmp, 'w') as f:
+                    json.dump(data, f, separators=(',', ':'))
+                os.replace(tmp, self.index_file)
+            except OSError:
+                with self._lock:
+                    self._dirty = True
+
+    # ─── Incremental updates ───
+
+    def _remove_file(self, path):
+        entry = self.files.pop(path, None)
+        if not entry:
+            return
+        for rid in entry['ids']:
+            record = self.records.pop(rid, None)
+            if not record:
+                continue
+            self.total_length -= record['length']
+            for term in _term_counts(record['text']):
+                posting = self.postings.get(term)
+                if posting:
+                    posting.pop(rid, None)
+                    if not posting:
+                        del self.postings[term]
+
+    def _add_file(self, path, kind, sig):
+        try:
+            records = EXTRACTORS[kind](path)
+        except (OSError, ValueError):
+            records = []
+        ids = []
+        for record in records:
+            counts = _term_counts(record['text'])
+            if not counts:
+                continue
+            rid = self.next_id
+            self.next_id += 1
+            record['source'] = path
+            record['length'] = sum(counts.values())
+            self.records[rid] = record
+            self.total_length += record['length']
+            for term, tf in counts.items():
+                self.postings.setdefault(term, {})[rid] = tf
+            ids.append(rid)
+        self.files[path] = {'kind': kind, 'sig': sig, 'ids': ids}
+
+    def _update(self, sources):
+        for path, kind in sources.items():
+            sig = _source_sig(path)
+            if sig is None:
+                continue
+            entry = self.files.get(path)
+            if entry and entry['sig'] == sig and entry['kind'] == kind:
+                continue
+            self._remove_file(path)
+            self._add_file(path, kind, sig)
+            self._dirty = True
+
+    def refresh(self, force=False):
+        """Re-index new or changed source files and drop deleted ones.
+
+        The files are scanned at most every SEARCH_REFRESH_INTERVAL seconds
+        unless forced; notes and tasks (a cheap store version check) are
+        brought up to date on every call.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            now = time.time()
+            if not force and now - self._last_scan < SEARCH_REFRESH_INTERVAL:
+                self._update({STORAGE_PREFIX + kind: kind for kind in ('notes', 'tasks')})
+            else:
+                self._last_scan = now
+                sources = _current_sources()
+                for path in list(self.files):
+                    if path not in sources:
+                        self._remove_file(path)
+                        self._dirty = True
+                self._update(sources)
+        self.save()
+
+    # ─── Querying ───
+
+    def search(self, query, limit=20, kind=None):
+        """Return BM25-ranked results for query, best first."""
+        self.refresh()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            n = len(self.records)
+            if not n:
+                return []
+            avgdl = self.total_length / n
+            scores = {}
+            for term in terms:
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                for rid, tf in posting.items():
+                    length = self.records[rid]['length']
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avgdl)
+                    scores[rid] = scores.get(rid, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+
+            if kind:
+                scores = {rid: s for rid, s in scores.items() if self.records[rid]['kind'] == kind}
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+            results = []
+            for rid, score in ranked:
+                record = self.records[rid]
+                results.append({
+                    'kind': record['kind'],
+                    'title': record['title'],
+                    'snippet': _snippet(record['text'], terms),
+                    'url': record['url'],
+                    'date': record['date'],
+                    'source': record['source'],
+                    'score': round(score, 3),
+                })
+            return results
+
+    def stats(self):
+        """Return index size counters."""
+        with self._lock:
+            return {
+                'files': len(self.files),
+                'records': len(self.records),
+                'terms': len(self.postings),
+            }
+
+
+def _snippet(text, terms, width=160):
+    """Return a short excerpt of text around the first query term."""
+    lowered = text.lower()
+    hits = [pos for pos in (lowered.find(t) for t in terms) if pos >= 0]
+    start = max(min(hits) - width // 3, 0) if hits else 0
+    snippet = ' '.join(text[start:start + width].split())
+    if start > 0:
+        snippet = '…' + snippet
+    if start + width < len(text):
+        snippet += '…'
+    return snippet
+
+
+_index = SearchIndex(SEARCH_INDEX_FILE)
+atexit.register(_index.save, force=True)
+
+
+def search(query, limit=20, kind=None):
+    """Search memory logs, MEMORY.md, docs, notes and tasks."""
+    return _index.search(query, limit=limit, kind=kind)
+
+
+def refresh_index():
+    """Bring the search index up to date with the files on disk."""
+    _index.refresh(force=True)
+
+
+def get_search_stats():
+    """Return search index size counters."""
+    return _index.stats()
@@ -1,11 +1,13 @@
 import os
 import json
-import subprocess
 import glob
 from datetime import datetime
 from config import STATUS_FILE, HEARTBEAT_STATE, SESSIONS_DIR
+from utils.procs import find_process, is_running
+from utils.metrics import timed
 
 
+@timed('get_ai_status')
 def get_ai_status():
     """Determine AI status from multiple signals."""
     status = {
@@ -20,14 +22,10 @@ def get_ai_status():
     }
 
     # Check if clawdbot gateway is running
-    gateway_running = False
-    try:
-        result = subprocess.run(['pgrep', '-f', 'clawdbot'], capture_output=True, timeout=5)
-        gateway_running = result.returncode == 0
-    except Exception:
-        pass
+    gateway_running = is_running('clawdbot')
 
     # Read status.json for current task
+    sdata = {}
     if os.path.exists(STATUS_FILE):
         try:
             with open(STATUS_FILE, 'r') as f:
@@ -38,12 +36,9 @@ def get_ai_status():
 
     # Get uptime from clawdbot-gateway process
     try:
-        import psutil
-        result = subprocess.run(['pgrep', '-f', 'clawdbot-gateway'], capture_output=True, text=True, timeout=5)
-        if result.stdout.strip():
-            pid = int(result.stdout.strip().split('\n')[0])
-            proc = psutil.Process(pid)
-            create_time = datetime.fromtimestamp(proc.create_time())
+        gateway = find_process('clawdbot-gateway')
+        if gateway:
+            create_time = datetime.fromtimestamp(gateway[1])
             delta = datetime.now() - create_time
             days = delta.days
             hours, rem = divmod(delta.seconds, 3600)
@@ -51,16 +46,13 @@ def get_ai_status():
             status['uptime'] = f"{days}d {hours}h {mins}m"
     except Exception:
         try:
-            if os.path.exists(STATUS_FILE):
-                with open(STATUS_FILE, 'r') as f:
-                    sdata = json.load(f)
-                if sdata.get('started_at'):
-                    started = datetime.fromisoformat(sdata['started_at'])
-                    delta = datetime.now() - started
-                    days = delta.days
-                    hours, rem = divmod(delta.seconds, 3600)
-                    mins, _ = divmod(rem, 60)
-                    status['uptime'] = f"{days}d {hours}h {mins}m"
+            if sdata.get('started_at'):
+                started = datetime.fromisoformat(sdata['started_at'])
+                delta = datetime.now() - started
+                days = delta.days
+                hours, rem = divmod(delta.seconds, 3600)
+                mins, _ = divmod(rem, 60)
+                status['uptime'] = f"{days}d {hours}h {mins}m"
         except Exception:
             pass
 
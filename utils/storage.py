@@ -0,0 +1,395 @@
+"""Record storage for dashboard tasks, notes and users.
+
+Both backends implement the same small interface (records / get / find /
+count / insert / update / bulk / delete / version):
+
+- SQLiteStore (default): one WAL-mode database with a table per collection,
+  keyed by id and indexed on the lookup fields. Every write is a single
+  short transaction touching only the affected row, so concurrent requests
+  and multiple worker processes don't overwrite each other.
+- JSONStore: the original data/*.json files, rewritten atomically under an
+  exclusive file lock.
+
+On first use the SQLite backend imports the existing JSON files (they are
+left in place). To write the database back out as JSON:
+
+    python -m utils.storage export [DIR]
+"""
+
+import os
+import sys
+import json
+import uuid
+import fcntl
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from config import (
+    TASKS_FILE, NOTES_FILE, USERS_FILE,
+    STORAGE_BACKEND, DATABASE_FILE, DATABASE_TIMEOUT,
+)
+
+
+# collection -> JSON file and indexed fields ('unique' fields are also indexed)
+COLLECTIONS = {
+    'tasks': {'file': TASKS_FILE, 'indexes': ('column',), 'unique': ()},
+    'notes': {'file': NOTES_FILE, 'indexes': ('status', 'timestamp'), 'unique': ()},
+    'users': {'file': USERS_FILE, 'indexes': (), 'unique': ('username',)},
+}
+
+
+class DuplicateError(ValueError):
+    """Raised when an insert violates a unique field (or reuses an id)."""
+
+
+def _fields(name):
+    spec = COLLECTIONS[name]
+    return spec['indexes'] + spec['unique']
+
+
+def _parse_order(name, order_by):
+    """'-timestamp' -> ('timestamp', True); only indexed fields are allowed."""
+    if not order_by:
+        return None, False
+    field, desc = order_by.lstrip('-'), order_by.startswith('-')
+    if field not in _fields(name):
+        raise ValueError(f'{name} cannot be ordered by {field}')
+    return field, desc
+
+
+def _where(name, filters):
+    """(SQL WHERE clause, parameters) for equality filters on indexed fields.
+
+    A None value matches records where the field is missing or null.
+    """
+    if not filters:
+        return '', []
+    fields = _fields(name)
+    for field in filters:
+        if field not in fields:
+            raise ValueError(f'{name} cannot be filtered by {field}')
+    clauses = [f'"{f}" IS NULL' if v is None else f'"{f}" = ?' for f, v in filters.items()]
+    return ' WHERE ' + ' AND '.join(clauses), [v for v in filters.values() if v is not None]
+
+
+def _read_json_list(path):
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else []
+    except (OSError, ValueError):
+        return []
+
+
+def _write_json_atomic(path, records):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(records, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class SQLiteStore:
+    """Collections stored as rows of (id, JSON data, indexed fields)."""
+
+    def __init__(self, path, timeout=DATABASE_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._ready = False
+        self._init_lock = threading.Lock()
+
+    # ─── Connections ───
+
+    def _connect(self):
+        # One connection per thread, recreated after a fork (gunicorn --preload)
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        self._local.conn, self._local.pid = conn, os.getpid()
+        if not self._ready:
+            self._setup(conn)
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """Exclusive write transaction (other processes wait up to timeout)."""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _setup(self, conn):
+        with self._init_lock:
+            if self._ready:
+                return
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)')
+                conn.execute("INSERT OR IGNORE INTO meta VALUES ('db_id', ?)", (uuid.uuid4().hex,))
+                for name, spec in COLLECTIONS.items():
+                    columns = ''.join(f', "{field}" TEXT' for field in _fields(name))
+                    conn.execute(f'CREATE TABLE IF NOT EXISTS "{name}" '
+                                 f'(id TEXT PRIMARY KEY, data TEXT NOT NULL{columns})')
+                    for field in spec['indexes']:
+                        conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}_{field}" '
+                                     f'ON "{name}" ("{field}")')
+                    for field in spec['unique']:
+                        conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "{name}_{field}" '
+                                     f'ON "{name}" ("{field}")')
+                    self._import_json(conn, name, spec['file'])
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+            self._ready = True
+
+    def _import_json(self, conn, name, path):
+        """Copy an existing JSON file into its table, once per database."""
+        key = f'imported:{name}'
+        if conn.execute('SELECT 1 FROM meta WHERE key = ?', (key,)).fetchone():
+            return
+        for record in _read_json_list(path):
+            if isinstance(record, dict) and record.get('id'):
+                self._insert_row(conn, name, record, ignore=True)
+        conn.execute('INSERT INTO meta VALUES (?, ?)', (key, datetime.now().isoformat()))
+        self._bump(conn, name)
+
+    # ─── Helpers ───
+
+    def _insert_row(self, conn, name, record, ignore=False):
+        fields = _fields(name)
+        columns = ', '.join(['id', 'data'] + [f'"{f}"' for f in fields])
+        marks = ', '.join('?' * (len(fields) + 2))
+        values = [record['id'], json.dumps(record)] + [record.get(f) for f in fields]
+        verb = 'INSERT OR IGNORE' if ignore else 'INSERT'
+        conn.execute(f'{verb} INTO "{name}" ({columns}) VALUES ({marks})', values)
+
+    def _bump(self, conn, name):
+        conn.execute('INSERT INTO meta VALUES (?, 1) '
+                     'ON CONFLICT(key) DO UPDATE SET value = value + 1', (f'rev:{name}',))
+
+    # ─── Interface ───
+
+    def records(self, name, order_by=None, **filters):
+        """Return records (insertion order unless order_by, e.g. '-timestamp')."""
+        where, params = _where(name, filters)
+        sql = f'SELECT data FROM "{name}"' + where
+        field, desc = _parse_order(name, order_by)
+        sql += f' ORDER BY "{field}" {"DESC" if desc else "ASC"}' if field else ' ORDER BY rowid'
+        rows = self._connect().execute(sql, params)
+        return [json.loads(data) for (data,) in rows]
+
+    def get(self, name, record_id):
+        row = self._connect().execute(
+            f'SELECT data FROM "{name}" WHERE id = ?', (record_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, name, field, value):
+        """Return the first record whose indexed field equals value."""
+        found = self.records(name, **{field: value})
+        return found[0] if found else None
+
+    def count(self, name, **filters):
+        where, params = _where(name, filters)
+        return self._connect().execute(f'SELECT COUNT(*) FROM "{name}"' + where, params).fetchone()[0]
+
+    def insert(self, name, record):
+        try:
+            with self._write() as conn:
+                self._insert_row(conn, name, record)
+                self._bump(conn, name)
+        except sqlite3.IntegrityError as e:
+            raise DuplicateError(str(e)) from e
+        return record
+
+    def _update_row(self, conn, name, record_id, changes):
+        row = conn.execute(f'SELECT data FROM "{name}" WHERE id = ?', (record_id,)).fetchone()
+        if not row:
+            return None
+        record = {**json.loads(row[0]), **changes}
+        fields = _fields(name)
+        assignments = ', '.join(['data = ?'] + [f'"{f}" = ?' for f in fields])
+        conn.execute(f'UPDATE "{name}" SET {assignments} WHERE id = ?',
+                     [json.dumps(record)] + [record.get(f) for f in fields] + [record_id])
+        return record
+
+    def update(self, name, record_id, changes):
+        """Merge changes into a record; returns the updated record or None."""
+        with self._write() as conn:
+            record = self._update_row(conn, name, record_id, changes)
+            if record:
+                self._bump(conn, name)
+        return record
+
+    def bulk(self, name, inserts=(), updates=()):
+        """Apply inserts and (id, changes) updates in one transaction.
+
+        Returns the updated records in order (None where the id is missing).
+        Nothing is written if an insert is a duplicate.
+        """
+        try:
+            with self._write() as conn:
+                before = conn.total_changes
+                for record in inserts:
+                    self._insert_row(conn, name, record)
+                updated = [self._update_row(conn, name, record_id, changes)
+                           for record_id, changes in updates]
+                # A batch that matched nothing keeps the revision (and ETags)
+                if conn.total_changes > before:
+                    self._bump(conn, name)
+        except sqlite3.IntegrityError as e:
+            raise DuplicateError(str(e)) from e
+        return updated
+
+    def delete(self, name, record_id):
+        with self._write() as conn:
+            deleted = conn.execute(f'DELETE FROM "{name}" WHERE id = ?', (record_id,)).rowcount
+            if deleted:
+                self._bump(conn, name)
+        return bool(deleted)
+
+    def version(self, name):
+        """Opaque value that changes whenever the collection is written."""
+        rows = dict(self._connect().execute(
+            "SELECT key, value FROM meta WHERE key IN ('db_id', ?)", (f'rev:{name}',)))
+        return f"{rows.get('db_id')}:{rows.get(f'rev:{name}', 0)}"
+
+
+class JSONStore:
+    """Collections stored as whole JSON lists, one file each."""
+
+    @contextmanager
+    def _locked(self, name):
+        """Hold an exclusive lock on the collection and yield its records."""
+        path = COLLECTIONS[name]['file']
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path + '.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield _read_json_list(path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _save(self, name, records):
+        _write_json_atomic(COLLECTIONS[name]['file'], records)
+
+    def records(self, name, order_by=None, **filters):
+        records = _read_json_list(COLLECTIONS[name]['file'])
+        if filters:
+            records = [r for r in records if all(r.get(f) == v for f, v in filters.items())]
+        field, desc = _parse_order(name, order_by)
+        if field:
+            records.sort(key=lambda r: r.get(field) or '', reverse=desc)
+        return records
+
+    def get(self, name, record_id):
+        return next((r for r in self.records(name) if r.get('id') == record_id), None)
+
+    def find(self, name, field, value):
+        found = self.records(name, **{field: value})
+        return found[0] if found else None
+
+    def count(self, name, **filters):
+        return len(self.records(name, **filters))
+
+    def _check_unique(self, name, records, record):
+        for key in ('id',) + COLLECTIONS[name]['unique']:
+            if any(r.get(key) == record.get(key) for r in records):
+                raise DuplicateError(f'{name}.{key} already exists')
+
+    def insert(self, name, record):
+        with self._locked(name) as records:
+            self._check_unique(name, records, record)
+            records.append(record)
+            self._save(name, records)
+        return record
+
+    def bulk(self, name, inserts=(), updates=()):
+        with self._locked(name) as records:
+            for record in inserts:
+                self._check_unique(name, records, record)
+                records.append(record)
+            by_id = {r.get('id'): r for r in records}
+            updated = []
+            for record_id, changes in updates:
+                record = by_id.get(record_id)
+                if record is not None:
+                    record.update(changes)
+                updated.append(record and dict(record))
+            if inserts or any(updated):
+                self._save(name, records)
+        return updated
+
+    def update(self, name, record_id, changes):
+        with self._locked(name) as records:
+            for record in records:
+                if record.get('id') == record_id:
+                    record.update(changes)
+                    self._save(name, records)
+                    return record
+        return None
+
+    def delete(self, name, record_id):
+        with self._locked(name) as records:
+            remaining = [r for r in records if r.get('id') != record_id]
+            if len(remaining) == len(records):
+                return False
+            self._save(name, remaining)
+        return True
+
+    def version(self, name):
+        try:
+            st = os.stat(COLLECTIONS[name]['file'])
+            return f'{st.st_mtime_ns}:{st.st_size}'
+        except OSError:
+            return None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the configured storage backend (created on first use)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if STORAGE_BACKEND == 'json':
+                _store = JSONStore()
+            elif STORAGE_BACKEND == 'sqlite':
+                _store = SQLiteStore(DATABASE_FILE)
+            else:
+                raise ValueError(f'Unknown STORAGE_BACKEND: {STORAGE_BACKEND}')
+        return _store
+
+
+def export_json(directory=None):
+    """Write every collection to its JSON file (or into directory)."""
+    store = get_store()
+    written = []
+    for name, spec in COLLECTIONS.items():
+        path = spec['file']
+        if directory:
+            path = os.path.join(directory, os.path.basename(path))
+        _write_json_atomic(path, store.records(name))
+        written.append(path)
+    return written
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'export':
+        sys.exit('usage: python -m utils.storage export [DIR]')
+    for exported in export_json(sys.argv[2] if len(sys.argv) > 2 else None):
+        print(f'wrote {exported}')
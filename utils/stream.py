@@ -0,0 +1,200 @@
+"""Server-Sent Events fan-out for live dashboard updates.
+
+One background producer watches status, data files and stored records and
+publishes change events to an EventBroker; every connected /api/stream
+client gets its own bounded queue fed from that single producer.
+"""
+
+import os
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from config import (
+    MEMORY_DIR, ACTIVITY_LOG,
+    STREAM_INTERVAL, STREAM_STATUS_INTERVAL, STREAM_MAX_CLIENTS,
+)
+from utils.activity import get_available_dates
+from utils.notes import get_notes, get_notes_version
+from utils.tasks import get_task_stats, get_tasks_version, get_tasks_tag
+
+
+# Status fields that change on every sample and shouldn't count as a change
+_VOLATILE_STATUS_KEYS = ('timestamp', 'sample_age', 'generated_at', 'age')
+
+
+def format_event(event, data):
+    """Encode one SSE message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class EventBroker:
+    """Fan out published events to every subscriber queue.
+
+    The latest message of each `replay` event type is sent to new subscribers
+    so a freshly opened page doesn't wait for the next push. Change events
+    are not replayed. A subscriber whose queue is full (a stalled client)
+    simply misses messages. At most `max_subscribers` queues are handed out
+    (None = unlimited).
+    """
+
+    def __init__(self, queue_size=100, replay=('status',), max_subscribers=None):
+        self.queue_size = queue_size
+        self.replay = replay
+        self.max_subscribers = max_subscribers
+        self._subscribers = set()
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Return a new subscriber queue, or None when the broker is full."""
+        q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            if self.max_subscribers is not None and len(self._subscribers) >= self.max_subscribers:
+                return None
+            for message in self._last.values():
+                q.put_nowait(message)
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def publish(self, event, data):
+        message = format_event(event, data)
+        with self._lock:
+            if event in self.replay:
+                self._last[event] = message
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                pass
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+def _file_sig(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _activity_sig():
+    dates = get_available_dates()
+    latest = os.path.join(MEMORY_DIR, f'{dates[0]}.md') if dates else None
+    return (_file_sig(ACTIVITY_LOG), latest, _file_sig(latest) if latest else None)
+
+
+def _notes_payload():
+    notes = get_notes()
+    return {
+        'count': len(notes),
+        'pending': sum(1 for n in notes if n.get('status') == 'pending'),
+    }
+
+
+def _tasks_payload():
+    # The version lets the tasks page skip events it has already rendered
+    return dict(get_task_stats(), version=get_tasks_tag())
+
+
+def _changed_payload():
+    return {'changed_at': datetime.now().isoformat()}
+
+
+# event name -> (signature function, payload function)
+WATCHERS = {
+    'activity': (_activity_sig, _changed_payload),
+    'notes': (get_notes_version, _notes_payload),
+    'tasks': (get_tasks_version, _tasks_payload),
+}
+
+
+class StreamProducer:
+    """Single background thread that detects changes and publishes them."""
+
+    def __init__(self, broker, status_fn, interval=STREAM_INTERVAL,
+                 status_interval=STREAM_STATUS_INTERVAL):
+        self.broker = broker
+        self.status_fn = status_fn
+        self.interval = interval
+        self.status_interval = status_interval
+        self._sigs = {}
+        self._last_status = None
+        self._last_status_at = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _check_status(self):
+        now = time.time()
+        if now - self._last_status_at < self.status_interval:
+            return
+        self._last_status_at = now
+        status = self.status_fn()
+        stable = {k: v for k, v in status.items() if k not in _VOLATILE_STATUS_KEYS}
+        if stable != self._last_status:
+            self._last_status = stable
+            self.broker.publish('status', status)
+
+    def _check_files(self):
+        for event, (sig_fn, payload_fn) in WATCHERS.items():
+            sig = sig_fn()
+            if event in self._sigs and self._sigs[event] == sig:
+                continue
+            first = event not in self._sigs
+            self._sigs[event] = sig
+            # The first pass only records a baseline
+            if not first:
+                self.broker.publish(event, payload_fn())
+
+    def tick(self):
+        """Run one round of checks (skipped while nobody is listening)."""
+        if not self.broker.subscriber_count():
+            # Start over with a fresh status push and new file baselines
+            # once someone subscribes again
+            self._last_status_at = 0
+            self._sigs = {}
+            return
+        for check in (self._check_status, self._check_files):
+            try:
+                check()
+            except Exception:
+                continue
+
+    def _run(self):
+        while True:
+            self.tick()
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='stream-producer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+broker = EventBroker(max_subscribers=STREAM_MAX_CLIENTS)
+_producer = None
+_producer_lock = threading.Lock()
+
+
+def start_producer(status_fn):
+    """Start the shared stream producer (no-op if already running)."""
+    global _producer
+    with _producer_lock:
+        if _producer is None:
+            _producer = StreamProducer(broker, status_fn)
+        _producer.start()
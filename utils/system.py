@@ -1,18 +1,108 @@
+import os
 import psutil
 import platform
-import subprocess
 import datetime
+import threading
+import time
+from config import SYSTEM_SAMPLE_INTERVAL
+from utils.procs import find_process, is_running
+from utils.probes import ProbeRegistry
+from utils.history import record_sample
+from utils.metrics import timed, run_subprocess
 
 
+# Latest metrics collected by the background sampler thread
+_snapshot = None
+_snapshot_lock = threading.Lock()
+_sampler_thread = None
+_sampler_pid = None
+_sampler_stop = threading.Event()
+
+# Seconds the very first sample blocks to measure CPU over
+FIRST_SAMPLE_CPU_INTERVAL = 0.1
+
+
+def _take_sample(cpu_interval=None):
+    """Collect CPU, memory, disk and frequency readings into a snapshot dict."""
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
+    freq = psutil.cpu_freq()
+    return {
+        'cpu_percent': psutil.cpu_percent(interval=cpu_interval),
+        'cpu_freq': round(freq.current, 0) if freq else 'N/A',
+        'memory': memory,
+        'disk': disk,
+        'sampled_at': time.time(),
+    }
+
+
+def _sampler_loop(interval):
+    """Refresh the snapshot every `interval` seconds until stopped."""
+    global _snapshot
+    while not _sampler_stop.wait(interval):
+        try:
+            sample = _take_sample()
+        except Exception:
+            continue
+        with _snapshot_lock:
+            _snapshot = sample
+        record_sample(sample)
+
+
+def _sampler_running():
+    # A forked worker inherits the thread object but not the thread
+    return (_sampler_thread is not None and _sampler_pid == os.getpid()
+            and _sampler_thread.is_alive())
+
+
+def start_sampler(interval=None):
+    """Start the background metrics sampler (no-op if already running)."""
+    global _sampler_thread, _sampler_pid, _snapshot
+    with _snapshot_lock:
+        if _sampler_running():
+            return
+        if _snapshot is None:
+            # Block once so the first reading covers a real interval
+            _snapshot = _take_sample(cpu_interval=FIRST_SAMPLE_CPU_INTERVAL)
+        else:
+            # Prime cpu_percent so the next non-blocking reading is meaningful
+            psutil.cpu_percent(interval=None)
+        _sampler_stop.clear()
+        _sampler_thread = threading.Thread(
+            target=_sampler_loop,
+            args=(interval or SYSTEM_SAMPLE_INTERVAL,),
+            name='system-sampler',
+            daemon=True,
+        )
+        _sampler_thread.start()
+        _sampler_pid = os.getpid()
+
+
+def stop_sampler():
+    """Stop the background metrics sampler."""
+    global _sampler_thread
+    _sampler_stop.set()
+    if _sampler_thread is not None:
+        _sampler_thread.join(timeout=1)
+    _sampler_thread = None
+
+
+def get_snapshot():
+    """Return the latest sampler snapshot, starting the sampler if needed."""
+    if _snapshot is None or not _sampler_running():
+        start_sampler()
+    with _snapshot_lock:
+        return _snapshot
+
+
+@timed('get_system_info')
 def get_system_info():
-    """Get comprehensive system information."""
+    """Get comprehensive system information from the latest metrics snapshot."""
     # Clawdbot gateway uptime (not system boot time)
     try:
-        result = subprocess.run(['pgrep', '-f', 'clawdbot-gateway'], capture_output=True, text=True)
-        if result.stdout.strip():
-            pid = result.stdout.strip().split('\n')[0]
-            proc = psutil.Process(int(pid))
-            create_time = datetime.datetime.fromtimestamp(proc.create_time())
+        gateway = find_process('clawdbot-gateway')
+        if gateway:
+            create_time = datetime.datetime.fromtimestamp(gateway[1])
             uptime = datetime.datetime.now() - create_time
         else:
             raise Exception("No clawdbot-gateway process")
@@ -20,9 +110,9 @@ def get_system_info():
         boot_time = datetime.datetime.fromtimestamp(psutil.boot_time())
         uptime = datetime.datetime.now() - boot_time
 
-    cpu_percent = psutil.cpu_percent(interval=0.5)
-    memory = psutil.virtual_memory()
-    disk = psutil.disk_usage('/')
+    sample = get_snapshot()
+    memory = sample['memory']
+    disk = sample['disk']
 
     days = uptime.days
     hours, remainder = divmod(uptime.seconds, 3600)
@@ -37,9 +127,9 @@ def get_system_info():
         'uptime': uptime_str,
         'boot_time': datetime.datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:%S'),
         'cpu': {
-            'percent': cpu_percent,
+            'percent': sample['cpu_percent'],
             'cores': psutil.cpu_count(),
-            'freq': round(psutil.cpu_freq().current, 0) if psutil.cpu_freq() else 'N/A'
+            'freq': sample['cpu_freq']
         },
         'memory': {
             'total': _fmt_bytes(memory.total),
@@ -52,53 +142,61 @@ def get_system_info():
             'used': _fmt_bytes(disk.used),
             'free': _fmt_bytes(disk.free),
             'percent': disk.percent
-        }
+        },
+        'sampled_at': datetime.datetime.fromtimestamp(sample['sampled_at']).strftime('%Y-%m-%d %H:%M:%S'),
+        'sample_age': round(time.time() - sample['sampled_at'], 2),
     }
 
 
-def get_services():
-    """Get running services status."""
+def _probe_clawdbot(timeout):
+    return [{
+        'name': 'Clawdbot',
+        'status': 'running' if is_running('clawdbot') else 'stopped',
+        'icon': 'smart_toy'
+    }]
+
+
+def _probe_docker(timeout):
     services = []
+    result = run_subprocess(['docker', 'ps', '--format', '{{.Names}}\t{{.Status}}'],
+                            capture_output=True, text=True, timeout=timeout)
+    if result.returncode == 0 and result.stdout.strip():
+        for line in result.stdout.strip().split('\n'):
+            parts = line.split('\t')
+            if len(parts) >= 2:
+                services.append({
+                    'name': f'Docker: {parts[0]}',
+                    'status': 'running' if 'Up' in parts[1] else 'stopped',
+                    'icon': 'cloud'
+                })
+    return services
 
-    # Check clawdbot
-    try:
-        result = subprocess.run(['pgrep', '-f', 'clawdbot'], capture_output=True, timeout=5)
-        services.append({
-            'name': 'Clawdbot',
-            'status': 'running' if result.returncode == 0 else 'stopped',
-            'icon': 'smart_toy'
-        })
-    except Exception:
-        services.append({'name': 'Clawdbot', 'status': 'unknown', 'icon': 'smart_toy'})
 
-    # Check Docker containers
-    try:
-        result = subprocess.run(['docker', 'ps', '--format', '{{.Names}}\t{{.Status}}'],
-                                capture_output=True, text=True, timeout=10)
-        if result.returncode == 0 and result.stdout.strip():
-            for line in result.stdout.strip().split('\n'):
-                parts = line.split('\t')
-                if len(parts) >= 2:
-                    services.append({
-                        'name': f'Docker: {parts[0]}',
-                        'status': 'running' if 'Up' in parts[1] else 'stopped',
-                        'icon': 'cloud'
-                    })
-    except Exception:
-        pass
+def _probe_job_scraper(timeout):
+    result = run_subprocess(['lsof', '-i', ':5000', '-t'], capture_output=True, text=True, timeout=timeout)
+    return [{
+        'name': 'Job Scraper (5000)',
+        'status': 'running' if result.stdout.strip() else 'stopped',
+        'icon': 'work'
+    }]
 
-    # Check Flask job-scraper on port 5000
-    try:
-        result = subprocess.run(['lsof', '-i', ':5000', '-t'], capture_output=True, text=True, timeout=5)
-        services.append({
-            'name': 'Job Scraper (5000)',
-            'status': 'running' if result.stdout.strip() else 'stopped',
-            'icon': 'work'
-        })
-    except Exception:
-        services.append({'name': 'Job Scraper (5000)', 'status': 'unknown', 'icon': 'work'})
 
-    return services
+# Service checks: each runs concurrently with its own timeout and cache TTL
+probes = ProbeRegistry()
+probes.register('clawdbot', _probe_clawdbot, timeout=5, ttl=10,
+                fallback=[{'name': 'Clawdbot', 'icon': 'smart_toy'}])
+probes.register('docker', _probe_docker, timeout=10, ttl=30)
+probes.register('job-scraper', _probe_job_scraper, timeout=5, ttl=15,
+                fallback=[{'name': 'Job Scraper (5000)', 'icon': 'work'}])
+
+
+def get_services():
+    """Get running services status.
+
+    Each service carries `checked_at` and `stale`; results older than their
+    probe's TTL are returned while a refresh runs in the background.
+    """
+    return probes.results()
 
 
 def _fmt_bytes(b):
@@ -3,7 +3,11 @@ import re
 import json
 import uuid
 from datetime import datetime
-from config import TODO_PATHS, TASKS_FILE, ACTIVITY_LOG
+from config import TODO_PATHS, ACTIVITY_LOG, TODO_CACHE_BYTES
+from utils.cache import FileCache
+from utils.etag import file_signature, make_etag
+from utils.storage import get_store
+from utils.metrics import timed
 
 
 # Marker map for TODO.md checkbox states
@@ -14,14 +18,24 @@ COLUMN_MARKERS = {
 }
 
 
+COLUMNS = ('todo', 'in_progress', 'done')
+
+_BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+_HEADER_RE = re.compile(r'^#{1,3}\s+(.+)')
+# One pass per line: the marker picks the column ('' or spaces = todo)
+_CHECKBOX_RE = re.compile(r'^-\s+\[(\s*|[xX]|~)\]\s+(.*)')
+_MARKER_COLUMNS = {'': 'todo', 'x': 'done', 'X': 'done', '~': 'in_progress'}
+
+
 def _clean_task_text(text):
     """Remove markdown bold formatting from task text."""
-    return re.sub(r'\*\*(.+?)\*\*', r'\1', text).strip()
+    return _BOLD_RE.sub(r'\1', text).strip()
 
 
+@timed('parse_todo_file')
 def parse_todo_file(filepath):
     """Parse a TODO.md file into task items."""
-    tasks = {'todo': [], 'in_progress': [], 'done': []}
+    tasks = {column: [] for column in COLUMNS}
 
     if not os.path.exists(filepath):
         return tasks
@@ -34,68 +48,66 @@ def parse_todo_file(filepath):
 
     for line_num, line in enumerate(content.split('\n'), 1):
         stripped = line.strip()
+        first = stripped[:1]
 
-        header_match = re.match(r'^#{1,3}\s+(.+)', stripped)
-        if header_match:
-            current_section = header_match.group(1)
-            continue
+        if first == '#':
+            header_match = _HEADER_RE.match(stripped)
+            if header_match:
+                current_section = header_match.group(1)
+                continue
 
-        todo_match = re.match(r'^-\s+\[\s*\]\s+(.*)', stripped)
-        done_match = re.match(r'^-\s+\[x\]\s+(.*)', stripped, re.IGNORECASE)
-        progress_match = re.match(r'^-\s+\[~\]\s+(.*)', stripped)
+        if first != '-':
+            continue
+        match = _CHECKBOX_RE.match(stripped)
+        if not match:
+            continue
 
-        task_base = {
+        raw_text = match.group(2)
+        tasks[_MARKER_COLUMNS[match.group(1).strip()]].append({
             'section': current_section,
             'source': source,
             'source_type': 'file',
             'source_file': filepath,
             'priority': 'normal',
             'timestamp': None,
-        }
-
-        if done_match:
-            raw_text = done_match.group(1)
-            tasks['done'].append({
-                **task_base,
-                'text': _clean_task_text(raw_text),
-                'raw_text': raw_text,
-                'line_num': line_num,
-            })
-        elif progress_match:
-            raw_text = progress_match.group(1)
-            tasks['in_progress'].append({
-                **task_base,
-                'text': _clean_task_text(raw_text),
-                'raw_text': raw_text,
-                'line_num': line_num,
-            })
-        elif todo_match:
-            raw_text = todo_match.group(1)
-            tasks['todo'].append({
-                **task_base,
-                'text': _clean_task_text(raw_text),
-                'raw_text': raw_text,
-                'line_num': line_num,
-            })
+            'text': _clean_task_text(raw_text),
+            'raw_text': raw_text,
+            'line_num': line_num,
+        })
 
     return tasks
 
 
-def _load_dashboard_tasks():
-    """Load tasks from dashboard tasks.json."""
-    if not os.path.exists(TASKS_FILE):
-        return []
-    try:
-        with open(TASKS_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, Exception):
-        return []
+def _load_todo(filepath):
+    """Parse a TODO file and count its tasks per column (cache loader)."""
+    tasks = parse_todo_file(filepath)
+    return tasks, {column: len(items) for column, items in tasks.items()}
+
+
+def _todo_size(value):
+    """Cheap footprint estimate: a fixed per-task overhead plus its text."""
+    tasks, _ = value
+    return sum(1024 + 2 * len(t['raw_text']) for items in tasks.values() for t in items)
+
+
+# Parsed TODO files, re-parsed only when a file's mtime or size changes
+_todo_cache = FileCache(_load_todo, TODO_CACHE_BYTES, sizeof=_todo_size)
+_EMPTY_TODO = ({column: [] for column in COLUMNS}, dict.fromkeys(COLUMNS, 0))
 
 
-def _save_dashboard_tasks(tasks):
-    """Save tasks to dashboard tasks.json."""
-    with open(TASKS_FILE, 'w') as f:
-        json.dump(tasks, f, indent=2)
+def _parse_todo_cached(filepath):
+    """Return (tasks, counts) for a TODO file from the parse cache (read-only)."""
+    return _todo_cache.get(filepath, default=_EMPTY_TODO)
+
+
+def get_todo_cache_stats():
+    """Return hit/miss counters for the TODO.md parse cache."""
+    return _todo_cache.stats()
+
+
+def _load_dashboard_tasks():
+    """Load dashboard-managed tasks from storage."""
+    return get_store().records('tasks')
 
 
 def _log_activity(action):
@@ -109,32 +121,39 @@ def _log_activity(action):
         f.write(json.dumps(entry) + '\n')
 
 
+def get_todo_paths():
+    """Return existing TODO.md files shown on the task board."""
+    extra_paths = [
+        '/home/labs/clawd/job-scraper/TODO.md',
+    ]
+    paths = list(TODO_PATHS) + [p for p in extra_paths if p not in TODO_PATHS]
+    return [p for p in paths if os.path.exists(p)]
+
+
+def get_tasks_version():
+    """Return a cheap version of all task sources (for ETags)."""
+    return get_store().version('tasks'), file_signature(*get_todo_paths())
+
+
+def get_tasks_tag():
+    """Return get_tasks_version() as a short string (for pages and stream events)."""
+    return make_etag(get_tasks_version())
+
+
 def get_all_tasks():
     """Get tasks from all TODO files + dashboard tasks."""
-    all_tasks = {'todo': [], 'in_progress': [], 'done': []}
+    all_tasks = {column: [] for column in COLUMNS}
 
     # Parse TODO.md files
-    for path in TODO_PATHS:
-        if os.path.exists(path):
-            tasks = parse_todo_file(path)
-            all_tasks['todo'].extend(tasks['todo'])
-            all_tasks['in_progress'].extend(tasks['in_progress'])
-            all_tasks['done'].extend(tasks['done'])
-
-    extra_paths = [
-        '/home/labs/clawd/job-scraper/TODO.md',
-    ]
-    for path in extra_paths:
-        if os.path.exists(path) and path not in TODO_PATHS:
-            tasks = parse_todo_file(path)
-            all_tasks['todo'].extend(tasks['todo'])
-            all_tasks['in_progress'].extend(tasks['in_progress'])
-            all_tasks['done'].extend(tasks['done'])
+    for path in get_todo_paths():
+        tasks, _ = _parse_todo_cached(path)
+        for column in COLUMNS:
+            all_tasks[column].extend(tasks[column])
 
     # Add dashboard-managed tasks
     dash_tasks = _load_dashboard_tasks()
     for t in dash_tasks:
-        col = t.get('column', 'todo')
+        col = t.get('column') or 'todo'
         if col in all_tasks:
             all_tasks[col].append({
                 'id': t.get('id'),
@@ -151,7 +170,6 @@ def get_all_tasks():
 
 def add_task(text, priority='normal', column='todo'):
     """Add a new dashboard task."""
-    tasks = _load_dashboard_tasks()
     task = {
         'id': str(uuid.uuid4())[:8],
         'text': text,
@@ -160,24 +178,51 @@ def add_task(text, priority='normal', column='todo'):
         'section': '',
         'timestamp': datetime.now().isoformat(),
     }
-    tasks.append(task)
-    _save_dashboard_tasks(tasks)
+    get_store().insert('tasks', task)
     _log_activity(f'Task added: {text[:60]}')
     return task
 
 
 def move_task(task_id, new_column):
     """Move a dashboard task between columns."""
-    tasks = _load_dashboard_tasks()
-    for t in tasks:
-        if t['id'] == task_id:
-            old = t.get('column', 'todo')
-            t['column'] = new_column
-            t['moved_at'] = datetime.now().isoformat()
-            _save_dashboard_tasks(tasks)
-            _log_activity(f'Task {task_id} moved from {old} to {new_column}')
-            return t
-    return None
+    store = get_store()
+    task = store.get('tasks', task_id)
+    if not task:
+        return None
+    old = task.get('column', 'todo')
+    task = store.update('tasks', task_id, {
+        'column': new_column,
+        'moved_at': datetime.now().isoformat(),
+    })
+    if task:
+        _log_activity(f'Task {task_id} moved from {old} to {new_column}')
+    return task
+
+
+_MARKER_LINE_RE = re.compile(r'^(\s*-\s+)\[[ ~xX]\](\s+.*)')
+
+
+def _set_marker(lines, line_num, new_column):
+    """Rewrite the checkbox of lines[line_num - 1] in place.
+
+    Returns (old_line, new_line) or None if it isn't a task line.
+    """
+    if line_num < 1 or line_num > len(lines):
+        return None
+
+    line = lines[line_num - 1]
+
+    # Match any checkbox pattern: [ ], [~], [x], [X]
+    match = _MARKER_LINE_RE.match(line)
+    if not match:
+        return None
+
+    prefix = match.group(1)
+    rest = match.group(2)
+    old_line = line.rstrip('\n')
+    new_line = f"{prefix}{COLUMN_MARKERS[new_column]}{rest}"
+    lines[line_num - 1] = new_line if not line.endswith('\n') else new_line + '\n'
+    return old_line, new_line
 
 
 def move_file_task(source_file, line_num, new_column):
@@ -197,26 +242,13 @@ def move_file_task(source_file, line_num, new_column):
     if not os.path.exists(source_file):
         return None
 
-    new_marker = COLUMN_MARKERS[new_column]
-
     with open(source_file, 'r') as f:
         lines = f.readlines()
 
-    if line_num < 1 or line_num > len(lines):
+    edit = _set_marker(lines, line_num, new_column)
+    if not edit:
         return None
-
-    line = lines[line_num - 1]
-
-    # Match any checkbox pattern: [ ], [~], [x], [X]
-    match = re.match(r'^(\s*-\s+)\[[ ~xX]\](\s+.*)', line)
-    if not match:
-        return None
-
-    prefix = match.group(1)
-    rest = match.group(2)
-    old_line = line.rstrip('\n')
-    new_line = f"{prefix}{new_marker}{rest}"
-    lines[line_num - 1] = new_line if not line.endswith('\n') else new_line + '\n'
+    old_line, new_line = edit
 
     with open(source_file, 'w') as f:
         f.writelines(lines)
@@ -232,12 +264,126 @@ def move_file_task(source_file, line_num, new_column):
     }
 
 
+def _apply_file_moves(source_file, moves, results):
+    """Apply (index, line_num, column) moves to one TODO file with a single write."""
+    try:
+        with open(source_file, 'r') as f:
+            lines = f.readlines()
+    except OSError:
+        for index, _, _ in moves:
+            results[index] = {'status': 'error', 'error': 'file not found'}
+        return 0
+
+    changed = 0
+    for index, line_num, column in moves:
+        edit = _set_marker(lines, line_num, column)
+        if not edit:
+            results[index] = {'status': 'error', 'error': 'line not found or not a task'}
+            continue
+        changed += 1
+        results[index] = {'status': 'ok', 'task': {
+            'source_file': source_file,
+            'line_num': line_num,
+            'old_line': edit[0].strip(),
+            'new_line': edit[1].strip(),
+            'column': column,
+        }}
+
+    if changed:
+        with open(source_file, 'w') as f:
+            f.writelines(lines)
+    return changed
+
+
+def apply_task_batch(operations):
+    """Apply a list of task operations with at most one write per file.
+
+    Each operation is a dict like the single-task endpoints take:
+      {'op': 'add', 'text', 'priority', 'column'}
+      {'op': 'move', 'source_type': 'dashboard', 'id', 'column'}
+      {'op': 'move', 'source_type': 'file', 'source_file', 'line_num', 'column'}
+    File moves are limited to the TODO files shown on the board. Returns one
+    result dict ({'status': 'ok', 'task': ...} or {'status': 'error',
+    'error': ...}) per operation, in order.
+    """
+    results = [None] * len(operations)
+    todo_paths = set(get_todo_paths())
+    file_moves = {}        # source_file -> [(index, line_num, column)]
+    inserts, updates = [], []  # dashboard tasks
+    insert_index, update_index = [], []
+    now = datetime.now().isoformat()
+
+    for index, op in enumerate(operations):
+        if not isinstance(op, dict):
+            results[index] = {'status': 'error', 'error': 'operation must be an object'}
+            continue
+        kind = op.get('op', 'move')
+        column = str(op.get('column', 'todo' if kind == 'add' else '')).strip()
+        if column not in COLUMNS:
+            results[index] = {'status': 'error', 'error': 'valid column (todo/in_progress/done) required'}
+            continue
+
+        if kind == 'add':
+            text = str(op.get('text', '')).strip()
+            if not text:
+                results[index] = {'status': 'error', 'error': 'text is required'}
+                continue
+            inserts.append({
+                'id': str(uuid.uuid4())[:8],
+                'text': text,
+                'priority': op.get('priority', 'normal'),
+                'column': column,
+                'section': '',
+                'timestamp': now,
+            })
+            insert_index.append(index)
+        elif kind == 'move' and op.get('source_type') == 'file':
+            source_file = str(op.get('source_file', '')).strip()
+            try:
+                line_num = int(op.get('line_num'))
+            except (ValueError, TypeError):
+                results[index] = {'status': 'error', 'error': 'line_num must be an integer'}
+                continue
+            if source_file not in todo_paths:
+                results[index] = {'status': 'error', 'error': 'unknown source_file'}
+                continue
+            file_moves.setdefault(source_file, []).append((index, line_num, column))
+        elif kind == 'move':
+            task_id = str(op.get('id', '')).strip()
+            if not task_id:
+                results[index] = {'status': 'error', 'error': 'id required for dashboard tasks'}
+                continue
+            updates.append((task_id, {'column': column, 'moved_at': now}))
+            update_index.append(index)
+        else:
+            results[index] = {'status': 'error', 'error': f'unknown op: {kind}'}
+
+    moved = sum(_apply_file_moves(path, moves, results) for path, moves in file_moves.items())
+
+    if inserts or updates:
+        updated = get_store().bulk('tasks', inserts=inserts, updates=updates)
+        for index, task in zip(insert_index, inserts):
+            results[index] = {'status': 'ok', 'task': task}
+        for index, task in zip(update_index, updated):
+            results[index] = {'status': 'ok', 'task': task} if task else {'status': 'error', 'error': 'task not found'}
+        moved += sum(1 for task in updated if task)
+
+    if moved or inserts:
+        _log_activity(f'Task batch: {len(inserts)} added, {moved} moved')
+    return results
+
+
 def get_task_stats():
-    """Get task count statistics."""
-    tasks = get_all_tasks()
-    return {
-        'todo': len(tasks['todo']),
-        'in_progress': len(tasks['in_progress']),
-        'done': len(tasks['done']),
-        'total': len(tasks['todo']) + len(tasks['in_progress']) + len(tasks['done'])
-    }
+    """Get task count statistics (from cached per-file counts)."""
+    stats = dict.fromkeys(COLUMNS, 0)
+    for path in get_todo_paths():
+        _, counts = _parse_todo_cached(path)
+        for column in COLUMNS:
+            stats[column] += counts[column]
+    store = get_store()
+    for column in COLUMNS:
+        stats[column] += store.count('tasks', column=column)
+    # Tasks stored without a column are shown in todo (see get_all_tasks)
+    stats['todo'] += store.count('tasks', column=None)
+    stats['total'] = sum(stats[column] for column in COLUMNS)
+    return stats
@@ -0,0 +1,92 @@
+"""Concurrent data loading for dashboard widgets.
+
+Each widget is a named collector plus the template partials
+(templates/widgets/<part>.html) that render it. A page load runs all
+collectors at once on a shared pool and waits at most each widget's timeout;
+widgets that miss their budget are reported as pending, rendered as
+placeholders and fetched afterwards from /api/widgets/<name>. A collector
+that is still running is shared rather than started again, so the follow-up
+request picks up the late result.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import DASHBOARD_WIDGET_TIMEOUT, DASHBOARD_WIDGET_FETCH_TIMEOUT
+from utils.metrics import timed
+
+
+class Widget:
+    """One named collector and the partials that render its data."""
+
+    def __init__(self, name, fn, parts, timeout):
+        self.name = name
+        self.fn = fn
+        self.parts = tuple(parts)
+        self.timeout = timeout
+
+
+class WidgetLoader:
+    """Runs widget collectors concurrently with per-widget time budgets."""
+
+    def __init__(self, max_workers=8, timeout=DASHBOARD_WIDGET_TIMEOUT,
+                 fetch_timeout=DASHBOARD_WIDGET_FETCH_TIMEOUT):
+        self.timeout = timeout
+        self.fetch_timeout = fetch_timeout
+        self._widgets = {}
+        self._inflight = {}   # name -> future of its running collector
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='widget')
+        self._lock = threading.Lock()
+
+    def register(self, name, fn, parts=None, timeout=None):
+        """Declare a widget; fn() returns the data its partials render as `name`."""
+        widget = Widget(name, fn, parts or (name,), self.timeout if timeout is None else timeout)
+        self._widgets[name] = widget
+        return widget
+
+    def get_widget(self, name):
+        return self._widgets.get(name)
+
+    def _submit(self, name):
+        with self._lock:
+            future = self._inflight.get(name)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._widgets[name].fn)
+            self._inflight[name] = future
+        future.add_done_callback(lambda f: self._forget(name, f))
+        return future
+
+    def _forget(self, name, future):
+        with self._lock:
+            if self._inflight.get(name) is future:
+                del self._inflight[name]
+
+    @timed('load_widgets')
+    def load(self, names=None):
+        """Collect widgets concurrently; returns (data by name, pending names).
+
+        Timeouts are measured from the start of the call, so the whole load
+        takes no longer than the largest budget. Widgets that time out or
+        fail are left for the client to fetch via `fetch()`.
+        """
+        names = list(names or self._widgets)
+        start = time.monotonic()
+        futures = [(name, self._submit(name)) for name in names]
+        data, pending = {}, []
+        for name, future in futures:
+            budget = self._widgets[name].timeout - (time.monotonic() - start)
+            try:
+                data[name] = future.result(timeout=max(budget, 0))
+            except Exception:
+                # Late or failed: the client retries through /api/widgets
+                pending.append(name)
+        return data, pending
+
+    def fetch(self, name):
+        """Return one widget's data, joining its in-flight collector if any.
+
+        Raises concurrent.futures.TimeoutError after fetch_timeout seconds. A wedged collector
+        keeps its pool thread, but later fetches join it instead of piling up.
+        """
+        return self._submit(name).result(timeout=self.fetch_timeout)